@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Default upper bound of the total size of a cache directory.
+DEFAULT_CACHE_MAX_BYTES = 1 << 30
+# Number of bytes hashed at a time when computing the content hash of a file.
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(file_path: str | Path, *, salt: bytes = b"") -> str:
+    """Compute the BLAKE2b hash of the contents of a file.
+
+    Args:
+        file_path (str | Path): The path to the file.
+        salt (bytes, optional): Extra bytes hashed after the contents, such as serialized settings. Defaults to b"".
+
+    Returns:
+        str: The hexadecimal digest.
+
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    digest.update(salt)
+    return digest.hexdigest()
+
+
+def content_digest(contents: bytes | mmap.mmap) -> str:
+    """Compute the BLAKE2b hash of contents already in memory, equal to the `file_digest` of a file holding them.
+
+    Args:
+        contents (bytes | mmap.mmap): The contents.
+
+    Returns:
+        str: The hexadecimal digest.
+
+    """
+    return hashlib.blake2b(contents, digest_size=20).hexdigest()
+
+
+class LRUFileCache:
+    """A directory of cache entries whose total size is bounded by evicting the least recently used ones.
+
+    Each entry is a subdirectory named after its key. Entries are written into a temporary
+    directory and renamed into place, so readers never see a partial entry and several
+    processes can share the cache. The modification time of an entry records its last use.
+
+    Args:
+        root (str | Path): The cache directory. It is created if it does not exist.
+        max_bytes (int, optional): The maximum total size of the entries. Defaults to DEFAULT_CACHE_MAX_BYTES.
+
+    """
+
+    TEMP_PREFIX = ".tmp-"
+
+    def __init__(self, root: str | Path, *, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> Path | None:
+        """Return the directory of an entry and mark it as recently used.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Path | None: The entry directory, or None if the entry does not exist.
+
+        """
+        entry = self.root.joinpath(key)
+        try:
+            os.utime(entry)
+        except OSError:
+            return None
+        return entry
+
+    def put(self, key: str, write: Callable[[Path], None]) -> Path | None:
+        """Store an entry written by `write`, then evict old entries beyond `max_bytes`.
+
+        Failures to write the entry are ignored, since the cache only saves work.
+
+        Args:
+            key (str): The key of the entry.
+            write (Callable[[Path], None]): A function that writes the entry files into the given directory.
+
+        Returns:
+            Path | None: The entry directory, or None if it could not be stored.
+
+        """
+        entry = self.root.joinpath(key)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            temp_dir = Path(tempfile.mkdtemp(prefix=self.TEMP_PREFIX, dir=self.root))
+        except OSError:
+            return None
+        try:
+            write(temp_dir)
+            temp_dir.rename(entry)
+        except OSError:
+            # The entry may have been stored by another process in the meantime.
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return entry if entry.is_dir() else None
+        self.evict()
+        return entry
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the total size is within `max_bytes`.
+
+        Entries removed by another process while the cache is scanned are skipped.
+
+        """
+        entries = []
+        try:
+            candidates = [entry for entry in self.root.iterdir() if not entry.name.startswith(self.TEMP_PREFIX)]
+        except OSError:
+            return
+        for entry in candidates:
+            try:
+                entries.append((entry.stat().st_mtime, sum(path.stat().st_size for path in entry.iterdir()), entry))
+            except OSError:
+                # The entry has been evicted by another process, or is not a directory.
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+class MeasurementCache:
+    """On-disk cache of parsed input files, keyed by the content hash of the file and the parser settings.
+
+    An entry holds the header as JSON and each measurement column as an .npy file, so a
+    hit is loaded without parsing any text. Frames with non-numeric columns are not cached.
+
+    Args:
+        cache_dir (str | Path): The cache directory.
+        max_bytes (int, optional): The maximum total size of the cache. Defaults to DEFAULT_CACHE_MAX_BYTES.
+
+    Example:
+        >>> cache = MeasurementCache("/cache")
+        >>> key = cache.key(Path("sample.txt"), {"start": 10})
+        >>> cache.store(key, metadata, measurements)
+        >>> metadata, measurements = cache.load(key)
+
+    """
+
+    # Increment when the parsed result or the entry format changes, so old entries are not reused.
+    VERSION = 1
+
+    def __init__(self, cache_dir: str | Path, *, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.files = LRUFileCache(cache_dir, max_bytes=max_bytes)
+
+    def key(self, file_path: str | Path, settings: Mapping[str, Any], *, digest: str | None = None) -> str:
+        """Compute the key of an input file parsed with the given settings.
+
+        Args:
+            file_path (str | Path): The path to the input file.
+            settings (Mapping[str, Any]): The JSON-serializable parser settings that affect the result.
+            digest (str | None, optional): The `file_digest` of the file if it is already known, for example
+                from `content_digest` of the ingested contents, so the file is not read again. Defaults to None.
+
+        Returns:
+            str: The cache key.
+
+        """
+        salt = json.dumps({"version": self.VERSION, **settings}, sort_keys=True).encode("utf_8")
+        if digest is None:
+            digest = file_digest(file_path)
+        return hashlib.blake2b(digest.encode("ascii") + salt, digest_size=20).hexdigest()
+
+    def load(self, key: str) -> tuple[list[tuple[str, str]], pd.DataFrame] | None:
+        """Load a cached result.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            tuple[list[tuple[str, str]], pd.DataFrame] | None: The header and measurements, or None on a miss.
+
+        """
+        entry = self.files.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(entry.joinpath("header.json"), encoding="utf_8") as f:
+                contents = json.load(f)
+            columns = [np.load(entry.joinpath(f"{i}.npy"), allow_pickle=False) for i in range(len(contents["columns"]))]
+        except (OSError, ValueError, KeyError):
+            return None
+        metadata = [(name, value) for name, value in contents["metadata"]]
+        return metadata, self.__to_frame(contents["columns"], columns)
+
+    def store(self, key: str, metadata: list[tuple[str, str]], measurements: pd.DataFrame) -> None:
+        """Store a parsed result, unless it has non-numeric columns.
+
+        Args:
+            key (str): The cache key.
+            metadata (list[tuple[str, str]]): The parsed header.
+            measurements (pd.DataFrame): The parsed measurements.
+
+        """
+        if not all(dtype.kind in "iuf" for dtype in measurements.dtypes):
+            return
+
+        def write(entry: Path) -> None:
+            for i in range(measurements.shape[1]):
+                np.save(entry.joinpath(f"{i}.npy"), measurements.iloc[:, i].to_numpy(), allow_pickle=False)
+            with open(entry.joinpath("header.json"), "w", encoding="utf_8") as f:
+                json.dump({"metadata": metadata, "columns": measurements.columns.tolist()}, f, ensure_ascii=False)
+
+        self.files.put(key, write)
+
+    def __to_frame(self, labels: list[Any], columns: list[np.ndarray]) -> pd.DataFrame:
+        if not columns:
+            return pd.DataFrame()
+        index = pd.RangeIndex(len(labels)) if labels == list(range(len(labels))) else pd.Index(labels)
+        return pd.DataFrame(dict(enumerate(columns)), copy=False).set_axis(index, axis=1)
+
+
+class RenderCache:
+    """On-disk cache of plot images, keyed by a fingerprint of the plotted values and the plot settings.
+
+    An entry holds the image and the number of points drawn. A hit is hard-linked into place,
+    or copied if the cache is on another file system, so it costs no rendering.
+
+    Args:
+        cache_dir (str | Path): The cache directory.
+        max_bytes (int, optional): The maximum total size of the cache. Defaults to DEFAULT_CACHE_MAX_BYTES.
+
+    Example:
+        >>> cache = RenderCache("/cache")
+        >>> key = cache.key([x, y], {"title": "Sample"})
+        >>> if cache.load(key, Path("plot.png")) is None:
+        ...     points = plot(x, y, Path("plot.png"))
+        ...     cache.store(key, Path("plot.png"), points)
+
+    """
+
+    # Increment when the entry format changes, so old entries are not reused.
+    VERSION = 1
+
+    def __init__(self, cache_dir: str | Path, *, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.files = LRUFileCache(cache_dir, max_bytes=max_bytes)
+
+    def key(self, arrays: Sequence[np.ndarray], settings: Mapping[str, Any]) -> str:
+        """Compute the key of a plot of numeric arrays drawn with the given settings.
+
+        Args:
+            arrays (Sequence[np.ndarray]): The plotted numeric values.
+            settings (Mapping[str, Any]): The JSON-serializable settings that affect the image.
+
+        Returns:
+            str: The cache key.
+
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        for array in arrays:
+            values = np.ascontiguousarray(array)
+            digest.update(f"{values.dtype.str}{values.shape}".encode())
+            digest.update(values.data.cast("B"))
+        digest.update(json.dumps({"version": self.VERSION, **settings}, sort_keys=True).encode("utf_8"))
+        return digest.hexdigest()
+
+    def load(self, key: str, image_path: Path) -> int | None:
+        """Put a cached image at `image_path`.
+
+        Args:
+            key (str): The cache key.
+            image_path (Path): The path of the image.
+
+        Returns:
+            int | None: The number of points drawn in the image, or None on a miss.
+
+        """
+        entry = self.files.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(entry.joinpath("plot.json"), encoding="utf_8") as f:
+                points = int(json.load(f)["points"])
+            _link_or_copy(entry.joinpath("image"), Path(image_path))
+        except (OSError, ValueError, KeyError):
+            return None
+        return points
+
+    def store(self, key: str, image_path: Path, points: int) -> None:
+        """Store a copy of a rendered image.
+
+        Args:
+            key (str): The cache key.
+            image_path (Path): The path of the image.
+            points (int): The number of points drawn in the image.
+
+        """
+
+        def write(entry: Path) -> None:
+            shutil.copyfile(image_path, entry.joinpath("image"))
+            with open(entry.joinpath("plot.json"), "w", encoding="utf_8") as f:
+                json.dump({"points": points}, f)
+
+        self.files.put(key, write)
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
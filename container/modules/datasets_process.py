@@ -1,11 +1,25 @@
-from rdetoolkit.exceptions import catch_exception_with_message
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Literal
+
+import pandas as pd
+from rdetoolkit.exceptions import StructuredError, catch_exception_with_message
 from rdetoolkit.models.rde2types import RdeInputDirPaths, RdeOutputResourcePath
 from rdetoolkit.rde2util import Meta
 
-from modules.graph_handler import GraphPlotter
+from modules.cache_handler import MeasurementCache, RenderCache
+from modules.graph_handler import GraphOptions, GraphPlotter, PlotResult, RenderPool, ScatterAccumulator
 from modules.inputfile_handler import FileReader
-from modules.meta_handler import MetaParser, get_invoice_obj
-from modules.structured_handler import StructuredDataProcessor
+from modules.meta_handler import MetaParser, get_invoice_obj, get_scatterplot_config
+from modules.metrics_handler import NULL_RECORDER, RDE_LOG_NAME, MetricsRecorder
+from modules.models import ColumnarFormat
+from modules.pipeline_handler import StagePipeline, available_cpus
+from modules.structured_handler import CsvSink, StructuredDataProcessor
 
 
 class CustomProcessingCoordinator:
@@ -45,6 +59,229 @@ class CustomProcessingCoordinator:
         self.structured_processer = structured_processer
 
 
+def register_rawfile(
+    rawfile: Path,
+    resource_paths: RdeOutputResourcePath,
+    graph_options: GraphOptions,
+    *,
+    prefix_outputs: bool = False,
+    cache: MeasurementCache | None = None,
+    render_cache: RenderCache | None = None,
+    out_of_core_threshold: int | None = None,
+    recorder: MetricsRecorder = NULL_RECORDER,
+    render_pool: RenderPool | None = None,
+    csv_float_format: str | None = None,
+    csv_compression: Literal["gzip"] | None = None,
+    columnar_format: ColumnarFormat | None = None,
+    concurrent_stages: bool = True,
+) -> list[tuple[str, str]]:
+    """Read one raw file, save its structured data and plot its graph.
+
+    This runs in a worker process when several raw files are registered, so it builds its own components.
+
+    Args:
+        rawfile (Path): The raw file to register.
+        resource_paths (RdeOutputResourcePath): Paths to the output directories for saving processed files.
+        graph_options (GraphOptions): The user-defined graph options.
+        prefix_outputs (bool, optional): If True, "data.csv" and "header.csv" are prefixed with the stem of
+            the raw file so that several raw files do not overwrite each other's outputs. Defaults to False.
+        cache (MeasurementCache | None, optional): The cache of parsed input files. Defaults to None.
+        render_cache (RenderCache | None, optional): The cache of plot images. Defaults to None.
+        out_of_core_threshold (int | None, optional): If the raw file has at least this many bytes, its
+            measurement data is streamed chunk by chunk into the CSV files and a decimated copy is
+            plotted, so it never has to fit in memory. Defaults to None, which always loads the file.
+        recorder (MetricsRecorder, optional): The recorder shared by the components. Defaults to NULL_RECORDER.
+        render_pool (RenderPool | None, optional): If given, the graph is submitted to this pool instead of
+            being plotted here, and its result is collected by the caller. Defaults to None.
+        csv_float_format (str | None, optional): The printf-style format of the float values in the CSV
+            files. Defaults to None, which writes the shortest text that round-trips.
+        csv_compression (Literal["gzip"] | None, optional): If "gzip", the CSV files are compressed and
+            ".gz" is appended to their names. Defaults to None.
+        columnar_format (ColumnarFormat | None, optional): If set, the measurements are also saved in this
+            columnar format next to "data.csv". Defaults to None.
+        concurrent_stages (bool, optional): If True, the structured data, the header and the graph are
+            written by concurrent stages of a `StagePipeline` once the raw file has been read. Defaults to True.
+
+    Returns:
+        list[tuple[str, str]]: The header of the raw file, used for the metadata.
+
+    """
+    module = CustomProcessingCoordinator(FileReader(), MetaParser(), _process_graph_plotter(), StructuredDataProcessor())
+    user_setting_header = [graph_options.xlabel, graph_options.ylabel] if graph_options.xlabel and graph_options.ylabel else None
+    basename = rawfile.stem
+    prefix = f"{basename}_" if prefix_outputs else ""
+    module.file_reader.cache = cache
+    module.graph_plotter.render_cache = render_cache
+    module.file_reader.out_of_core_threshold = out_of_core_threshold
+    module.file_reader.recorder = module.structured_processer.recorder = module.graph_plotter.recorder = recorder
+    module.structured_processer.float_format = csv_float_format
+    module.structured_processer.compression = csv_compression
+    module.structured_processer.columnar_format = columnar_format
+    sinks = [
+        CsvSink(resource_paths.struct.joinpath(f"{prefix}data.csv"), columnar=True),
+        CsvSink(resource_paths.struct.joinpath(f"{basename}.csv"), [graph_options.x_col_num, graph_options.y_col_num], user_setting_header),
+    ]
+
+    # The outputs of the raw file are written and plotted by concurrent stages once it has been read.
+    pipeline = StagePipeline(concurrent=concurrent_stages)
+    plot = partial(_plot_stage, module.graph_plotter, resource_paths.main_image.joinpath(basename), render_pool)
+
+    # -- Read Input File and Save structured data (1 header csv) --
+    module.file_reader.set_mesurement_start_number(rawfile, resource_paths.invoice_org)
+    if module.file_reader.is_out_of_core(rawfile):
+        meta, chunks = module.file_reader.read_chunks(rawfile)
+        accumulator = ScatterAccumulator(graph_options)
+        pipeline.add("stream_measurements", partial(_stream_stage, module.structured_processer, accumulator.track(chunks), sinks, recorder))
+        # The decimated points are only known once the measurements have been streamed.
+        pipeline.add("plot", lambda: plot(accumulator.frame(), accumulator.options()), after=["stream_measurements"])
+    else:
+        meta, plot_data = module.file_reader.read(rawfile)
+        pipeline.add("write_structured", partial(module.structured_processer.to_csv_sinks, plot_data, sinks))
+        pipeline.add("plot", partial(plot, plot_data, graph_options))
+    # -- Save header information --
+    pipeline.add("write_header", partial(module.structured_processer.to_text, meta, resource_paths.struct.joinpath(f"{prefix}header.csv")))
+
+    # -- Save structured data, header information and Figure --
+    pipeline.run()
+    return meta
+
+
+def register_rawfiles(
+    resource_paths: RdeOutputResourcePath,
+    graph_options: GraphOptions,
+    *,
+    max_workers: int | None = None,
+    cache: MeasurementCache | None = None,
+    render_cache: RenderCache | None = None,
+    out_of_core_threshold: int | None = None,
+    recorder: MetricsRecorder = NULL_RECORDER,
+    render_workers: int = 0,
+    csv_float_format: str | None = None,
+    csv_compression: Literal["gzip"] | None = None,
+    columnar_format: ColumnarFormat | None = None,
+    concurrent_stages: bool = True,
+) -> list[list[tuple[str, str]]]:
+    """Register every raw file of the dataset, in a process pool when there are several.
+
+    With a single raw file the outputs keep their usual names. With several raw files,
+    each is registered by `register_rawfile` in its own process and its "data.csv" and
+    "header.csv" are prefixed with the stem of the raw file. Since every output is named
+    after that stem, the raw files must have different stems.
+
+    Args:
+        resource_paths (RdeOutputResourcePath): Paths to the output directories for saving processed files.
+        graph_options (GraphOptions): The user-defined graph options.
+        max_workers (int | None, optional): The maximum number of worker processes. If None, the number of CPUs available to the process is used. Defaults to None.
+        cache (MeasurementCache | None, optional): The cache of parsed input files. Defaults to None.
+        render_cache (RenderCache | None, optional): The cache of plot images. Defaults to None.
+        out_of_core_threshold (int | None, optional): The file size from which raw files are streamed
+            instead of loaded, see `register_rawfile`. Defaults to None.
+        recorder (MetricsRecorder, optional): If enabled, the metrics of each raw file are collected
+            in its worker and attached to this recorder with `add_file`. Defaults to NULL_RECORDER.
+        render_workers (int, optional): When the raw files are registered one by one in this process, the
+            number of `RenderPool` workers that draw the graphs while the next outputs are written.
+            0 draws them in this process. Defaults to 0.
+        csv_float_format (str | None, optional): The format of the float values in the CSV files, see
+            `register_rawfile`. Defaults to None.
+        csv_compression (Literal["gzip"] | None, optional): The compression of the CSV files, see
+            `register_rawfile`. Defaults to None.
+        columnar_format (ColumnarFormat | None, optional): The columnar format in which the measurements are
+            also saved, see `register_rawfile`. Defaults to None.
+        concurrent_stages (bool, optional): If True, the outputs of each raw file are written by concurrent
+            stages, see `register_rawfile`. Defaults to True.
+
+    Returns:
+        list[list[tuple[str, str]]]: The headers of the raw files, in the order of `resource_paths.rawfiles`.
+
+    Raises:
+        StructuredError: If several raw files have the same stem, such as "a.txt" and "a.dat".
+
+    """
+    rawfiles = list(resource_paths.rawfiles)
+    _check_unique_stems(rawfiles)
+    register = partial(
+        _register_recorded,
+        metrics=recorder.enabled,
+        resource_paths=resource_paths,
+        graph_options=graph_options,
+        prefix_outputs=len(rawfiles) > 1,
+        cache=cache,
+        render_cache=render_cache,
+        out_of_core_threshold=out_of_core_threshold,
+        csv_float_format=csv_float_format,
+        csv_compression=csv_compression,
+        columnar_format=columnar_format,
+        concurrent_stages=concurrent_stages,
+    )
+    workers = min(len(rawfiles), max_workers or available_cpus())
+    if workers <= 1 and render_workers:
+        results = _register_rendered(rawfiles, register, RenderPool(render_workers, option=graph_options, render_cache=render_cache))
+    elif workers <= 1:
+        results = [register(rawfile) for rawfile in rawfiles]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(register, rawfiles))
+    for rawfile, (_, file_recorder) in zip(rawfiles, results):
+        recorder.add_file(rawfile.name, file_recorder)
+    return [meta for meta, _ in results]
+
+
+def _check_unique_stems(rawfiles: list[Path]) -> None:
+    """Raise if raw files share a stem, since their outputs would overwrite each other."""
+    duplicates = sorted(stem for stem, count in Counter(rawfile.stem for rawfile in rawfiles).items() if count > 1)
+    if duplicates:
+        emsg = f"Raw files with the same name except for the extension cannot be registered together: {', '.join(duplicates)}"
+        raise StructuredError(emsg, 1)
+
+
+@lru_cache(maxsize=1)
+def _process_graph_plotter() -> GraphPlotter:
+    """Return the plotter shared by the raw files registered in this process, which keeps its figure between them."""
+    return GraphPlotter()
+
+
+def _stream_stage(processor: StructuredDataProcessor, chunks: Iterable[pd.DataFrame], sinks: list[CsvSink], recorder: MetricsRecorder) -> None:
+    # The measurements are parsed while they are written, so both are timed as one stage.
+    with recorder.stage("stream_measurements"):
+        processor.to_csv_chunks(chunks, sinks)
+
+
+def _plot_stage(plotter: GraphPlotter, save_path: Path, render_pool: RenderPool | None, data: pd.DataFrame, option: GraphOptions) -> None:
+    # With a render pool, the graph is drawn by the pool and its result is collected by the caller.
+    if render_pool is None:
+        plotter.plot(data, save_path, option)
+    else:
+        render_pool.submit(data, save_path, option)
+
+
+def _register_rendered(
+    rawfiles: list[Path],
+    register: Callable[..., tuple[list[tuple[str, str]], MetricsRecorder]],
+    render_pool: RenderPool,
+) -> list[tuple[list[tuple[str, str]], MetricsRecorder]]:
+    """Register the raw files one by one while a render pool draws their graphs, then raise the first plot error."""
+    with render_pool as pool:
+        results = [register(rawfile, render_pool=pool) for rawfile in rawfiles]
+        plots = pool.collect()
+    # Each raw file submits one graph, so the plots are in the order of the raw files.
+    for (_, file_recorder), plot in zip(results, plots):
+        _record_plot(file_recorder, plot)
+    return results
+
+
+def _record_plot(recorder: MetricsRecorder, plot: PlotResult) -> None:
+    if plot.error is not None:
+        raise plot.error
+    recorder.count("points_plotted", plot.points)
+    recorder.output(plot.save_path)
+
+
+def _register_recorded(rawfile: Path, *, metrics: bool, **kwargs: Any) -> tuple[list[tuple[str, str]], MetricsRecorder]:
+    """Register a raw file with a recorder of its own, which is returned since it may live in a worker process."""
+    recorder = MetricsRecorder() if metrics else NULL_RECORDER
+    return register_rawfile(rawfile, recorder=recorder, **kwargs), recorder
+
+
 def scatterplot_module(srcpaths: RdeInputDirPaths, resource_paths: RdeOutputResourcePath) -> None:
     """Process input data to generate scatterplot visualizations and save structured data.
 
@@ -54,12 +291,13 @@ def scatterplot_module(srcpaths: RdeInputDirPaths, resource_paths: RdeOutputReso
 
     This function performs the following steps:
     1. Initializes the processing module with custom components for reading files, parsing metadata, plotting graphs, and processing structured data.
-    2. Retrieves user-defined graph options from the invoice JSON file.
-    3. Reads the input data file and extracts metadata and data.
+    2. Retrieves user-defined graph options from the invoice JSON file and the template settings from rdeconfig.yaml.
+    3. Reads each input data file and extracts metadata and data, in parallel processes when there are several files.
     4. Saves the data to CSV files, including a subset of columns specified by the user.
     5. Saves the header information to a text file.
-    6. Parses and saves metadata based on a metadata definition JSON file.
-    7. Generates and saves a scatterplot image based on the input data and user-defined options.
+    6. Generates and saves a scatterplot image based on the input data and user-defined options.
+    7. Parses and saves metadata of the first input file based on a metadata definition JSON file.
+    8. If enabled in rdeconfig.yaml, saves the timings and counters of each stage to "metrics.json" in the logs directory.
 
     """
     module = CustomProcessingCoordinator(FileReader(), MetaParser(), GraphPlotter(), StructuredDataProcessor())
@@ -67,34 +305,41 @@ def scatterplot_module(srcpaths: RdeInputDirPaths, resource_paths: RdeOutputReso
     # -- user setting --
     invoice_json = get_invoice_obj(srcpaths.invoice.joinpath("invoice.json"))
     invoice_json.to_json(srcpaths.invoice.joinpath("invoice.json"))
-    user_graph_options = module.graph_plotter.create_options(invoice_json)
-    user_setting_header = [user_graph_options.xlabel, user_graph_options.ylabel] if user_graph_options.xlabel and user_graph_options.ylabel else None
-    basename = resource_paths.rawfiles[0].stem
-
-    # -- Read Input File --
-    module.file_reader.set_mesurement_start_number(resource_paths.rawfiles[0], resource_paths.invoice_org)
-    meta, df_data = module.file_reader.read(resource_paths.rawfiles[0])
-
-    # -- Save structured data (1 header csv) --
-    module.structured_processer.to_csv(df_data, resource_paths.struct.joinpath("data.csv"))
-    module.structured_processer.to_csv(
-        df_data.iloc[:, [user_graph_options.x_col_num, user_graph_options.y_col_num]],
-        resource_paths.struct.joinpath(f"{basename}.csv"),
-        header=user_setting_header,
-    )
-    # -- Save header information --
-    module.structured_processer.to_text(meta, resource_paths.struct.joinpath("header.csv"))
+    config = get_scatterplot_config(srcpaths.tasksupport)
+    plot_settings: dict[str, Any] = {"plot_mode": config.plot_mode, "log_density": config.log_density, "max_points": config.max_plot_points}
+    if config.font_families:
+        plot_settings["font_families"] = config.font_families
+    user_graph_options = module.graph_plotter.create_options(invoice_json).model_copy(update=plot_settings)
+    cache = MeasurementCache(config.cache_dir, max_bytes=config.cache_max_bytes) if config.cache_dir else None
+    # Parsed input files and plot images share the cache directory and its size limit.
+    render_cache = RenderCache(config.cache_dir, max_bytes=config.cache_max_bytes) if config.cache_dir else None
+    recorder = MetricsRecorder() if config.metrics else NULL_RECORDER
+
+    # -- Read Input Files, Save structured data and Plot graphs --
+    with recorder.stage("register_rawfiles"):
+        metas = register_rawfiles(
+            resource_paths,
+            user_graph_options,
+            max_workers=config.max_workers,
+            cache=cache,
+            render_cache=render_cache,
+            out_of_core_threshold=config.out_of_core_threshold,
+            recorder=recorder,
+            render_workers=config.render_workers,
+            csv_float_format=config.csv_float_format,
+            csv_compression=config.csv_compression,
+            columnar_format=config.columnar_format,
+            concurrent_stages=config.concurrent_stages,
+        )
 
     # -- Save meta data --
-    module.meta_parser.parse(meta, srcpaths.tasksupport.joinpath("metadata-def.json"))
-    module.meta_parser.save_meta(resource_paths.meta.joinpath("metadata.json"), Meta(srcpaths.tasksupport.joinpath("metadata-def.json")))
-
-    # -- Plot a graph and Save Figure --
-    module.graph_plotter.plot(
-        df_data,
-        resource_paths.main_image.joinpath(resource_paths.rawfiles[0].stem),
-        user_graph_options,
-    )
+    with recorder.stage("metadata"):
+        module.meta_parser.parse(metas[0], srcpaths.tasksupport.joinpath("metadata-def.json"))
+        module.meta_parser.save_meta(resource_paths.meta.joinpath("metadata.json"), Meta(srcpaths.tasksupport.joinpath("metadata-def.json")))
+    recorder.output(resource_paths.meta.joinpath("metadata.json"))
+
+    # -- Save metrics --
+    recorder.save(resource_paths.logs.joinpath("metrics.json"), log_path=resource_paths.logs.joinpath(RDE_LOG_NAME))
 
 
 @catch_exception_with_message(error_message="ERROR: failed in data processing", error_code=50, verbose=True)
@@ -1,15 +1,40 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
 
+import matplotlib as mpl
+import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
+from matplotlib import font_manager
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
 from matplotlib.ticker import FuncFormatter, MaxNLocator
 from pydantic import BaseModel, Field, field_validator
+from rdetoolkit.rdelogger import get_logger
 
-from modules.models import InvoiceJson
+from modules.cache_handler import RenderCache
+from modules.metrics_handler import NULL_RECORDER, MetricsRecorder
+from modules.models import InvoiceJson, PlotMode
+from modules.pipeline_handler import available_cpus
 
-plt.rcParams["font.family"] = "Hiragino Sans"
+if TYPE_CHECKING:
+    # typing.Self requires Python 3.11.
+    from typing_extensions import Self
+
+logger = get_logger(__name__)
+
+# Fonts tried in order for the text of the plots, which may contain Japanese.
+DEFAULT_FONT_FAMILIES = ("Noto Sans CJK JP", "Hiragino Sans", "IPAexGothic")
+# Default upper bound of the number of points kept by ScatterAccumulator.
+DEFAULT_MAX_PLOT_POINTS = 100_000
+# Default number of points above which the "auto" plot mode draws a density image.
+DEFAULT_DENSITY_THRESHOLD = 1_000_000
 
 
 class GraphOptions(BaseModel):
@@ -21,6 +46,11 @@ class GraphOptions(BaseModel):
     label_fontsize: int | float = Field(default=12)
     scale_fontsize: int | float = Field(default=10)
     title: str | None = Field(default=None)
+    plot_mode: PlotMode = Field(default="scatter")
+    density_threshold: int = Field(default=DEFAULT_DENSITY_THRESHOLD, ge=0)
+    log_density: bool = Field(default=False)
+    max_points: int | None = Field(default=None, ge=4)
+    font_families: list[str] = Field(default_factory=lambda: list(DEFAULT_FONT_FAMILIES), min_length=1)
 
     @field_validator("x_col_num", "y_col_num")
     def adjust_column_number(cls, v: int) -> int:
@@ -40,9 +70,213 @@ class GraphOptions(BaseModel):
         return v
 
 
+def decimate_extrema(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Select at most `max_points` points that keep the shape of the data when plotted.
+
+    The x range is divided into `max_points // 4` bins of equal width, like the pixel columns of a
+    plot. Of each bin, the points with the smallest and the largest x and y values are kept, so
+    peaks and outliers survive. Data of at most `max_points` points is kept unchanged.
+
+    Args:
+        x (np.ndarray): The finite x values.
+        y (np.ndarray): The finite y values.
+        max_points (int): The maximum number of points selected, at least 4.
+
+    Returns:
+        np.ndarray: The sorted positions of the selected points.
+
+    """
+    if len(x) <= max_points:
+        return np.arange(len(x))
+    bins = _bin_index(x, _bin_edges(x, max_points // 4))
+    # A stable sort takes linear time when x is already sorted, as in time series.
+    order = np.argsort(bins, kind="stable")
+    starts = np.r_[0, np.flatnonzero(np.diff(bins[order])) + 1]
+    groups = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(x)]))
+    keep = [
+        order[_group_extremum(values[order], starts, groups, reduce)]
+        for values in (x, y)
+        for reduce in (np.minimum, np.maximum)
+    ]
+    return np.unique(np.concatenate(keep))
+
+
+def _group_extremum(values: np.ndarray, starts: np.ndarray, groups: np.ndarray, reduce: np.ufunc) -> np.ndarray:
+    """Return the first position of the extremum of each group of contiguous values."""
+    hits = np.flatnonzero(values == reduce.reduceat(values, starts)[groups])
+    _, first = np.unique(groups[hits], return_index=True)
+    return hits[first]
+
+
+@lru_cache
+def resolve_font_families(families: tuple[str, ...]) -> list[str]:
+    """Return the installed fonts among `families`, in order, reporting a fallback once.
+
+    Only installed fonts are passed to matplotlib, which otherwise looks up and warns about the
+    missing ones for every text. The result is cached, so the fonts are resolved once per process.
+
+    Args:
+        families (tuple[str, ...]): The preferred font families, in order.
+
+    Returns:
+        list[str]: The installed families, or the generic "sans-serif" family if none is installed.
+
+    """
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    resolved = [family for family in families if family in installed]
+    if not resolved:
+        logger.warning("None of the fonts %s is installed, falling back to sans-serif", ", ".join(families))
+        return ["sans-serif"]
+    if resolved[0] != families[0]:
+        logger.warning("The font %s is not installed, falling back to %s", families[0], resolved[0])
+    return resolved
+
+
+def _image_path(save_path: Path) -> Path:
+    """Return the path of the image saved to `save_path`. Without an extension, matplotlib appends the one of the default format."""
+    return Path(save_path) if Path(save_path).suffix else Path(save_path).with_suffix(f".{mpl.rcParams['savefig.format']}")
+
+
+def _select_columns(data: pd.DataFrame, option: GraphOptions) -> pd.DataFrame:
+    """Return the x and y columns selected by the options."""
+    x_col_num = option.x_col_num if option.x_col_num else 0
+    y_col_num = option.y_col_num if option.y_col_num else 1
+    return data if x_col_num == 0 and y_col_num == 1 else data.iloc[:, [x_col_num, y_col_num]]
+
+
+def _format_tick(value: float, _: int) -> str:
+    """Format a tick label without a decimal point for whole numbers."""
+    return f'{value:.1f}' if value % 1 != 0 else f'{int(value)}'
+
+
+def _finite_points(data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Return the x and y values of the first two columns, without the points that are not finite."""
+    x = pd.to_numeric(data.iloc[:, 0], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(data.iloc[:, 1], errors="coerce").to_numpy(dtype=float)
+    finite = np.isfinite(x) & np.isfinite(y)
+    return x[finite], y[finite]
+
+
+def _bin_edges(values: np.ndarray, bins: int) -> np.ndarray:
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def _bin_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Return the bin of each value. Faster than np.digitize, which searches the edges of every value."""
+    bins = len(edges) - 1
+    index: np.ndarray = ((values - edges[0]) * (bins / (edges[-1] - edges[0]))).astype(np.intp)
+    # The maximum value falls on the upper edge.
+    index[index >= bins] = bins - 1
+    return index
+
+
+class ScatterAccumulator:
+    """Collect the plotted points of data that arrives in chunks, within a bounded number of points.
+
+    The points are decimated in row order: of every `2 * stride` consecutive rows, the rows
+    with the smallest and the largest y value are kept, so the envelope of the data survives. Each
+    time more than `max_points` points are kept, the stride doubles and the kept points are
+    decimated again. Until then every point is kept, so small data is plotted unchanged.
+
+    Args:
+        option (GraphOptions): The graph options that select the x and y columns, as in `GraphPlotter.plot`.
+        max_points (int | None, optional): The maximum number of points kept. Defaults to the `max_points`
+            of the options, or DEFAULT_MAX_PLOT_POINTS if it is not set.
+
+    Example:
+        >>> accumulator = ScatterAccumulator(option)
+        >>> for chunk in accumulator.track(chunks):
+        ...     save(chunk)
+        >>> GraphPlotter().plot(accumulator.frame(), save_path, accumulator.options())
+
+    """
+
+    def __init__(self, option: GraphOptions, *, max_points: int | None = None):
+        self.option = option
+        self.x_col_num = option.x_col_num if option.x_col_num else 0
+        self.y_col_num = option.y_col_num if option.y_col_num else 1
+        if max_points is None:
+            max_points = option.max_points if option.max_points is not None else DEFAULT_MAX_PLOT_POINTS
+        self.max_points = max(max_points, 2)
+        self.stride = 1
+        self.__x = np.empty(0)
+        self.__y = np.empty(0)
+
+    def add(self, data: pd.DataFrame) -> None:
+        """Add the points of a chunk.
+
+        Args:
+            data (pd.DataFrame): A chunk of the data.
+
+        """
+        x = pd.to_numeric(data.iloc[:, self.x_col_num], errors="coerce").to_numpy(dtype=float)
+        y = pd.to_numeric(data.iloc[:, self.y_col_num], errors="coerce").to_numpy(dtype=float)
+        keep = self.__minmax(y, 2 * self.stride)
+        self.__x = np.concatenate([self.__x, x[keep]])
+        self.__y = np.concatenate([self.__y, y[keep]])
+        while len(self.__y) > self.max_points:
+            self.stride *= 2
+            keep = self.__minmax(self.__y, 4)
+            self.__x, self.__y = self.__x[keep], self.__y[keep]
+
+    def track(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Yield the chunks unchanged, adding their points as they pass.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The data, chunk by chunk.
+
+        Yields:
+            pd.DataFrame: Each chunk.
+
+        """
+        for chunk in chunks:
+            self.add(chunk)
+            yield chunk
+
+    def frame(self) -> pd.DataFrame:
+        """Return the kept points, with the x values in the first column and the y values in the second."""
+        return pd.DataFrame({0: self.__x, 1: self.__y})
+
+    def options(self) -> GraphOptions:
+        """Return the graph options for plotting `frame`.
+
+        The kept points are plotted as a scatterplot, since their density is not that of the data.
+
+        """
+        return self.option.model_copy(update={"x_col_num": 0, "y_col_num": 1, "plot_mode": "scatter"})
+
+    def __minmax(self, y: np.ndarray, size: int) -> np.ndarray:
+        """Return the sorted positions of the smallest and largest y value in each block of `size` positions."""
+        if not y.size:
+            return np.arange(0)
+        blocks = -(-len(y) // size)
+        padded = np.full(blocks * size, np.nan)
+        padded[:len(y)] = y
+        padded = padded.reshape(blocks, size)
+        offsets = np.arange(blocks) * size
+        lowest = offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+        highest = offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+        keep = np.union1d(lowest, highest)
+        return keep[keep < len(y)]
+
+
 class GraphPlotter:
     """Plot a scatterplot of the given data and save it to the specified path.
 
+    The styled figure is built once per plotter with the object-oriented matplotlib API, and each
+    plot only replaces the data and the labels. Pyplot is not used, so plotters in different
+    threads do not share any state, but one plotter must not be used by several threads at once.
+
+    In the density plot mode, the points are counted per pixel of the axes and the counts are
+    drawn as an image, so the time to draw depends on the size of the figure rather than on the
+    number of points. Pixels without points are left blank.
+
+    If `max_points` of the options is set, larger data is reduced with `decimate_extrema` before
+    it is drawn as a scatterplot.
+
     Args:
         data (pd.DataFrame): The data to be plotted.
         save_path (Path): The path to save the plot.
@@ -52,6 +286,52 @@ class GraphPlotter:
 
     """
 
+    # Records the "plot" stage, the "points_plotted" and "render_cache_hits" counters and the size of the image.
+    recorder: MetricsRecorder = NULL_RECORDER
+    # If set, images of the same values drawn with the same options are taken from this cache.
+    render_cache: RenderCache | None = None
+
+    def __init__(self) -> None:
+        self.__template: tuple[Figure, Axes] | None = None
+
+    def __clear_axes(self) -> tuple[Figure, Axes]:
+        """Return the styled figure and axes without the data of the previous plot, building them on first use."""
+        if self.__template is None:
+            self.__template = self.__build_axes()
+            return self.__template
+        fig, ax = self.__template
+        for artist in [*ax.collections, *ax.images]:
+            artist.remove()
+        # Start from the limits of a new axes, which are kept when there is nothing to draw.
+        ax.relim()
+        ax.set(xlim=(0, 1), ylim=(0, 1))
+        ax.set_autoscale_on(True)
+        # Draw the points of every plot in the first color, as in a new figure.
+        ax.set_prop_cycle(None)
+        return fig, ax
+
+    def __build_axes(self) -> tuple[Figure, Axes]:
+        """Build the figure and axes shared by the plots, with the styling that does not depend on the data."""
+        fig = Figure(figsize=(6.4, 4.8), dpi=100)
+        FigureCanvasAgg(fig)
+        # Adjusted first, since the density image is binned at the pixel size of the axes.
+        fig.subplots_adjust(left=0.2, bottom=0.15)
+        ax = fig.add_subplot()
+
+        # Set the number of ticks (aiming for 4-6 ticks)
+        ax.xaxis.set_major_locator(MaxNLocator(6, integer=False))
+        ax.yaxis.set_major_locator(MaxNLocator(6, integer=False))
+
+        ax.xaxis.set_major_formatter(FuncFormatter(_format_tick))
+        ax.yaxis.set_major_formatter(FuncFormatter(_format_tick))
+
+        ax.spines['left'].set_position('zero')
+        ax.spines['bottom'].set_position('zero')
+
+        ax.spines['right'].set_color('none')
+        ax.spines['top'].set_color('none')
+        return fig, ax
+
     def plot(self, data: pd.DataFrame, save_path: Path, option: GraphOptions) -> None:
         """Plot the data and save the plot to the specified path.
 
@@ -64,38 +344,102 @@ class GraphPlotter:
             option (GraphOptions): The options for configuring the graph such as labels, column numbers, and font size.
 
         """
-        _select_x_col_num = option.x_col_num if option.x_col_num else 0
-        _select_y_col_num = option.y_col_num if option.y_col_num else 1
-        new_df = data if _select_x_col_num == 0 and _select_y_col_num == 1 else data.iloc[:, [_select_x_col_num, _select_y_col_num]]
-        fig, ax = plt.subplots(figsize=(6.4, 4.8), dpi=100)
-        ax.scatter(new_df.iloc[:, 0], new_df.iloc[:, 1])
-
-        if option.title:
-            ax.set_title(option.title, fontsize=option.title_fontsize)
-        if option.xlabel:
-            ax.set_xlabel(option.xlabel, fontsize=option.label_fontsize)
-        if option.ylabel:
-            ax.set_ylabel(option.ylabel, fontsize=option.label_fontsize)
+        with self.recorder.stage("plot"):
+            cache = self.render_cache
+            points = self.__draw(data, save_path, option) if cache is None else self.__draw_cached(cache, data, save_path, option)
+        self.recorder.count("points_plotted", points)
+        # Without an extension, matplotlib appends the one of the default format.
+        self.recorder.output(_image_path(save_path))
 
-        # Set the number of ticks (aiming for 4-6 ticks)
-        ax.xaxis.set_major_locator(MaxNLocator(6, integer=False))
-        ax.yaxis.set_major_locator(MaxNLocator(6, integer=False))
+    def warm_up(self, option: GraphOptions) -> None:
+        """Resolve the fonts and build and draw the figure ahead of the first plot.
 
-        ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f'{x:.1f}' if x % 1 != 0 else f'{int(x)}'))
-        ax.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f'{y:.1f}' if y % 1 != 0 else f'{int(y)}'))
+        Args:
+            option (GraphOptions): The options whose fonts are used.
 
-        ax.spines['left'].set_position('zero')
-        ax.spines['bottom'].set_position('zero')
+        """
+        fig, ax = self.__clear_axes()
+        self.__set_texts(ax, option)
+        fig.canvas.draw()
 
-        ax.spines['right'].set_color('none')
-        ax.spines['top'].set_color('none')
+    def __draw_cached(self, cache: RenderCache, data: pd.DataFrame, save_path: Path, option: GraphOptions) -> int:
+        """Take the image from the render cache, or draw it and store it there."""
+        image_path = _image_path(save_path)
+        key = self.__render_key(cache, _select_columns(data, option), option, image_path.suffix)
+        points = None if key is None else cache.load(key, image_path)
+        if points is not None:
+            self.recorder.count("render_cache_hits")
+            return points
+        # A cached image may be linked here, which must be replaced rather than overwritten.
+        image_path.unlink(missing_ok=True)
+        points = self.__draw(data, save_path, option)
+        if key is not None:
+            cache.store(key, image_path, points)
+        return points
+
+    def __render_key(self, cache: RenderCache, data: pd.DataFrame, option: GraphOptions, suffix: str) -> str | None:
+        """Return the render cache key of the plot, or None if the values are not numeric."""
+        if not all(dtype.kind in "iuf" for dtype in data.dtypes):
+            return None
+        settings = {
+            "options": option.model_dump(mode="json", exclude={"x_col_num", "y_col_num"}),
+            "fonts": resolve_font_families(tuple(option.font_families)),
+            "matplotlib": mpl.__version__,
+            "format": suffix,
+        }
+        return cache.key([data.iloc[:, i].to_numpy() for i in range(data.shape[1])], settings)
+
+    def __draw(self, data: pd.DataFrame, save_path: Path, option: GraphOptions) -> int:
+        """Draw the scatterplot, save it and return the number of points."""
+        new_df = _select_columns(data, option)
+        fig, ax = self.__clear_axes()
+        points = self.__draw_points(ax, new_df, option)
+        self.__set_texts(ax, option)
+
+        fig.savefig(save_path)
+        return points
 
-        ax.tick_params(axis='both', which='major', labelsize=option.scale_fontsize)
-        plt.subplots_adjust(left=0.2, bottom=0.15)
+    def __set_texts(self, ax: Axes, option: GraphOptions) -> None:
+        """Set the texts of the plot and their fonts, which replace those of the previous plot on every text of the figure."""
+        # Set on the texts rather than in rcParams, which would be shared by every figure of the process.
+        families = resolve_font_families(tuple(option.font_families))
+        ax.set_title(option.title or "", fontsize=option.title_fontsize, fontfamily=families)
+        ax.set_xlabel(option.xlabel or "", fontsize=option.label_fontsize, fontfamily=families)
+        ax.set_ylabel(option.ylabel or "", fontsize=option.label_fontsize, fontfamily=families)
+        ax.tick_params(axis='both', which='major', labelsize=option.scale_fontsize, labelfontfamily=families)
 
-        plt.savefig(save_path)
-        plt.close()
-        plt.cla()
+    def __draw_points(self, ax: Axes, data: pd.DataFrame, option: GraphOptions) -> int:
+        """Draw the points as a scatterplot or as a density image, depending on the plot mode, and return their number."""
+        density = len(data) > option.density_threshold if option.plot_mode == "auto" else option.plot_mode == "density"
+        if density:
+            self.__draw_density(ax, data, log=option.log_density)
+        elif option.max_points is not None and len(data) > option.max_points:
+            x, y = _finite_points(data)
+            keep = decimate_extrema(x, y, option.max_points)
+            ax.scatter(x[keep], y[keep])
+            return len(keep)
+        else:
+            ax.scatter(data.iloc[:, 0], data.iloc[:, 1])
+        return len(data)
+
+    def __draw_density(self, ax: Axes, data: pd.DataFrame, *, log: bool) -> None:
+        """Draw the number of points in each pixel of the axes as an image."""
+        x, y = _finite_points(data)
+        if not x.size:
+            return
+        width, height = (max(int(size), 1) for size in ax.get_window_extent().size)
+        x_edges = _bin_edges(x, width)
+        y_edges = _bin_edges(y, height)
+        # Faster than np.histogram2d, which searches the edges of every point.
+        counts = np.bincount(_bin_index(y, y_edges) * width + _bin_index(x, x_edges), minlength=width * height).reshape(height, width)
+        ax.imshow(
+            np.ma.masked_equal(counts, 0),
+            origin="lower",
+            extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+            aspect="auto",
+            interpolation="nearest",
+            norm=LogNorm() if log else None,
+        )
 
     def create_options(self, invoice_obj: InvoiceJson) -> GraphOptions:
         """Create and return a GraphOptions object based on the provided invoice JSON file.
@@ -122,3 +466,128 @@ class GraphPlotter:
             label_fontsize=18,
             scale_fontsize=12,
         )
+
+
+class PlotResult(NamedTuple):
+    """The outcome of rendering one image in a `RenderPool`.
+
+    Attributes:
+        save_path (Path): The path of the image.
+        points (int): The number of points drawn.
+        error (BaseException | None): The error raised while rendering, or None if the image was saved.
+
+    """
+
+    save_path: Path
+    points: int = 0
+    error: BaseException | None = None
+
+
+class RenderPool:
+    """Render plots in a pool of worker processes, so several images are drawn at once.
+
+    The workers are started when the pool is created and warm up their plotter with
+    `GraphPlotter.warm_up`, so the first plots do not pay for loading the fonts and building the
+    figure. Only the x and y columns are sent to the workers, as float arrays.
+
+    Args:
+        max_workers (int | None, optional): The maximum number of worker processes. If None, the number of CPUs available to the process is used.
+        option (GraphOptions | None, optional): The options whose fonts the workers load. Defaults to None, the default options.
+        render_cache (RenderCache | None, optional): The render cache of the workers. Defaults to None.
+
+    Example:
+        >>> with RenderPool(2) as pool:
+        ...     pool.submit(data, Path("a.png"), option)
+        ...     pool.submit(data, Path("b.png"), option)
+        ...     results = pool.collect()
+
+    """
+
+    def __init__(self, max_workers: int | None = None, *, option: GraphOptions | None = None, render_cache: RenderCache | None = None):
+        self.max_workers = max_workers or available_cpus()
+        self.__executor = ProcessPoolExecutor(
+            self.max_workers, initializer=_start_renderer, initargs=(option or GraphOptions(), render_cache),
+        )
+        self.__pending: list[tuple[Path, Future[tuple[Path, int]]]] = []
+        # The executor starts a worker for each task submitted while no worker is idle.
+        for _ in range(self.max_workers):
+            self.__executor.submit(int)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def submit(self, data: pd.DataFrame, save_path: Path, option: GraphOptions) -> None:
+        """Schedule a plot, with the same arguments as `GraphPlotter.plot`.
+
+        Args:
+            data (pd.DataFrame): The data to be plotted.
+            save_path (Path): The path where the plot image will be saved.
+            option (GraphOptions): The options of the graph.
+
+        """
+        x_col_num = option.x_col_num if option.x_col_num else 0
+        y_col_num = option.y_col_num if option.y_col_num else 1
+        x = pd.to_numeric(data.iloc[:, x_col_num], errors="coerce").to_numpy(dtype=float)
+        y = pd.to_numeric(data.iloc[:, y_col_num], errors="coerce").to_numpy(dtype=float)
+        plot_option = option.model_copy(update={"x_col_num": 0, "y_col_num": 1})
+        self.__pending.append((Path(save_path), self.__executor.submit(_render, x, y, Path(save_path), plot_option)))
+
+    def collect(self) -> list[PlotResult]:
+        """Wait for the scheduled plots.
+
+        Returns:
+            list[PlotResult]: The result of each plot, in the order of submission. A failed plot
+                has its error instead of raising it, so the other plots are still returned.
+
+        """
+        results = []
+        for save_path, future in self.__pending:
+            try:
+                image_path, points = future.result()
+            except Exception as e:
+                results.append(PlotResult(save_path, error=e))
+            else:
+                results.append(PlotResult(image_path, points))
+        self.__pending.clear()
+        return results
+
+    def render(self, jobs: Iterable[tuple[pd.DataFrame, Path, GraphOptions]]) -> list[PlotResult]:
+        """Render the plots and wait for them.
+
+        Args:
+            jobs (Iterable[tuple[pd.DataFrame, Path, GraphOptions]]): The arguments of each plot, as for `submit`.
+
+        Returns:
+            list[PlotResult]: The result of each plot, in order.
+
+        """
+        for data, save_path, option in jobs:
+            self.submit(data, save_path, option)
+        return self.collect()
+
+    def close(self) -> None:
+        """Wait for the scheduled plots and stop the workers."""
+        self.__executor.shutdown()
+
+
+@lru_cache(maxsize=1)
+def _render_plotter() -> GraphPlotter:
+    """Return the plotter of a render worker process."""
+    return GraphPlotter()
+
+
+def _start_renderer(option: GraphOptions, render_cache: RenderCache | None) -> None:
+    plotter = _render_plotter()
+    plotter.render_cache = render_cache
+    plotter.warm_up(option)
+
+
+def _render(x: np.ndarray, y: np.ndarray, save_path: Path, option: GraphOptions) -> tuple[Path, int]:
+    """Plot the points in a render worker and return the path of the image and the number of points drawn."""
+    plotter = _render_plotter()
+    plotter.recorder = recorder = MetricsRecorder()
+    plotter.plot(pd.DataFrame({0: x, 1: y}, copy=False), save_path, option)
+    return _image_path(save_path), recorder.counters["points_plotted"]
@@ -1,68 +1,862 @@
 from __future__ import annotations
 
+import bz2
+import codecs
+import gzip
+import io
+import lzma
+import math
+import mmap
 import re
-import statistics
-from collections import Counter
+from array import array
+from collections import Counter, deque
+from collections.abc import Sequence as SequenceABC
+from enum import Enum
+from itertools import islice
 from pathlib import Path
-from typing import Sequence
+from typing import Iterable, Iterator, NamedTuple, Sequence, overload
 
+import numpy as np
 import pandas as pd
+from chardet import UniversalDetector
+from charset_normalizer import detect
 from rdetoolkit.exceptions import StructuredError
 from rdetoolkit.rde2util import CharDecEncoding, read_from_json_file
 
+from modules.cache_handler import MeasurementCache, content_digest
+from modules.metrics_handler import NULL_RECORDER, MetricsRecorder
+
+try:
+    import zstandard
+except ImportError:
+    # zstd-compressed input files are only supported when zstandard is installed.
+    zstandard = None
+
+# Number of leading lines inspected when guessing the separator of a section.
+MAX_SNIFF_LINES = 1000
+# Maximum number of characters sampled to detect a separator.
+MAX_SNIFF_CHARS = 1 << 20
+# Separators counted by SeparatorSniffer; they cover the separators of both parsers.
+SNIFF_CANDIDATES = ("\t", "|", ",", ";", ":", " ")
+# Number of measurement lines converted into a DataFrame at a time in streaming mode.
+DEFAULT_CHUNK_SIZE = 100_000
+# Number of characters split into lines at a time when iterating over decoded text.
+TEXT_BLOCK_SIZE = 1 << 20
+# Number of leading bytes of a memory-mapped file used to detect its encoding.
+ENCODING_SAMPLE_SIZE = 1 << 20
+# Number of bytes of a memory-mapped file scanned for line breaks at a time.
+INDEX_BLOCK_SIZE = 1 << 26
+# Number of lines decoded at a time when iterating over a memory-mapped file.
+MAPPED_BLOCK_LINES = 10_000
+# Leading bytes of the compressed formats that are decompressed transparently.
+COMPRESSION_MAGIC: dict[str, re.Pattern[bytes]] = {
+    "gzip": re.compile(rb"\x1f\x8b\x08"),
+    "bz2": re.compile(rb"BZh[1-9](?:1AY&SY|\x17rE8P\x90)"),
+    "xz": re.compile(rb"\xfd7zXZ\x00"),
+    "zstd": re.compile(rb"\x28\xb5\x2f\xfd"),
+}
+
+
+def detect_encoding(contents: bytes) -> str:
+    """Detect the encoding of the given file contents.
+
+    This follows `CharDecEncoding.detect_text_file_encoding` of rdetoolkit, but works on
+    bytes that were already read instead of reading the file again.
+
+    Args:
+        contents (bytes): The raw contents of a text file.
+
+    Returns:
+        str: The detected encoding.
+
+    """
+    detected = detect(contents)["encoding"]
+    enc = str(detected).replace("-", "_").lower() if detected is not None else ""
+    if enc not in CharDecEncoding.USUAL_ENCs:
+        detector = UniversalDetector()
+        try:
+            for line in contents.splitlines(keepends=True):
+                detector.feed(line)
+                if detector.done:
+                    break
+        finally:
+            detector.close()
+        detected = detector.result["encoding"]
+        enc = detected.replace("-", "_").lower() if detected else ""
+    if enc == "shift_jis":
+        enc = "cp932"
+    return enc
+
+
+def detect_compression(file_path: Path) -> str | None:
+    """Detect the compression format of a file from its leading bytes.
+
+    Args:
+        file_path (Path): The path to the file.
+
+    Returns:
+        str | None: "gzip", "bz2", "xz" or "zstd", or None if the file is not compressed.
+
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(10)
+    return next((name for name, magic in COMPRESSION_MAGIC.items() if magic.match(head)), None)
+
+
+def open_decompressed(file_path: Path, compression: str) -> gzip.GzipFile | bz2.BZ2File | lzma.LZMAFile | io.BufferedReader:
+    """Open a compressed file as a stream of its decompressed bytes.
+
+    zstd requires the optional `zstandard` package.
+
+    Args:
+        file_path (Path): The path to the file.
+        compression (str): The compression format, as returned by `detect_compression`.
+
+    Returns:
+        gzip.GzipFile | bz2.BZ2File | lzma.LZMAFile | io.BufferedReader: The decompressed stream.
+
+    Raises:
+        StructuredError: If the file is zstd-compressed and `zstandard` is not installed.
+
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(file_path, "rb")
+    if compression == "bz2":
+        return bz2.BZ2File(file_path, "rb")
+    if compression == "xz":
+        return lzma.LZMAFile(file_path, "rb")
+    if zstandard is None:
+        emsg = "zstd-compressed input files require the zstandard package"
+        raise StructuredError(emsg, 1)
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(Path(file_path).open("rb"), read_across_frames=True, closefd=True))
+
+
+def read_contents(file_path: Path) -> bytes:
+    """Read the contents of a file, decompressing it if it is compressed.
+
+    Args:
+        file_path (Path): The path to the file.
+
+    Returns:
+        bytes: The (decompressed) contents.
+
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        return Path(file_path).read_bytes()
+    with open_decompressed(file_path, compression) as f:
+        return f.read()
+
+
+class IngestedFile:
+    """Text file that is read, decoded and scanned only once.
+
+    The encoding is detected from the bytes read for decoding, and the line containing
+    `search_char` is located in the decoded text, so the components sharing this object
+    never touch the file again. Compressed files are decompressed in memory.
+
+    Args:
+        file_path (Path): The path to the text file.
+        search_char (str | None, optional): A string whose first line number is recorded. Defaults to None.
+        recorder (MetricsRecorder, optional): The recorder of the "detect_encoding" stage. Defaults to NULL_RECORDER.
+        hash_contents (bool, optional): Whether to compute `digest` from the bytes read. Defaults to False.
+
+    Attributes:
+        encoding (str): The detected encoding.
+        text (str): The decoded contents, with all line endings normalized to line feeds.
+        search_char_line_number (int | None): The line number (1-based) where `search_char` first
+            appears, or None if it is not found or not given.
+        digest (str | None): The `content_digest` of the (decompressed) contents, or None if `hash_contents` is False.
+
+    """
+
+    def __init__(self, file_path: Path, *, search_char: str | None = None, recorder: MetricsRecorder = NULL_RECORDER, hash_contents: bool = False):
+        self.file_path = file_path
+        contents = read_contents(file_path)
+        self.digest = content_digest(contents) if hash_contents else None
+        with recorder.stage("detect_encoding"):
+            self.encoding = detect_encoding(contents)
+        text = contents.decode(self.encoding)
+        del contents
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        self.text = text
+        self.search_char = search_char
+        self.search_char_line_number = self.find_line_number(search_char) if search_char else None
+
+    def find_line_number(self, search_char: str) -> int | None:
+        """Retrieve the line number of the first occurrence of the specified string.
+
+        Args:
+            search_char (str): The string to search for.
+
+        Returns:
+            int | None: The line number (1-based) where the string is first found, or None if not found.
+
+        """
+        pos = self.text.find(search_char)
+        return self.text.count("\n", 0, pos) + 1 if pos != -1 else None
+
+    def read_lines(self) -> list[str]:
+        """Return all lines of the file.
+
+        Returns:
+            list[str]: The lines without their trailing newline characters.
+
+        """
+        lines = self.text.split("\n")
+        return lines[:-1] if self.text.endswith("\n") or not self.text else lines
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the lines of the file one at a time, splitting the text block by block.
+
+        Yields:
+            str: Each line without its trailing newline characters.
+
+        """
+        text, pos, size = self.text, 0, len(self.text)
+        while pos < size:
+            cut = text.find("\n", min(pos + TEXT_BLOCK_SIZE, size) - 1)
+            cut = size if cut == -1 else cut
+            yield from text[pos:cut].split("\n")
+            pos = cut + 1
+
+
+class StreamedFile:
+    """Compressed text file that is decompressed and decoded as a stream.
+
+    Neither the decompressed bytes nor the decoded text are held as a whole, in memory or on
+    disk. The encoding is detected from the first `ENCODING_SAMPLE_SIZE` decompressed bytes,
+    and each pass over the lines decompresses the file again. Line endings are normalized to
+    line feeds, as in `IngestedFile`.
+
+    Args:
+        file_path (Path): The path to the compressed text file.
+        search_char (str | None, optional): A string whose first line number is recorded. Defaults to None.
+        recorder (MetricsRecorder, optional): The recorder of the "detect_encoding" stage. Defaults to NULL_RECORDER.
+
+    Attributes:
+        compression (str): The compression format, as returned by `detect_compression`.
+        encoding (str): The detected encoding.
+        search_char_line_number (int | None): The line number (1-based) where `search_char` first
+            appears, or None if it is not found or not given.
+        digest (None): Always None, since the contents are never held as a whole.
+
+    Raises:
+        ValueError: If the file is not compressed.
+
+    """
+
+    def __init__(self, file_path: Path, *, search_char: str | None = None, recorder: MetricsRecorder = NULL_RECORDER):
+        self.file_path = file_path
+        compression = detect_compression(file_path)
+        if compression is None:
+            emsg = f"{file_path} is not compressed"
+            raise ValueError(emsg)
+        self.compression = compression
+        self.digest = None
+        with recorder.stage("detect_encoding"), open_decompressed(file_path, compression) as f:
+            self.encoding = detect_encoding(f.read(ENCODING_SAMPLE_SIZE))
+        self.search_char = search_char
+        self.search_char_line_number = self.find_line_number(search_char) if search_char else None
+
+    def find_line_number(self, search_char: str) -> int | None:
+        """Retrieve the line number of the first occurrence of the specified string.
+
+        Args:
+            search_char (str): The string to search for.
+
+        Returns:
+            int | None: The line number (1-based) where the string is first found, or None if not found.
+
+        """
+        return next((number for number, line in enumerate(self.iter_lines(), start=1) if search_char in line), None)
+
+    def read_lines(self) -> list[str]:
+        """Return all lines of the file.
+
+        Returns:
+            list[str]: The lines without their trailing newline characters.
+
+        """
+        return list(self.iter_lines())
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the lines of the file one at a time, decompressing and decoding it block by block.
+
+        Yields:
+            str: Each line without its trailing newline characters.
+
+        """
+        with io.TextIOWrapper(open_decompressed(self.file_path, self.compression), encoding=self.encoding, newline=None) as f:
+            rest = ""
+            for block in iter(lambda: f.read(TEXT_BLOCK_SIZE), ""):
+                lines = (rest + block).split("\n")
+                rest = lines.pop()
+                yield from lines
+            if rest:
+                yield rest
+
+
+class MappedFile(SequenceABC):
+    """Text file accessed through a memory map and an index of line offsets.
+
+    Instead of decoding the file into Python strings, the raw bytes are memory-mapped and
+    the start offset of every line is stored in a numpy uint64 array. Lines are decoded
+    only when they are accessed, so the page cache holds the contents and any line can be
+    reached in O(1). The encoding is detected from the first `ENCODING_SAMPLE_SIZE` bytes.
+
+    Only encodings in which a line break is the single byte 0x0A (e.g. utf_8, cp932, euc_jp)
+    and files whose lines end with LF or CRLF can be indexed; a ValueError is raised otherwise.
+
+    Args:
+        file_path (Path): The path to the text file.
+        search_char (str | None, optional): A string whose first line number is recorded. Defaults to None.
+        recorder (MetricsRecorder, optional): The recorder of the "detect_encoding" stage. Defaults to NULL_RECORDER.
+        hash_contents (bool, optional): Whether to compute `digest` from the mapped bytes. Defaults to False.
+
+    Attributes:
+        encoding (str): The detected encoding.
+        offsets (np.ndarray): The byte offset of the start of each line, followed by the file size.
+        search_char_line_number (int | None): The line number (1-based) where `search_char` first
+            appears, or None if it is not found or not given.
+        digest (str | None): The `content_digest` of the mapped bytes, or None if `hash_contents` is False.
+
+    """
+
+    def __init__(self, file_path: Path, *, search_char: str | None = None, recorder: MetricsRecorder = NULL_RECORDER, hash_contents: bool = False):
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.digest = content_digest(self._map) if hash_contents else None
+        try:
+            with recorder.stage("detect_encoding"):
+                self.encoding = detect_encoding(self._map[:ENCODING_SAMPLE_SIZE])
+            # The BOM is skipped through the first offset, so each line is decoded as plain utf_8.
+            self.__line_encoding = "utf_8" if self.encoding == "utf_8_sig" else self.encoding
+            if "a\r\n".encode(self.__line_encoding) != b"a\r\n":
+                emsg = f"Line breaks of {self.encoding} cannot be indexed by byte"
+                raise ValueError(emsg)
+            self.offsets = self.__index_lines()
+        except (ValueError, LookupError):
+            self.close()
+            raise
+        self.search_char = search_char
+        self.search_char_line_number = self.find_line_number(search_char) if search_char else None
+
+    def __index_lines(self) -> np.ndarray:
+        size = len(self._map)
+        first = len(codecs.BOM_UTF8) if self.encoding == "utf_8_sig" and self._map[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+        starts = [np.full(1, first, dtype=np.uint64)]
+        lone_carriage_returns = 0
+        for lo in range(0, size, INDEX_BLOCK_SIZE):
+            line_feeds, carriage_returns = self.__scan_block(lo)
+            starts.append(line_feeds.astype(np.uint64) + np.uint64(lo + 1))
+            lone_carriage_returns += carriage_returns
+        if lone_carriage_returns:
+            emsg = "Lines ending with a lone carriage return cannot be indexed"
+            raise ValueError(emsg)
+        offsets = np.concatenate(starts)
+        return offsets if offsets[-1] == size else np.append(offsets, np.uint64(size))
+
+    def __scan_block(self, lo: int) -> tuple[np.ndarray, int]:
+        # The numpy views of the map are released on return, so the map can be closed afterwards.
+        block = np.frombuffer(self._map, dtype=np.uint8)[lo:lo + INDEX_BLOCK_SIZE + 1]
+        body = block[:INDEX_BLOCK_SIZE]
+        is_cr = body == ord("\r")
+        crlf = is_cr[:len(block) - 1] & (block[1:] == ord("\n"))
+        return np.flatnonzero(body == ord("\n")), int(np.count_nonzero(is_cr)) - int(np.count_nonzero(crlf))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            lines = self.text(start, stop).split("\n") if stop > start else []
+            return lines[::step] if step != 1 else lines
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            emsg = "line index out of range"
+            raise IndexError(emsg)
+        return self.text(index, index + 1)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_lines()
+
+    def text(self, start: int, stop: int) -> str:
+        """Decode the lines in the range [start, stop) at once.
+
+        Args:
+            start (int): The first line number.
+            stop (int): The line number after the last line.
+
+        Returns:
+            str: The lines joined by line feeds, without a trailing line break.
+
+        """
+        text = self._map[int(self.offsets[start]):int(self.offsets[stop])].decode(self.__line_encoding)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        return text[:-1] if text.endswith("\n") else text
+
+    def find_line_number(self, search_char: str) -> int | None:
+        """Retrieve the line number of the first occurrence of the specified string.
+
+        Args:
+            search_char (str): The string to search for.
+
+        Returns:
+            int | None: The line number (1-based) where the string is first found, or None if not found.
+
+        """
+        needle = search_char.encode(self.__line_encoding)
+        pos = self._map.find(needle)
+        while pos != -1:
+            line_number = int(np.searchsorted(self.offsets, pos, side="right"))
+            # A match may start inside a multibyte character, so confirm it on the decoded line.
+            if search_char in self[line_number - 1]:
+                return line_number
+            pos = self._map.find(needle, pos + 1)
+        return None
+
+    def read_lines(self) -> Sequence[str]:
+        """Return all lines of the file; they are decoded on access.
+
+        Returns:
+            Sequence[str]: The lines without their trailing newline characters.
+
+        """
+        return self
+
+    def iter_lines(self, start: int = 0) -> Iterator[str]:
+        """Yield the lines of the file one at a time, decoding them block by block.
+
+        Args:
+            start (int, optional): The line number of the first line. Defaults to 0.
+
+        Yields:
+            str: Each line without its trailing newline characters.
+
+        """
+        for lo in range(start, len(self), MAPPED_BLOCK_LINES):
+            yield from self.text(lo, min(lo + MAPPED_BLOCK_LINES, len(self))).split("\n")
+
+    def open_stream(self, start: int = 0) -> MappedLineStream:
+        """Return a stream of the lines from the given line number.
+
+        Args:
+            start (int, optional): The line number of the first line. Defaults to 0.
+
+        Returns:
+            MappedLineStream: The stream of lines.
+
+        """
+        return MappedLineStream(self, start)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._map.close()
+
 
 class FileOperator:
+    """Class for reading the lines of a text file.
+
+    Args:
+        file_path (Path): The path to the file.
+        source (IngestedFile | StreamedFile | None, optional): The already ingested contents of `file_path`. If None,
+            the file is ingested on first use. Defaults to None.
+
+    """
 
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, *, source: IngestedFile | StreamedFile | None = None):
         self.file_path = file_path
+        self.source = source
 
-    def read(self) -> list[str]:
+    def read(self) -> Sequence[str]:
         """Read the content of a text file and return it as a list of strings, with each string representing a line from the file.
 
         Returns:
-            list[str]: A list of strings, each representing a line from the file.
+            Sequence[str]: A list of strings, each representing a line from the file.
+
+        """
+        return self.__get_source().read_lines()
+
+    def iter_lines(self) -> Iterator[str]:
+        """Read the content of a text file lazily, yielding one line at a time.
+
+        Unlike `read`, no list of all lines is built, so this is suitable for very large files.
+
+        Yields:
+            str: Each line of the file without its trailing newline characters.
+
+        """
+        yield from self.__get_source().iter_lines()
+
+    def open_stream(self, start: int = 0) -> LineStream:
+        """Return a stream of the lines of the file from the given line number.
+
+        Args:
+            start (int, optional): The line number of the first line. Defaults to 0.
+
+        Returns:
+            LineStream: The stream of lines.
+
+        """
+        return LineStream(islice(self.iter_lines(), start, None), start=start)
+
+    def __get_source(self) -> IngestedFile | StreamedFile:
+        if self.source is None:
+            self.source = IngestedFile(self.file_path)
+        return self.source
+
+
+class MappedFileOperator(FileOperator):
+    """Variant of `FileOperator` that reads the file through a memory map.
+
+    `read` returns a `MappedFile`, a sequence whose lines are decoded on access, so no
+    list of Python strings is built and any line number is reached in O(1).
+
+    Args:
+        file_path (Path): The path to the file.
+        source (MappedFile | None, optional): The already mapped `file_path`. If None,
+            the file is mapped on first use. Defaults to None.
+
+    """
+
+    def __init__(self, file_path: Path, *, source: MappedFile | None = None):
+        super().__init__(file_path)
+        self.mapped = source
+
+    def read(self) -> MappedFile:
+        """Return the lines of the file, decoded on access.
+
+        Returns:
+            MappedFile: The lines of the file.
+
+        """
+        return self.__get_mapped()
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the lines of the file one at a time.
+
+        Yields:
+            str: Each line of the file without its trailing newline characters.
+
+        """
+        yield from self.__get_mapped().iter_lines()
+
+    def open_stream(self, start: int = 0) -> MappedLineStream:
+        """Return a stream of the lines of the file from the given line number in O(1).
+
+        Args:
+            start (int, optional): The line number of the first line. Defaults to 0.
+
+        Returns:
+            MappedLineStream: The stream of lines.
+
+        """
+        return self.__get_mapped().open_stream(start)
+
+    def __get_mapped(self) -> MappedFile:
+        if self.mapped is None:
+            self.mapped = MappedFile(self.file_path)
+        return self.mapped
+
+
+class LineStream:
+    """Lazily consumed sequence of lines with a bounded look-ahead buffer.
+
+    The parsers need to inspect the upcoming lines (e.g. to detect the separator) before
+    consuming them. This class keeps only the peeked lines in memory and tracks the line
+    number of the next line to be returned.
+
+    Args:
+        lines (Iterable[str]): The lines to be consumed.
+        start (int, optional): The line number of the first line. Defaults to 0.
+
+    Example:
+        >>> stream = LineStream(["a", "b", "c"])
+        >>> stream.peek(2)
+        ['a', 'b']
+        >>> next(stream), stream.position
+        ('a', 1)
+
+    """
+
+    def __init__(self, lines: Iterable[str], start: int = 0):
+        self._lines = iter(lines)
+        self._buffer: deque[str] = deque()
+        self.position = start
+
+    def __iter__(self) -> LineStream:
+        return self
+
+    def __next__(self) -> str:
+        line = self._buffer.popleft() if self._buffer else next(self._lines)
+        self.position += 1
+        return line
+
+    def peek(self, count: int) -> list[str]:
+        """Return up to `count` upcoming lines without consuming them.
+
+        Args:
+            count (int): The maximum number of lines to return.
+
+        Returns:
+            list[str]: The upcoming lines.
+
+        """
+        while len(self._buffer) < count:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer.append(line)
+        return list(islice(self._buffer, count))
+
+    def take(self, count: int) -> list[str]:
+        """Consume and return up to `count` lines.
+
+        Args:
+            count (int): The maximum number of lines to return.
+
+        Returns:
+            list[str]: The consumed lines. An empty list means the stream is exhausted.
+
+        """
+        lines = [self._buffer.popleft() for _ in range(min(count, len(self._buffer)))]
+        lines.extend(islice(self._lines, count - len(lines)))
+        self.position += len(lines)
+        return lines
+
+    def take_text(self, count: int) -> tuple[str, int]:
+        """Consume up to `count` lines and return them joined by line feeds.
+
+        Args:
+            count (int): The maximum number of lines to consume.
+
+        Returns:
+            tuple[str, int]: The joined lines and the number of lines consumed.
+
+        """
+        lines = self.take(count)
+        return "\n".join(lines), len(lines)
+
+
+class MappedLineStream(LineStream):
+    """Stream over the lines of a `MappedFile`.
+
+    `take_text` decodes the byte range of the requested lines at once, so no Python
+    string is created per line.
+
+    Args:
+        source (MappedFile): The mapped file.
+        start (int, optional): The line number of the first line. Defaults to 0.
+
+    """
+
+    def __init__(self, source: MappedFile, start: int = 0):
+        super().__init__(source.iter_lines(start), start)
+        self._source = source
+
+    def take_text(self, count: int) -> tuple[str, int]:
+        """Consume up to `count` lines and return them joined by line feeds.
+
+        Args:
+            count (int): The maximum number of lines to consume.
+
+        Returns:
+            tuple[str, int]: The joined lines and the number of lines consumed.
 
         """
-        enc = CharDecEncoding.detect_text_file_encoding(self.file_path)
-        with open(self.file_path, encoding=enc) as f:
-            return [line.rstrip("\r\n") for line in f.readlines()]
+        head = [self._buffer.popleft() for _ in range(min(count, len(self._buffer)))]
+        start = self.position + len(head)
+        stop = max(start, min(self.position + count, len(self._source)))
+        if stop == start:
+            self.position = start
+            return "\n".join(head), len(head)
+        self._lines = self._source.iter_lines(stop)
+        self.position = stop
+        return "\n".join([*head, self._source.text(start, stop)]), len(head) + stop - start
+
+
+class SniffResult(NamedTuple):
+    """The separator detected by `SeparatorSniffer` and how consistently it splits the sample.
+
+    Attributes:
+        separator (str | None): The detected separator, or None if no candidate occurs in the sample.
+        confidence (float): The share of the non-blank sampled lines that have the most common
+            field count of the separator, from 0.0 to 1.0.
+
+    """
+
+    separator: str | None
+    confidence: float
+
+
+class SeparatorSniffer:
+    """Detect separators from a bounded sample of lines, counting each line only once.
+
+    Every sampled line is scanned once for all candidate separators, and the counts are
+    cached by line number and sampled length, so the header and measurement parsers can sniff overlapping
+    samples of the same file without scanning the lines again. The sample is limited to
+    `max_lines` lines and `max_chars` characters, and longer lines are cut at the limit,
+    so a single very long line cannot make sniffing as expensive as parsing.
+
+    Args:
+        candidates (Sequence[str], optional): The separators counted on each line. Defaults to SNIFF_CANDIDATES.
+        max_lines (int, optional): The maximum number of lines in a sample. Defaults to MAX_SNIFF_LINES.
+        max_chars (int, optional): The maximum number of characters in a sample. Defaults to MAX_SNIFF_CHARS.
+
+    """
+
+    def __init__(self, candidates: Sequence[str] = SNIFF_CANDIDATES, *, max_lines: int = MAX_SNIFF_LINES, max_chars: int = MAX_SNIFF_CHARS):
+        self.candidates = tuple(candidates)
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self.__counts: dict[tuple[int, int], tuple[int, tuple[int, ...]] | None] = {}
+
+    def sniff(self, lines: Iterable[str], separators: Sequence[str], *, start: int = 0) -> SniffResult:
+        """Detect which of the given separators is used in the lines.
 
+        The separator whose most common field count is shared by the most lines wins;
+        ties go to the separator listed first.
 
-def detect_separator(lines: list[str], separators: Sequence[str]) -> str | None:
+        Args:
+            lines (Iterable[str]): The lines to sample, starting at line number `start`.
+            separators (Sequence[str]): The possible separators, in order of priority. They must be candidates.
+            start (int, optional): The line number of the first line, used as the cache key. Defaults to 0.
+
+        Returns:
+            SniffResult: The detected separator and the confidence of the detection.
+
+        """
+        indices = [self.candidates.index(s) for s in separators]
+        field_counts: list[Counter[int]] = [Counter() for _ in separators]
+        sampled = 0
+        for counts in self.__sample(lines, start):
+            sampled += 1
+            for field_counter, i in zip(field_counts, indices):
+                if counts[i]:
+                    field_counter[counts[i] + 1] += 1
+
+        scores = {s: counter.most_common(1)[0][1] for s, counter in zip(separators, field_counts) if counter}
+        if not scores:
+            return SniffResult(None, 0.0)
+        separator = max(scores, key=lambda k: scores[k])
+        return SniffResult(separator, scores[separator] / sampled)
+
+    def __sample(self, lines: Iterable[str], start: int) -> Iterator[tuple[int, ...]]:
+        """Yield the separator counts of the non-blank lines in the sample."""
+        budget = self.max_chars
+        for number, line in enumerate(islice(lines, self.max_lines), start):
+            # A line cut by a smaller remaining budget in another sample has different counts.
+            key = (number, min(len(line), budget))
+            if key not in self.__counts:
+                self.__counts[key] = self.__count(line[:budget])
+            entry = self.__counts[key]
+            if entry is not None:
+                length, counts = entry
+                budget -= length
+                yield counts
+            if budget <= 0:
+                break
+
+    def __count(self, line: str) -> tuple[int, tuple[int, ...]] | None:
+        if not line.strip():
+            return None
+        return len(line), tuple(line.count(s) for s in self.candidates)
+
+
+def detect_separator(lines: Sequence[str], separators: Sequence[str]) -> str | None:
     """Detect the separator used in the given lines.
 
     Args:
-        lines (list[str]): The lines to check for the separator.
+        lines (Sequence[str]): The lines to check for the separator.
         separators (Sequence[str]): A sequence of possible separators to detect.
 
     Returns:
         str | None: The detected separator or None if no separator is found.
 
     """
-    max_lines: int = 1000
-    delimiter_field_counts: dict[str, list[int]] = {s: [] for s in separators}
-    for line in lines[:max_lines]:
-        stripped_line = line.strip()
-        if not stripped_line:
-            continue
-        for s in separators:
-            fields = line.split(s)
-            if len(fields) > 1:
-                delimiter_field_counts[s].append(len(fields))
-
-    delimiter_scores: dict[str, float] = {}
-    for d, counts in delimiter_field_counts.items():
-        if not counts:
-            continue
-        try:
-            field_counts_counter = Counter(counts)
-            _, mode_count = field_counts_counter.most_common(1)[0]
-            delimiter_scores[d] = mode_count
-        except statistics.StatisticsError:
-            delimiter_scores[d] = float('inf')
-            continue
+    return SeparatorSniffer(separators).sniff(lines, separators).separator
+
+
+class LineKind(Enum):
+    """The kind of a line in the input file, as tagged by `classify_line`.
+
+    Attributes:
+        COMMENT: A blank line or a line starting with "#", "!" or ";".
+        MARKER: A line starting with a measurement section marker such as "[Data]" or "(measurement)".
+        SECTION: A line containing any other bracketed text, such as "[Header]".
+        HEADER: A line without brackets that contains the word "header".
+        NUMERIC: A line of numbers separated by commas, semicolons or whitespace.
+        TEXT: Any other line, such as a key/value pair or a data line with text cells.
+
+    """
+
+    COMMENT = "comment"
+    MARKER = "marker"
+    SECTION = "section"
+    HEADER = "header"
+    NUMERIC = "numeric"
+    TEXT = "text"
+
+
+_COMMENT_PREFIXES = ("#", "!", ";")
+# A number as accepted by float(): an optional sign, a decimal with an optional exponent, inf or nan.
+_NUMBER_WORD = r"[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|(?i:inf(?:inity)?|nan))"
+_NUMERIC_LINE = re.compile(rf"{_NUMBER_WORD}(?:[,\s;]+{_NUMBER_WORD})*")
+_DIGIT = re.compile(r"\d")
+_BRACKETED = re.compile(r"[\[\(\{].*?[\]\)\}]")
+_MARKER = re.compile(r"[\[({]\s*(data|measurement)\s*[\])}]", re.IGNORECASE)
+_HEADER_WORD = re.compile(r"header", re.IGNORECASE)
+_NUMERIC_CELL = re.compile(_NUMBER_WORD)
+_INTEGER_CELL = re.compile(r"[+-]?\d+")
+# Integers from -_INT64_LIMIT up to, but excluding, _INT64_LIMIT fit in int64.
+_INT64_LIMIT = 1 << 63
+_ALPHA_NAME = re.compile(r"^[A-Za-z]+$")
+
+
+def classify_line(line: str) -> LineKind:
+    """Tag a line with its kind using precompiled patterns.
+
+    The checks run from the cheapest to the most expensive and stop at the first match,
+    so each line is classified once for both `HeaderParser` and `MeasurementParser`.
+
+    Args:
+        line (str): The line to classify.
+
+    Returns:
+        LineKind: The kind of the line.
+
+    Example:
+        >>> classify_line("[Data]")
+        <LineKind.MARKER: 'marker'>
+        >>> classify_line("1000, 0.01")
+        <LineKind.NUMERIC: 'numeric'>
 
-    return max(delimiter_scores, key=lambda k: delimiter_scores[k]) if delimiter_scores else None
+    """
+    stripped = line.strip()
+    if not stripped or line.startswith(_COMMENT_PREFIXES):
+        return LineKind.COMMENT
+    if _NUMERIC_LINE.fullmatch(stripped) and _DIGIT.search(stripped):
+        # A line of only inf and nan is more likely a word than a measurement.
+        return LineKind.NUMERIC
+    if _BRACKETED.search(line):
+        return LineKind.MARKER if _MARKER.match(line) else LineKind.SECTION
+    if _HEADER_WORD.search(line):
+        return LineKind.HEADER
+    return LineKind.TEXT
 
 
 class HeaderParser:
@@ -73,27 +867,38 @@ class HeaderParser:
         self.header: list[tuple[str, str]] = []
         self.end_line: int = 0
         self.sep: str | None = None
+        self.sniff_result = SniffResult(None, 0.0)
         self.user_mesurement_start_number = user_mesurement_start_number
 
-    def parse(self, data: list[str]) -> list[tuple[str, str]]:
+    def parse(self, data: Sequence[str] | LineStream, *, sniffer: SeparatorSniffer | None = None) -> list[tuple[str, str]]:
         """Parse the given data and return a list of tuples representing the header.
 
+        When a `LineStream` is given, only the header lines are consumed from it, so the
+        stream is left positioned right after the line at `end_line`.
+
         Args:
-            data (list[str]): A list of strings representing the data to be parsed.
+            data (Sequence[str] | LineStream): The lines to be parsed.
+            sniffer (SeparatorSniffer | None, optional): The sniffer shared with the measurement parser. Defaults to None.
 
         Returns:
             list[tuple[str, str]]: A list of tuples, where each tuple contains a key-value pair from the header.
 
         """
-        _delimi = detect_separator(data, self.separators)
-        self.sep = _delimi if _delimi else ","
+        if sniffer is None:
+            sniffer = SeparatorSniffer()
+        if isinstance(data, LineStream):
+            self.sniff_result = sniffer.sniff(data.peek(sniffer.max_lines), self.separators, start=data.position)
+        else:
+            self.sniff_result = sniffer.sniff(data, self.separators)
+        self.sep = self.sniff_result.separator or ","
         for i, line in enumerate(data):
-            if self.__is_comment_or_empty(line):
+            kind = classify_line(line)
+            if kind is LineKind.COMMENT:
                 continue
-            if self.is_mesurement_start(line) or (self.user_mesurement_start_number and i == self.user_mesurement_start_number):
+            if self.__is_start(line, kind) or (self.user_mesurement_start_number and i == self.user_mesurement_start_number):
                 self.end_line = i
                 break
-            if self.__is_header_char(line):
+            if kind is not LineKind.TEXT:
                 continue
             self.header.append(self.split_key_value(line))
         return self.header
@@ -116,12 +921,6 @@ class HeaderParser:
         key, value = line.split(self.sep, 1)
         return key.strip(), value.strip()
 
-    def __is_header_char(self, line: str) -> re.Match[str] | None:
-        return re.search(r"[\[\(\{].*?[\]\)\}]|header", line, re.IGNORECASE)
-
-    def __is_comment_or_empty(self, line: str) -> bool:
-        return line.startswith(("#", "!", ";")) or not line.strip()
-
     def is_mesurement_start(self, line: str) -> bool:
         """Determine if a given line is the start of a measurement.
 
@@ -132,58 +931,446 @@ class HeaderParser:
             bool: True if the line is the start of a measurement, False otherwise.
 
         """
-        split_len = len(line.split(self.sep)) if self.sep else 0
-        return (
-            split_len == 1 and bool(re.match(r"[\[({]\s*(data|measurement)\s*[\])}]", line, re.IGNORECASE))
-        ) or self.__is_numeric_line(line)
+        return self.__is_start(line, classify_line(line))
+
+    def __is_start(self, line: str, kind: LineKind) -> bool:
+        # A section marker only starts the measurement when the line holds nothing else.
+        return kind is LineKind.NUMERIC or (kind is LineKind.MARKER and self.sep is not None and self.sep not in line)
+
+
+class ConvertedTokens(NamedTuple):
+    """The result of `convert_tokens`.
+
+    Attributes:
+        values (np.ndarray): The numbers, as int64 if every token is an integer within the int64
+            range, as objects holding the exact Python numbers if an integer is beyond that range,
+            and as float64 otherwise. Invalid tokens are converted to NaN.
+        invalid (np.ndarray): The positions of the tokens that are not numbers.
+
+    """
+
+    values: np.ndarray
+    invalid: np.ndarray
+
+
+def convert_tokens(tokens: Sequence[str]) -> ConvertedTokens:
+    """Convert a column of tokens to numbers in bulk.
+
+    The column is converted by numpy in a single call, first as int64 and then as float64,
+    with the exact conversion of `int` and `float`, so a float is read back to the same bits
+    as by the C reader with `float_precision="round_trip"`. Only a column holding an invalid
+    token or an integer beyond the int64 range is converted token by token; invalid tokens do
+    not raise, their positions are returned, and such integers are kept exact as Python ints.
+
+    Args:
+        tokens (Sequence[str]): The tokens to convert.
+
+    Returns:
+        ConvertedTokens: The numbers and the positions of the invalid tokens.
+
+    Example:
+        >>> convert_tokens(["1", "2"]).values
+        array([1, 2])
+        >>> convert_tokens(["1", "x", "2.5"])
+        ConvertedTokens(values=array([1. , nan, 2.5]), invalid=array([1]))
+
+    """
+    no_invalid = np.empty(0, dtype=np.intp)
+    try:
+        return ConvertedTokens(np.array(tokens, dtype=np.int64), no_invalid)
+    except OverflowError:
+        return _convert_each(tokens)
+    except ValueError:
+        # A float or an invalid token.
+        pass
+    try:
+        values = np.array(tokens, dtype=np.float64)
+    except ValueError:
+        return _convert_each(tokens)
+    # An integer token beyond the int64 range next to floats would be rounded.
+    large = np.flatnonzero(np.abs(values) >= _INT64_LIMIT)
+    if any(_INTEGER_CELL.fullmatch(tokens[i].strip()) for i in large.tolist()):
+        return _convert_each(tokens)
+    return ConvertedTokens(values, no_invalid)
+
+
+def _convert_each(tokens: Sequence[str]) -> ConvertedTokens:
+    """Convert the tokens one by one, keeping integers exact, for the columns `convert_tokens` cannot convert at once."""
+    numbers: list[int | float] = []
+    invalid = []
+    for i, token in enumerate(tokens):
+        try:
+            numbers.append(int(token) if _INTEGER_CELL.fullmatch(token.strip()) else float(token))
+        except ValueError:
+            numbers.append(math.nan)
+            invalid.append(i)
+    values = np.array(numbers, dtype=object if _beyond_int64(numbers) else np.float64)
+    return ConvertedTokens(values, np.array(invalid, dtype=np.intp))
+
+
+def _beyond_int64(values: Iterable[object]) -> bool:
+    """Return whether a Python int among the values does not fit in int64."""
+    return any(type(value) is int and not -_INT64_LIMIT <= value < _INT64_LIMIT for value in values)
+
+
+class ColumnarBuilder:
+    """Collect rows of numbers into typed per-column buffers and build a DataFrame from them.
+
+    Rows may hold numbers or numeric tokens. Rows are transposed in batches and each column
+    of a batch is converted at once, tokens by `convert_tokens`. Each column is stored in an
+    `array.array`, as int64 ("q") until a float or a missing cell is appended, and as float64
+    ("d") afterwards. A column that receives an integer outside the int64 range is kept as a
+    list of exact Python numbers instead and built as an object column, as `pd.DataFrame`
+    does, so the integer is not rounded. Rows shorter than the widest
+    row are padded with NaN, and rows wider than the previous ones add columns padded with
+    NaN, as `pd.DataFrame` does for a list of rows. The buffers are handed to pandas through
+    the buffer protocol, so no object is boxed per cell and the DataFrame is built without copying.
+
+    Example:
+        >>> builder = ColumnarBuilder()
+        >>> builder.extend([[1, 0.5], [2]])
+        >>> builder.extend([["3", "1.5"]])
+        >>> builder.build().dtypes.tolist()
+        [dtype('int64'), dtype('float64')]
+
+    Raises:
+        StructuredError: If a token is not a number. The row and column of the token are reported.
+
+    """
+
+    # Number of rows transposed into the column buffers at a time.
+    BATCH_ROWS = 4096
+
+    def __init__(self) -> None:
+        self.__columns: list[array | list[int | float]] = []
+        self.__rows = 0
+        self.__pending: list[Sequence[int | float | str]] = []
+
+    def __len__(self) -> int:
+        return self.__rows + len(self.__pending)
+
+    def append(self, row: Sequence[int | float | str]) -> None:
+        """Append a row of numbers or numeric tokens.
+
+        Args:
+            row (Sequence[int | float | str]): The values of the row.
+
+        """
+        self.__pending.append(row)
+        if len(self.__pending) >= self.BATCH_ROWS:
+            self.__flush()
+
+    def extend(self, rows: Iterable[Sequence[int | float | str]]) -> None:
+        """Append rows of numbers or numeric tokens.
+
+        Args:
+            rows (Iterable[Sequence[int | float | str]]): The rows to append.
+
+        """
+        iterator = iter(rows)
+        self.__pending.extend(islice(iterator, self.BATCH_ROWS - len(self.__pending)))
+        while len(self.__pending) >= self.BATCH_ROWS:
+            self.__flush()
+            self.__pending.extend(islice(iterator, self.BATCH_ROWS))
 
-    def __is_numeric_line(self, line: str) -> bool:
-        tokens = re.split(r"[,\s;]+", line.strip())
-        return all(token.replace(".", "", 1).isdigit() for token in tokens)
+    def build(self) -> pd.DataFrame:
+        """Build a DataFrame that shares memory with the buffers, and reset the builder.
+
+        Returns:
+            pd.DataFrame: The collected rows, with columns numbered from 0.
+
+        """
+        self.__flush()
+        data = {i: self.__to_numpy(column) for i, column in enumerate(self.__columns)}
+        self.__columns, self.__rows = [], 0
+        if not data:
+            return pd.DataFrame()
+        return pd.DataFrame(data, columns=pd.RangeIndex(len(data)), copy=False)
+
+    def __flush(self) -> None:
+        batch, self.__pending = self.__pending, []
+        if not batch:
+            return
+        widths = set(map(len, batch))
+        width = max(widths)
+        if len(widths) == 1:
+            positions = range(len(batch))
+            values = [self.__convert(column, positions, i) for i, column in enumerate(zip(*batch))]
+        else:
+            values = [self.__convert_ragged(batch, i) for i in range(width)]
+        self.__extend_columns(values, len(batch))
+
+    def __convert_ragged(self, batch: list[Sequence[int | float | str]], index: int) -> np.ndarray:
+        """Convert a column of a batch of rows with different widths, with NaN for the rows that are too short."""
+        positions = [j for j, row in enumerate(batch) if len(row) > index]
+        values = self.__convert([batch[j][index] for j in positions], positions, index)
+        if len(positions) == len(batch):
+            return values
+        padded = np.full(len(batch), np.nan, dtype=object if values.dtype.kind == "O" else np.float64)
+        padded[positions] = values
+        return padded
+
+    def __convert(self, values: Sequence[int | float | str], positions: Sequence[int], index: int) -> np.ndarray:
+        """Convert the values of a column, where `positions` are the rows of the values in the batch."""
+        if not isinstance(values[0], str):
+            converted = np.asarray(values)
+            # numpy holds integers beyond the int64 range as uint64, objects or rounded floats.
+            return np.array(values, dtype=object) if converted.dtype.kind != "i" and _beyond_int64(values) else converted
+        result = convert_tokens(values)  # type: ignore[arg-type]
+        if result.invalid.size:
+            row = self.__rows + positions[result.invalid[0]]
+            emsg = f"Invalid data format: {values[result.invalid[0]]!r} in row {row}, column {index}"
+            raise StructuredError(emsg, 1)
+        return result.values
+
+    def __extend_columns(self, values: Sequence[np.ndarray], count: int) -> None:
+        columns = self.__columns
+        while len(columns) < len(values):
+            columns.append(array("d", [math.nan]) * self.__rows if self.__rows else array("q"))
+        for i, column_values in enumerate(values):
+            self.__extend_column(i, column_values)
+        for i in range(len(values), len(columns)):
+            self.__extend_column(i, np.full(count, np.nan))
+        self.__rows += count
+
+    def __extend_column(self, index: int, values: np.ndarray) -> None:
+        column = self.__columns[index]
+        if values.dtype.kind == "O" and isinstance(column, array):
+            column = self.__columns[index] = column.tolist()
+        if isinstance(column, list):
+            column.extend(values.tolist())
+            return
+        if values.dtype.kind == "f" and column.typecode == "q":
+            column = self.__columns[index] = array("d", column)
+        column.frombytes(np.ascontiguousarray(values, dtype=np.int64 if column.typecode == "q" else np.float64).tobytes())
+
+    def __to_numpy(self, column: array | list[int | float]) -> np.ndarray:
+        if isinstance(column, list):
+            return np.array(column, dtype=object)
+        return np.frombuffer(column, dtype=np.int64 if column.typecode == "q" else np.float64)
 
 
 class MeasurementParser:
+    """Class for parsing the measurement section of the input file.
+
+    Two engines are available. The "python" engine splits and converts each line
+    separately. The "c" engine hands runs of well-formed lines to the C reader of
+    pandas at once and only falls back to the per-line path for the lines it cannot
+    handle (comments, section names, column names, non-numeric cells, ...). Both paths
+    convert numbers exactly, so both engines return the same values bit for bit, whatever
+    the chunk size.
+
+    Args:
+        engine (str, optional): The parsing engine, "c" or "python". Defaults to "c".
+
+    """
+
     # The array is ordered by priority to ensure that non-space separators
     # (|, \t, ;, :, ,, ) are detected first. This is done to prioritize these
     # separators over spaces when they coexist in the same line.
     separators: tuple[str, ...] = ("\t", "|", ",", ";", ":", " ")
+    engines: tuple[str, ...] = ("c", "python")
     MIN_PARTS_COUNT = 2
-
-    def __init__(self) -> None:
+    # Runs of well-formed lines shorter than this are cheaper to parse line by line.
+    MIN_VECTORIZED_LINES = 32
+
+    def __init__(self, engine: str = "c") -> None:
+        if engine not in self.engines:
+            emsg = f"Unknown measurement parser engine: {engine}"
+            raise ValueError(emsg)
+        self.engine = engine
         self.mesurements: pd.DataFrame = pd.DataFrame()
         self.sep: str = " "
+        self.sniff_result = SniffResult(None, 0.0)
+        self.data_header: list[str] = []
 
-    def parse(self, lines: list[str], start_line: int) -> pd.DataFrame:
+    def parse(self, lines: Sequence[str], start_line: int, *, sniffer: SeparatorSniffer | None = None) -> pd.DataFrame:
         """Parse the input lines starting from the specified line number.
 
         Args:
-            lines (list[str]): The list of input lines to be parsed.
+            lines (Sequence[str]): The input lines to be parsed.
             start_line (int): The line number from which to start parsing.
+            sniffer (SeparatorSniffer | None, optional): The sniffer shared with the header parser. Defaults to None.
 
         Returns:
-            dict: A dictionary containing the parsed data.
+            pd.DataFrame: The parsed measurement data.
 
         """
-        data: list[list[int | float]] = []
-        data_header: list[str] = []
+        if isinstance(lines, MappedFile):
+            return self.parse_stream(lines.open_stream(start_line), sniffer=sniffer)
+        return self.parse_stream(LineStream(islice(lines, start_line, None), start=start_line), sniffer=sniffer)
 
-        _delimi = detect_separator(lines[start_line:], self.separators)
-        self.sep = _delimi if _delimi else ","
-        for idx, line in enumerate(lines[start_line:], start=start_line):
-            if self.__is_comment_or_empty(line):
-                continue
-            if self.__is_header_char(line):
+    def parse_stream(self, lines: LineStream, *, chunk_size: int = DEFAULT_CHUNK_SIZE, sniffer: SeparatorSniffer | None = None) -> pd.DataFrame:
+        """Parse the measurement section from a stream of lines, converting it chunk by chunk.
+
+        At most `chunk_size` lines are held in memory at a time; each chunk is converted
+        into DataFrames before the next one is read, and the results are concatenated at the end.
+
+        Args:
+            lines (LineStream): The stream positioned at the first line of the measurement section.
+            chunk_size (int, optional): The number of lines converted at a time. Defaults to DEFAULT_CHUNK_SIZE.
+            sniffer (SeparatorSniffer | None, optional): The sniffer shared with the header parser. Defaults to None.
+
+        Returns:
+            pd.DataFrame: The parsed measurement data.
+
+        """
+        frames = [frame for chunk in self.__iter_chunks(lines, chunk_size, sniffer) for frame in chunk]
+        self.mesurements = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if self.data_header:
+            self.mesurements.columns = pd.Index(self.data_header)
+        return self.mesurements
+
+    def iter_stream(self, lines: LineStream, *, chunk_size: int = DEFAULT_CHUNK_SIZE, sniffer: SeparatorSniffer | None = None) -> Iterator[pd.DataFrame]:
+        """Parse the measurement section from a stream of lines, yielding one DataFrame per chunk.
+
+        Unlike `parse_stream`, the chunks are never concatenated, so the measurement data does
+        not have to fit in memory. The columns are fixed by the first chunk: later chunks with
+        fewer columns are padded with NaN, and a chunk with more columns is an error. Since
+        the chunks are converted separately, an int column is only promoted to float in the
+        chunks that need it.
+
+        Args:
+            lines (LineStream): The stream positioned at the first line of the measurement section.
+            chunk_size (int, optional): The number of lines converted at a time. Defaults to DEFAULT_CHUNK_SIZE.
+            sniffer (SeparatorSniffer | None, optional): The sniffer shared with the header parser. Defaults to None.
+
+        Yields:
+            pd.DataFrame: The measurement data of each chunk that holds data rows.
+
+        Raises:
+            StructuredError: If a chunk has more columns than the first one.
+
+        """
+        width: int | None = None
+        for chunk in self.__iter_chunks(lines, chunk_size, sniffer):
+            frame = pd.concat(chunk, ignore_index=True) if len(chunk) > 1 else chunk[0]
+            if width is None:
+                width = len(self.data_header) or frame.shape[1]
+            if frame.shape[1] > width:
+                emsg = "The number of columns changes in the measurement data. Please check the format of the measurement data."
+                raise StructuredError(emsg, 1)
+            if frame.shape[1] < width:
+                frame = frame.reindex(columns=range(width))
+            if self.data_header:
+                frame.columns = pd.Index(self.data_header)
+            yield frame
+
+    def __iter_chunks(self, lines: LineStream, chunk_size: int, sniffer: SeparatorSniffer | None) -> Iterator[list[pd.DataFrame]]:
+        """Detect the separator, then yield the non-empty DataFrames converted from each chunk of lines."""
+        if sniffer is None:
+            sniffer = SeparatorSniffer()
+        self.sniff_result = sniffer.sniff(lines.peek(sniffer.max_lines), self.separators, start=lines.position)
+        self.sep = self.sniff_result.separator or ","
+        self.data_header = []
+
+        start_line = lines.position
+        while True:
+            first_idx = lines.position
+            if self.engine == "c":
+                text, count = lines.take_text(chunk_size)
+                frames = list(self.__parse_chunk_vectorized(text, first_idx, start_line))
+            else:
+                chunk = lines.take(chunk_size)
+                count = len(chunk)
+                builder = ColumnarBuilder()
+                builder.extend(self.__iter_rows(chunk, first_idx, start_line))
+                frames = [builder.build()]
+            frames = [frame for frame in frames if not frame.empty]
+            if frames:
+                yield frames
+            if count == 0:
+                break
+
+    def __iter_rows(self, lines: Iterable[str], first_idx: int, start_line: int) -> Iterator[list[str]]:
+        for idx, line in enumerate(lines, start=first_idx):
+            if classify_line(line) in (LineKind.COMMENT, LineKind.MARKER, LineKind.SECTION):
                 continue
             if idx == start_line and self.is_comma_separated_alpha_strings(line):
-                data_header = line.split(',')
-
-            parsed_line = self.split_data_line(line)
-            if parsed_line:
-                data.append(parsed_line)
-        self.mesurements = pd.DataFrame(data)
-        if data_header:
-            self.mesurements.columns = pd.Index(data_header)
-        return self.mesurements
+                self.data_header = line.split(',')
+
+            tokens = self.__split_tokens(line)
+            if tokens:
+                yield tokens
+
+    def __parse_chunk_vectorized(self, text: str, first_idx: int, start_line: int) -> Iterator[pd.DataFrame]:
+        """Parse runs of well-formed lines with the C reader and the remaining lines one by one."""
+        rows = ColumnarBuilder()
+        for line_idx, segment, well_formed in self.__split_runs(text, first_idx == start_line):
+            frame = self.__read_vectorized(segment) if well_formed else None
+            if frame is None:
+                rows.extend(self.__iter_rows(segment.split("\n"), first_idx + line_idx, start_line))
+                continue
+            if rows:
+                yield rows.build()
+            yield frame
+        if rows:
+            yield rows.build()
+
+    def __split_runs(self, text: str, include_first: bool) -> Iterator[tuple[int, str, bool]]:
+        """Split text into runs of well-formed lines and the malformed lines between them.
+
+        Yields the index of the first line, the text and whether it is a well-formed run.
+        """
+        if not text:
+            return
+        run_line, run_char = 0, 0
+        for line_idx, start, end in self.__iter_malformed_lines(text, include_first):
+            if line_idx > run_line:
+                yield run_line, text[run_char:start - 1], True
+            yield line_idx, text[start:end], False
+            run_line, run_char = line_idx + 1, end + 1
+        if run_char <= len(text):
+            yield run_line, text[run_char:], True
+
+    def __iter_malformed_lines(self, text: str, include_first: bool) -> Iterator[tuple[int, int, int]]:
+        """Yield the index, start and end offsets of the lines the C reader cannot parse.
+
+        The first line is always reported when `include_first` is set because it may hold the column names.
+        """
+        pattern = self.__malformed_pattern(text)
+        # `pos` is always the start of the line with index `line_idx`.
+        line_idx, pos = 0, 0
+        if include_first:
+            eol = text.find("\n")
+            end = eol if eol != -1 else len(text)
+            yield 0, 0, end
+            line_idx, pos = 1, end + 1
+        while pos < len(text) and (match := pattern.search(text, pos)):
+            line_idx += text.count("\n", pos, match.start())
+            start = text.rfind("\n", pos, match.start()) + 1 or pos
+            eol = text.find("\n", match.start())
+            end = eol if eol != -1 else len(text)
+            yield line_idx, start, end
+            line_idx, pos = line_idx + 1, end + 1
+
+    def __malformed_pattern(self, text: str) -> re.Pattern[str]:
+        # Signs and exponents are left to the C reader; a run that it reads as text falls back to the per-line path.
+        pattern = rf"[^0-9.eE+\- \n{re.escape(self.sep)}]"
+        if text.startswith(".") or text.endswith(".") or any(f"{a}{b}" in text for a, b in self.__dot_neighbours()):
+            # Only pay for the look-around when a dot without digits on both sides may exist.
+            pattern = rf"{pattern}|(?<![0-9])\.|\.(?![0-9])"
+        return re.compile(pattern)
+
+    def __dot_neighbours(self) -> Iterator[tuple[str, str]]:
+        for char in (".", " ", "\n", self.sep):
+            yield ".", char
+            yield char, "."
+
+    def __read_vectorized(self, text: str) -> pd.DataFrame | None:
+        """Parse well-formed lines with the C reader of pandas, or return None if the result is not a clean numeric table."""
+        if text.count("\n") + 1 < self.MIN_VECTORIZED_LINES:
+            return None
+        sep = r"\s+" if self.sep == " " else self.sep
+        try:
+            frame = pd.read_csv(io.StringIO(text), sep=sep, header=None, engine="c", float_precision="round_trip")
+        except ValueError:
+            return None
+        if frame.shape[1] < self.MIN_PARTS_COUNT or frame.isna().to_numpy().any():
+            return None
+        if not all(dtype.kind in "if" for dtype in frame.dtypes):
+            return None
+        return frame
 
     def is_comma_separated_alpha_strings(self, s: str) -> bool:
         """Check if a given string is a comma-separated list of alphabetic strings.
@@ -198,10 +1385,9 @@ class MeasurementParser:
         parts = s.split(',')
         if len(parts) < self.MIN_PARTS_COUNT:
             return False
-        pattern = re.compile(r'^[A-Za-z]+$')
         for part in parts:
             _part = part.strip()
-            if not _part or not pattern.match(_part):
+            if not _part or not _ALPHA_NAME.match(_part):
                 return False
         return True
 
@@ -218,36 +1404,50 @@ class MeasurementParser:
             StructuredError: If the data line format is invalid.
 
         """
+        return [self.__convert_to_number(part) for part in self.__split_tokens(line)]
+
+    def __split_tokens(self, line: str) -> list[str]:
+        """Split a data line and keep the numeric tokens, which are converted in bulk by `ColumnarBuilder`."""
         parts = [part.strip() for part in line.split(self.sep)]
         if len(parts) <= 1:
             error_message = "Invalid data line format. Please check the format of the measurement data."
             raise StructuredError(error_message, 1)
-        return [self.__convert_to_number(part) for part in parts if self.__is_numeric_char(part)]
+        return list(filter(_NUMERIC_CELL.fullmatch, parts))
 
-    def __is_numeric_char(self, char: str) -> re.Match[str] | None:
-        return re.fullmatch(r"\d+(\.\d+)?", char)
+    def __convert_to_number(self, part: str) -> int | float:
+        # The token is already known to be numeric, so the type is chosen without trying int() first.
+        return int(part) if _INTEGER_CELL.fullmatch(part) else float(part)
 
-    def __is_header_char(self, line: str) -> re.Match[str] | None:
-        return re.search(r"[\[\(\{].*?[\]\)\}]", line)
 
-    def __is_comment_or_empty(self, line: str) -> bool:
-        return line.startswith(("#", ";", "!")) or not line.strip()
+class DataParser:
+    """Class for splitting a file into its header and measurement sections.
 
-    def __convert_to_number(self, part: str) -> int | float:
-        try:
-            return int(part)
-        except ValueError:
-            try:
-                return float(part)
-            except ValueError as e:
-                raise StructuredError(emsg="Invalid data format", ecode=1) from e
+    Args:
+        file_operator (FileOperator): The operator used to read the file.
+        header_parser (HeaderParser): The parser for the header section.
+        measurement_parser (MeasurementParser): The parser for the measurement section.
+        chunk_size (int | None, optional): If set, the file is read lazily and the measurement section
+            is converted `chunk_size` rows at a time. If None, the whole file is loaded into memory first.
+            Defaults to None.
+        recorder (MetricsRecorder, optional): The recorder of the "parse_header" and "parse_measurements"
+            stages and of the "lines", "rows" and "columns" counters. Defaults to NULL_RECORDER.
 
+    """
 
-class DataParser:
-    def __init__(self, file_operator: FileOperator, header_parser: HeaderParser, measurement_parser: MeasurementParser):
+    def __init__(
+        self,
+        file_operator: FileOperator,
+        header_parser: HeaderParser,
+        measurement_parser: MeasurementParser,
+        *,
+        chunk_size: int | None = None,
+        recorder: MetricsRecorder = NULL_RECORDER,
+    ):
         self.file_operator = file_operator
         self.header_parser = header_parser
         self.measurement_parser = measurement_parser
+        self.chunk_size = chunk_size
+        self.recorder = recorder
         self.header: list[tuple[str, str]] = []
         self.measurements: pd.DataFrame = pd.DataFrame()
 
@@ -260,11 +1460,66 @@ class DataParser:
             - The measurements is a pandas DataFrame containing the parsed data.
 
         """
+        # Both parsers sniff the separator of their section; the lines they share are counted once.
+        sniffer = SeparatorSniffer()
+        if self.chunk_size is not None:
+            return self.__process_stream(self.chunk_size, sniffer)
+
         lines = self.file_operator.read()
-        self.header = self.header_parser.parse(lines)
-        self.measurements = self.measurement_parser.parse(lines, self.header_parser.end_line + 1)
+        with self.recorder.stage("parse_header"):
+            self.header = self.header_parser.parse(lines, sniffer=sniffer)
+        with self.recorder.stage("parse_measurements"):
+            self.measurements = self.measurement_parser.parse(lines, self.header_parser.end_line + 1, sniffer=sniffer)
+        self.__record_counts(len(lines), *self.measurements.shape)
         return self.header, self.measurements
 
+    def process_chunks(self) -> tuple[list[tuple[str, str]], Iterator[pd.DataFrame]]:
+        """Parse the header and return it with a lazy iterator over the measurement data.
+
+        The measurement section is converted `chunk_size` rows at a time (DEFAULT_CHUNK_SIZE if
+        `chunk_size` is None) while the iterator is consumed, and the converted chunks are not
+        kept, so the measurements never have to fit in memory. `get_measurements` stays empty.
+
+        Returns:
+            tuple[list[tuple[str, str]], Iterator[pd.DataFrame]]: The header and an iterator over
+            the measurement data of each chunk, as yielded by `MeasurementParser.iter_stream`.
+
+        """
+        sniffer = SeparatorSniffer()
+        lines = self.__open_measurement_stream(sniffer)
+        chunks = self.measurement_parser.iter_stream(lines, chunk_size=self.chunk_size or DEFAULT_CHUNK_SIZE, sniffer=sniffer)
+        return self.header, self.__counting(chunks, lines)
+
+    def __counting(self, chunks: Iterator[pd.DataFrame], lines: LineStream) -> Iterator[pd.DataFrame]:
+        rows = columns = 0
+        for chunk in chunks:
+            rows, columns = rows + len(chunk), chunk.shape[1]
+            yield chunk
+        self.__record_counts(lines.position, rows, columns)
+
+    def __record_counts(self, lines: int, rows: int, columns: int) -> None:
+        self.recorder.count("lines", lines)
+        self.recorder.count("rows", rows)
+        self.recorder.record("columns", columns)
+
+    def __process_stream(self, chunk_size: int, sniffer: SeparatorSniffer) -> tuple[list[tuple[str, str]], pd.DataFrame]:
+        lines = self.__open_measurement_stream(sniffer)
+        with self.recorder.stage("parse_measurements"):
+            self.measurements = self.measurement_parser.parse_stream(lines, chunk_size=chunk_size, sniffer=sniffer)
+        self.__record_counts(lines.position, *self.measurements.shape)
+        return self.header, self.measurements
+
+    def __open_measurement_stream(self, sniffer: SeparatorSniffer) -> LineStream:
+        """Parse the header from a stream and return the stream positioned at the measurement section."""
+        lines = self.file_operator.open_stream()
+        with self.recorder.stage("parse_header"):
+            self.header = self.header_parser.parse(lines, sniffer=sniffer)
+        start_line = self.header_parser.end_line + 1
+        if lines.position != start_line:
+            # No measurement start was found, so the header parser consumed the whole file.
+            lines = self.file_operator.open_stream(start_line)
+        return lines
+
     def get_metadata(self) -> list[tuple[str, str]]:
         """Return the metadata of the input file.
 
@@ -302,13 +1557,26 @@ class FileReader:
     """
 
     user_mesurement_start_number: int | None = None
+    chunk_size: int | None = DEFAULT_CHUNK_SIZE
+    # Files of at least this many bytes are memory-mapped instead of decoded as a whole. None disables mapping.
+    mmap_threshold: int | None = 256 * 1024 * 1024
+    source: IngestedFile | MappedFile | StreamedFile | None = None
+    # If set, parsed results are cached by the content hash of the file and the parser settings.
+    cache: MeasurementCache | None = None
+    # Files of at least this many bytes should be read with `read_chunks`. None disables the out-of-core mode.
+    out_of_core_threshold: int | None = None
+    # Records the "read_input" stage, the "bytes_read" and "cache_hits" counters and the stages of `DataParser`.
+    recorder: MetricsRecorder = NULL_RECORDER
 
     def read(self, file_path: Path) -> tuple[list[tuple[str, str]], pd.DataFrame]:
         """Read the file at the given file path and process its contents.
 
         This method initializes the file reader, metadata parser, measurement parser,
         and data parser. It then processes the file and retrieves the metadata and
-        measurements.
+        measurements. If `set_mesurement_start_number` already ingested the same file,
+        its contents are reused instead of reading the file again. If `cache` is set and
+        holds a result for the same contents and parser settings, it is returned without
+        parsing the file.
 
         Args:
             file_path (Path): The path to the file to be read.
@@ -317,14 +1585,134 @@ class FileReader:
             tuple: A tuple containing the metadata and measurements extracted from the file.
 
         """
-        self.file_reader = FileOperator(file_path)
+        source = self.__take_source(file_path)
+        cache_key, cached = self.__load_cached(file_path, None if source is None else source.digest)
+        if cached is not None:
+            if isinstance(source, MappedFile):
+                source.close()
+            self.recorder.count("cache_hits")
+            return cached
+        metadata, measurements = self.__parse(file_path, self.ingest(file_path) if source is None else source)
+        if self.cache is not None and cache_key is not None:
+            self.cache.store(cache_key, metadata, measurements)
+        return metadata, measurements
+
+    def __take_source(self, file_path: Path) -> IngestedFile | MappedFile | StreamedFile | None:
+        """Take over the file ingested by `set_mesurement_start_number` if it is the same file."""
+        source, self.source = self.source, None
+        if source is not None and Path(source.file_path) != Path(file_path):
+            if isinstance(source, MappedFile):
+                source.close()
+            return None
+        return source
+
+    def read_chunks(self, file_path: Path) -> tuple[list[tuple[str, str]], Iterator[pd.DataFrame]]:
+        """Read the file in out-of-core mode, without holding the measurement data in memory.
+
+        The file is memory-mapped when possible, the header is parsed at once, and the
+        measurement section is converted chunk by chunk while the returned iterator is
+        consumed (see `DataParser.process_chunks`). The file is released when the iterator
+        is exhausted or closed. Parsed results are not cached in this mode.
+
+        Args:
+            file_path (Path): The path to the file to be read.
+
+        Returns:
+            tuple[list[tuple[str, str]], Iterator[pd.DataFrame]]: The metadata and an iterator over the measurement data.
+
+        """
+        source = self.__take_source(file_path)
+        source = self.ingest(file_path) if source is None else source
+        self.__create_data_parser(file_path, source)
+        try:
+            metadata, chunks = self.data_parser.process_chunks()
+        except BaseException:
+            if isinstance(source, MappedFile):
+                source.close()
+            raise
+        return metadata, self.__closing(chunks, source)
+
+    def is_out_of_core(self, file_path: Path) -> bool:
+        """Return whether the file is at least `out_of_core_threshold` bytes and should be read with `read_chunks`.
+
+        Args:
+            file_path (Path): The path to the file.
+
+        Returns:
+            bool: True if the file should be read in out-of-core mode.
+
+        """
+        return self.out_of_core_threshold is not None and Path(file_path).stat().st_size >= self.out_of_core_threshold
+
+    def __closing(self, chunks: Iterator[pd.DataFrame], source: IngestedFile | MappedFile | StreamedFile) -> Iterator[pd.DataFrame]:
+        try:
+            yield from chunks
+        finally:
+            if isinstance(source, MappedFile):
+                source.close()
+
+    def __create_data_parser(self, file_path: Path, source: IngestedFile | MappedFile | StreamedFile) -> None:
+        if isinstance(source, MappedFile):
+            self.file_reader: FileOperator = MappedFileOperator(file_path, source=source)
+        else:
+            self.file_reader = FileOperator(file_path, source=source)
         self.metadata_parser = HeaderParser(user_mesurement_start_number=self.user_mesurement_start_number)
         self.measurement_parser = MeasurementParser()
-        self.data_parser = DataParser(self.file_reader, self.metadata_parser, self.measurement_parser)
-        self.data_parser.process()
-        metadata = self.data_parser.get_metadata()
-        measurements = self.data_parser.get_measurements()
-        return metadata, measurements
+        self.data_parser = DataParser(
+            self.file_reader, self.metadata_parser, self.measurement_parser, chunk_size=self.chunk_size, recorder=self.recorder,
+        )
+
+    def __parse(self, file_path: Path, source: IngestedFile | MappedFile | StreamedFile) -> tuple[list[tuple[str, str]], pd.DataFrame]:
+        self.__create_data_parser(file_path, source)
+        try:
+            self.data_parser.process()
+        finally:
+            if isinstance(source, MappedFile):
+                source.close()
+        return self.data_parser.get_metadata(), self.data_parser.get_measurements()
+
+    def __load_cached(self, file_path: Path, digest: str | None) -> tuple[str | None, tuple[list[tuple[str, str]], pd.DataFrame] | None]:
+        if self.cache is None:
+            return None, None
+        settings = {
+            "start": self.user_mesurement_start_number,
+            "header_separators": HeaderParser.separators,
+            "measurement_separators": MeasurementParser.separators,
+        }
+        cache_key = self.cache.key(file_path, settings, digest=digest)
+        return cache_key, self.cache.load(cache_key)
+
+    def ingest(self, file_path: Path, search_char: str | None = None) -> IngestedFile | MappedFile | StreamedFile:
+        """Read the file once, memory-mapping it if it is at least `mmap_threshold` bytes or read out of core.
+
+        Files whose encoding or line breaks cannot be indexed by byte are decoded as a whole instead.
+        Compressed files (see `detect_compression`) are decompressed and decoded as a stream
+        by `StreamedFile`, without a temporary file.
+
+        Args:
+            file_path (Path): The path to the file.
+            search_char (str | None, optional): A string whose first line number is recorded. Defaults to None.
+
+        Returns:
+            IngestedFile | MappedFile | StreamedFile: The ingested file.
+
+        """
+        self.recorder.count("bytes_read", Path(file_path).stat().st_size)
+        with self.recorder.stage("read_input"):
+            return self.__ingest(file_path, search_char)
+
+    def __ingest(self, file_path: Path, search_char: str | None) -> IngestedFile | MappedFile | StreamedFile:
+        if detect_compression(file_path) is not None:
+            return StreamedFile(file_path, search_char=search_char, recorder=self.recorder)
+        # The cache key is computed from the bytes read here, so `read` does not read the file again.
+        hash_contents = self.cache is not None
+        large = self.mmap_threshold is not None and Path(file_path).stat().st_size >= max(self.mmap_threshold, 1)
+        if not large and not self.is_out_of_core(file_path):
+            return IngestedFile(file_path, search_char=search_char, recorder=self.recorder, hash_contents=hash_contents)
+        try:
+            return MappedFile(file_path, search_char=search_char, recorder=self.recorder, hash_contents=hash_contents)
+        except (ValueError, LookupError):
+            return IngestedFile(file_path, search_char=search_char, recorder=self.recorder, hash_contents=hash_contents)
 
     def set_mesurement_start_number(self, input_file_path: Path, invoice_json: Path) -> int | None:
         """Set the measurement start number from the provided JSON file.
@@ -348,25 +1736,7 @@ class FileReader:
 
         contents = read_from_json_file(invoice_json)
         mesurement_start_char = contents.get("custom", {}).get("measurement_data_start_character", None)
-        number = self.__find_line_number_with_target_char(str(input_file_path), mesurement_start_char) if mesurement_start_char else None
+        self.source = self.ingest(input_file_path, mesurement_start_char or None)
+        number = self.source.search_char_line_number
         self.user_mesurement_start_number = int(number) if number is not None else None
         return self.user_mesurement_start_number
-
-    def __find_line_number_with_target_char(self, path: str, search_char: str) -> int | None:
-        """Retrieve the line number of the first occurrence of the specified string in a text file.
-
-        Args:
-            path (str): The path to the text file.
-            search_char (str): The character to search for.
-
-        Returns:
-            int: The line number (1-based) where the search string is first found.
-                Returns -1 if the string is not found.
-
-        """
-        enc = CharDecEncoding.detect_text_file_encoding(path)
-        with open(path, encoding=enc) as f:
-            for idx, line in enumerate(f, start=1):
-                if search_char in line:
-                    return idx
-            return None
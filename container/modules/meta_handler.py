@@ -4,9 +4,10 @@ from pathlib import Path
 from typing import cast
 
 from rdetoolkit import rde2util
+from rdetoolkit.config import load_config
 from rdetoolkit.models.rde2types import MetaType, RepeatedMetaType
 
-from modules.models import InvoiceJson, MetaDataDef
+from modules.models import InvoiceJson, MetaDataDef, ScatterplotConfig
 
 
 class MetaParser:
@@ -95,3 +96,17 @@ def get_invoice_obj(path: str | Path) -> InvoiceJson:
     """
     json_contents = rde2util.read_from_json_file(path)
     return InvoiceJson(**json_contents)
+
+
+def get_scatterplot_config(tasksupport_path: str | Path) -> ScatterplotConfig:
+    """Read the template settings from the `scatterplot` section of rdeconfig.yaml.
+
+    Args:
+        tasksupport_path (str | Path): The path to the tasksupport directory.
+
+    Returns:
+        ScatterplotConfig: The template settings. Defaults are used if the section or the file does not exist.
+
+    """
+    config = load_config(str(tasksupport_path))
+    return ScatterplotConfig(**(getattr(config, "scatterplot", None) or {}))
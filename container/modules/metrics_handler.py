@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any
+
+from rdetoolkit.rdelogger import get_logger
+
+# Name of the log file that rdetoolkit writes into the logs directory.
+RDE_LOG_NAME = "rdesys.log"
+
+
+class MetricsRecorder:
+    """Collect the timings of processing stages and counters into a structured report.
+
+    Stages are timed with `stage`, counters are added with `count` or set with `record`,
+    and the size of each output file is recorded with `output`. The reports of several raw
+    files, which may be collected in other processes, are attached with `add_file`. Stages and
+    counters may be recorded from several threads, such as the stages of a `StagePipeline`.
+
+    Example:
+        >>> recorder = MetricsRecorder()
+        >>> with recorder.stage("parse_header"):
+        ...     header = parse()
+        >>> recorder.count("rows", 100)
+        >>> recorder.save(Path("metrics.json"))
+
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.stages: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+        self.outputs: dict[str, int] = {}
+        self.files: dict[str, dict[str, Any]] = {}
+        self.__lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The lock cannot be pickled when a recorder is returned from a worker process.
+        state = self.__dict__.copy()
+        del state["_MetricsRecorder__lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def __timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self.__lock:
+                stage = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                stage["seconds"] += seconds
+                stage["calls"] += 1
+
+    def stage(self, name: str) -> AbstractContextManager[None]:
+        """Time the enclosed block as the stage `name`. The time of repeated stages is summed.
+
+        Args:
+            name (str): The name of the stage.
+
+        Returns:
+            AbstractContextManager[None]: The context manager timing the block.
+
+        """
+        return self.__timed(name)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add `value` to the counter `name`.
+
+        Args:
+            name (str): The name of the counter.
+            value (int, optional): The value to add. Defaults to 1.
+
+        """
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name: str, value: int) -> None:
+        """Set the counter `name` to `value`.
+
+        Args:
+            name (str): The name of the counter.
+            value (int): The value.
+
+        """
+        self.counters[name] = value
+
+    def output(self, path: Path) -> None:
+        """Record the number of bytes written to an output file.
+
+        Args:
+            path (Path): The output file.
+
+        """
+        self.outputs[Path(path).name] = Path(path).stat().st_size
+
+    def add_file(self, name: str, recorder: MetricsRecorder) -> None:
+        """Attach the report of a raw file.
+
+        Args:
+            name (str): The name of the raw file.
+            recorder (MetricsRecorder): The recorder used for the raw file.
+
+        """
+        self.files[name] = recorder.report()
+
+    def report(self) -> dict[str, Any]:
+        """Return the collected metrics.
+
+        Returns:
+            dict[str, Any]: The stages, counters, output sizes and the reports of the raw files.
+
+        """
+        report: dict[str, Any] = {"stages": self.stages, "counters": self.counters, "outputs": self.outputs}
+        if self.files:
+            report["files"] = self.files
+        return report
+
+    def save(self, path: Path, *, log_path: Path | None = None) -> None:
+        """Write the report to a JSON file, and to a log file if given.
+
+        Args:
+            path (Path): The path of the JSON file.
+            log_path (Path | None, optional): The log file to which the report is appended as one line,
+                such as the rdetoolkit log `RDE_LOG_NAME`. Defaults to None.
+
+        """
+        report = self.report()
+        with open(path, "w", encoding="utf_8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        if log_path is None:
+            return
+        logger = get_logger(__name__, file_path=log_path)
+        try:
+            logger.info("metrics: %s", json.dumps(report, ensure_ascii=False))
+        finally:
+            # The handler added by get_logger would otherwise write every later message twice.
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+
+
+class NullRecorder(MetricsRecorder):
+    """A `MetricsRecorder` that records nothing, used when the metrics are turned off.
+
+    Every method returns at once without timing, counting or touching the file system.
+
+    """
+
+    enabled = False
+    __NULL_CONTEXT: AbstractContextManager[None] = nullcontext()
+
+    def stage(self, name: str) -> AbstractContextManager[None]:
+        """Return a context manager that does nothing."""
+        return self.__NULL_CONTEXT
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Do nothing."""
+
+    def record(self, name: str, value: int) -> None:
+        """Do nothing."""
+
+    def output(self, path: Path) -> None:
+        """Do nothing."""
+
+    def add_file(self, name: str, recorder: MetricsRecorder) -> None:
+        """Do nothing."""
+
+    def save(self, path: Path, *, log_path: Path | None = None) -> None:
+        """Do nothing."""
+
+
+# The shared recorder of the components whose metrics are turned off.
+NULL_RECORDER = NullRecorder()
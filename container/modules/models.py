@@ -2,10 +2,18 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, RootModel, field_validator
 
+# How the scatterplot is drawn: every point, a density image, or a density image above a number of points.
+PlotMode = Literal["scatter", "density", "auto"]
+# A printf-style format of one float value, such as "%.6g" or "%.3e".
+FLOAT_FORMAT_PATTERN = r"^%[-+ #0]*\d*(\.\d+)?[eEfFgG]$"
+# Columnar binary formats in which the measurements can also be saved. "feather" is an uncompressed
+# Arrow IPC file, whose columns can be memory-mapped without a copy.
+ColumnarFormat = Literal["parquet", "feather"]
+
 
 class Label(BaseModel):
     ja: str
@@ -134,3 +142,57 @@ class InvoiceJson(BaseModel):
             json.dump(self.model_dump(by_alias=True), f, ensure_ascii=False, indent=2)
 
         return self.model_dump(by_alias=True)
+
+
+class ScatterplotConfig(BaseModel):
+    """Template settings read from the `scatterplot` section of rdeconfig.yaml.
+
+    Attributes:
+        max_workers (int | None): The number of processes used when several raw files are
+            registered at once. If None, the number of CPUs available to the process is used.
+            1 processes the files one by one in the main process.
+        cache_dir (str | None): The directory of the cache of parsed input files and plot images. It
+            should be on a volume that outlives the container. If None, nothing is cached.
+        cache_max_bytes (int): The maximum total size of the cache directory.
+        out_of_core_threshold (int | None): Raw files of at least this many bytes are streamed
+            chunk by chunk into the outputs instead of being loaded into memory. If None, raw
+            files are always loaded into memory.
+        metrics (bool): If True, the timings of the processing stages and counters such as the
+            bytes read and written are saved to "metrics.json" in the logs directory and to the
+            rdetoolkit log.
+        plot_mode (PlotMode): "scatter" draws every point, "density" draws the number of points
+            per pixel as an image, and "auto" draws a density image only for large data.
+        log_density (bool): If True, the density image uses a logarithmic color scale.
+        max_plot_points (int | None): If set, larger data is reduced to at most this many points
+            that keep the peaks and outliers before it is drawn as a scatterplot.
+        font_families (list[str] | None): The fonts tried in order for the text of the plots. If None,
+            the CJK fonts of `graph_handler.DEFAULT_FONT_FAMILIES` are used.
+        render_workers (int): The number of processes that draw the graphs while the raw files are
+            registered one by one. If 0, the graphs are drawn by the registering process.
+        csv_float_format (str | None): A printf-style format of the float values in the CSV files, such
+            as "%.6g", which is much faster to write than the default shortest round-trip text.
+        csv_compression (Literal["gzip"] | None): If "gzip", the CSV files are gzip-compressed on a
+            background thread and ".gz" is appended to their names.
+        columnar_format (ColumnarFormat | None): If set, the measurements are also saved next to "data.csv"
+            as "data.parquet" or "data.feather", which keep the dtypes and load without parsing. It
+            requires pyarrow.
+        concurrent_stages (bool): If True, the structured data, the header and the graph of each raw
+            file are written by concurrent threads once it has been read.
+
+    """
+
+    model_config = ConfigDict(extra='allow', populate_by_name=True)
+    max_workers: int | None = Field(default=None, ge=1)
+    cache_dir: str | None = Field(default=None)
+    cache_max_bytes: int = Field(default=1 << 30, ge=0)
+    out_of_core_threshold: int | None = Field(default=1 << 31, ge=1)
+    metrics: bool = Field(default=False)
+    plot_mode: PlotMode = Field(default="scatter")
+    log_density: bool = Field(default=False)
+    max_plot_points: int | None = Field(default=None, ge=4)
+    font_families: list[str] | None = Field(default=None)
+    render_workers: int = Field(default=0, ge=0)
+    csv_float_format: str | None = Field(default=None, pattern=FLOAT_FORMAT_PATTERN)
+    csv_compression: Literal["gzip"] | None = Field(default=None)
+    columnar_format: ColumnarFormat | None = Field(default=None)
+    concurrent_stages: bool = Field(default=True)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, NamedTuple
+
+from rdetoolkit.rdelogger import get_logger
+
+logger = get_logger(__name__)
+
+
+def available_cpus() -> int:
+    """Return the number of CPUs this process may run on, which is less than `os.cpu_count()` under an affinity mask.
+
+    Returns:
+        int: The number of usable CPUs, at least 1.
+
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity is not available on macOS and Windows.
+        return os.cpu_count() or 1
+
+
+class Stage(NamedTuple):
+    """A stage of a `StagePipeline`.
+
+    Attributes:
+        name (str): The name of the stage.
+        func (Callable[[], Any]): The function run by the stage.
+        after (tuple[str, ...]): The names of the stages that must finish before this one starts.
+
+    """
+
+    name: str
+    func: Callable[[], Any]
+    after: tuple[str, ...] = ()
+
+
+class StagePipeline:
+    """Run the stages of a registration as a dependency graph on a thread pool.
+
+    A stage starts as soon as the stages it runs after have finished, so independent stages,
+    such as writing a file while a graph is drawn, overlap. If a stage fails, no further stage
+    is started, the running ones are waited for, and the error of the first failed stage (in
+    the order they were added) is raised once. The errors of the others are logged.
+
+    Args:
+        concurrent (bool, optional): If False, the stages run one by one in the order they were
+            added, in the calling thread. Defaults to True.
+
+    Example:
+        >>> pipeline = StagePipeline()
+        >>> pipeline.add("stream", stream_measurements)
+        >>> pipeline.add("header", write_header)
+        >>> pipeline.add("plot", plot, after=["stream"])
+        >>> results = pipeline.run()
+
+    """
+
+    def __init__(self, *, concurrent: bool = True):
+        self.concurrent = concurrent
+        self.stages: dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable[[], Any], *, after: Iterable[str] = ()) -> None:
+        """Add a stage.
+
+        Args:
+            name (str): The unique name of the stage.
+            func (Callable[[], Any]): The function run by the stage.
+            after (Iterable[str], optional): The names of previously added stages that must finish first. Defaults to ().
+
+        Raises:
+            ValueError: If the name is already used or a stage in `after` has not been added.
+
+        """
+        after = tuple(after)
+        if name in self.stages or not set(after) <= self.stages.keys():
+            emsg = f"Stage {name!r} is already added or runs after a stage that is not added: {after}"
+            raise ValueError(emsg)
+        self.stages[name] = Stage(name, func, after)
+
+    def run(self) -> dict[str, Any]:
+        """Run the stages and return their results.
+
+        Returns:
+            dict[str, Any]: The result of each stage by name.
+
+        Raises:
+            Exception: The error of the first failed stage.
+
+        """
+        if not self.concurrent:
+            return {stage.name: stage.func() for stage in self.stages.values()}
+        results: dict[str, Any] = {}
+        errors: dict[str, BaseException] = {}
+        with ThreadPoolExecutor(max_workers=max(len(self.stages), 1), thread_name_prefix="stage") as executor:
+            self.__run_on(executor, results, errors)
+        self.__raise(errors)
+        return results
+
+    def __run_on(self, executor: ThreadPoolExecutor, results: dict[str, Any], errors: dict[str, BaseException]) -> None:
+        running: dict[Future[Any], str] = {}
+        pending = list(self.stages.values())
+        while True:
+            if not errors:
+                pending = self.__submit_ready(executor, pending, results, running)
+            if not running:
+                return
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                self.__collect(running.pop(future), future, results, errors)
+
+    def __submit_ready(self, executor: ThreadPoolExecutor, pending: list[Stage], results: dict[str, Any], running: dict[Future[Any], str]) -> list[Stage]:
+        """Submit the stages whose dependencies have finished and return those that still wait."""
+        waiting = []
+        for stage in pending:
+            if all(name in results for name in stage.after):
+                running[executor.submit(stage.func)] = stage.name
+            else:
+                waiting.append(stage)
+        return waiting
+
+    def __collect(self, name: str, future: Future[Any], results: dict[str, Any], errors: dict[str, BaseException]) -> None:
+        error = future.exception()
+        if error is None:
+            results[name] = future.result()
+        else:
+            errors[name] = error
+
+    def __raise(self, errors: dict[str, BaseException]) -> None:
+        failed = [name for name in self.stages if name in errors]
+        if not failed:
+            return
+        for name in failed[1:]:
+            logger.error("Stage %r also failed", name, exc_info=errors[name])
+        raise errors[failed[0]]
@@ -1,10 +1,54 @@
 from __future__ import annotations
 
+import gzip
+import importlib
+import io
+import os
+import queue
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import ExitStack
 from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
+import numpy as np
 import pandas as pd
+from rdetoolkit.exceptions import StructuredError
 
 from modules.interfaces import IStructuredDataProcessor
+from modules.metrics_handler import NULL_RECORDER, MetricsRecorder
+from modules.models import ColumnarFormat
+
+if TYPE_CHECKING:
+    # typing.Self requires Python 3.11.
+    from typing_extensions import Self
+
+# Number of rows formatted at a time when an in-memory DataFrame is written by `to_csv_sinks`.
+WRITE_BLOCK_ROWS = 100_000
+# Compression level of gzip-compressed CSV files. Level 1 compresses CSV text about ten times
+# faster than zlib's default of 6, and the files are only about 10% larger.
+GZIP_COMPRESSLEVEL = 1
+# Number of formatted blocks that may wait for the compression thread before the writer blocks.
+COMPRESSION_QUEUE_BLOCKS = 4
+
+
+class CsvSink(NamedTuple):
+    """A CSV file written by `StructuredDataProcessor.to_csv_chunks`.
+
+    Attributes:
+        save_path (Path): The path where the CSV file will be saved.
+        columns (list[int] | None): The positions of the columns to save. If None, all columns are saved.
+        header (list[str] | None): The header used when the data has no explicit column headers, as in `to_csv`.
+        columnar (bool): If True and `StructuredDataProcessor.columnar_format` is set, the saved columns are
+            also written to a columnar file next to the CSV file.
+
+    """
+
+    save_path: Path
+    columns: list[int] | None = None
+    header: list[str] | None = None
+    columnar: bool = False
 
 
 class StructuredDataProcessor(IStructuredDataProcessor):
@@ -15,6 +59,16 @@ class StructuredDataProcessor(IStructuredDataProcessor):
 
     """
 
+    # Records the "write_structured" stage and the size of each written file.
+    recorder: MetricsRecorder = NULL_RECORDER
+    # printf-style format of float values, such as "%.6g". None writes the shortest text that
+    # round-trips, as pandas does.
+    float_format: str | None = None
+    # If "gzip", the CSV files are compressed and ".gz" is appended to their names.
+    compression: Literal["gzip"] | None = None
+    # If set, the sinks marked as columnar are also written in this format, which requires pyarrow.
+    columnar_format: ColumnarFormat | None = None
+
     def to_text(self, metadata: list[tuple[str, str]], save_path: Path) -> None:
         """Write the metadata to a text file.
 
@@ -26,9 +80,10 @@ class StructuredDataProcessor(IStructuredDataProcessor):
             None
 
         """
-        with open(save_path, "w") as f:
+        with self.recorder.stage("write_structured"), open(save_path, "w") as f:
             for key, value in metadata:
                 f.write(f"{key},{value}\n")
+        self.recorder.output(save_path)
 
     def to_csv(self, dataframe: pd.DataFrame, save_path: Path, *, header: list[str] | None = None) -> None:
         """Save the given DataFrame to a CSV file.
@@ -42,13 +97,145 @@ class StructuredDataProcessor(IStructuredDataProcessor):
             None
 
         """
-        if header is not None:
-            if self.has_explicit_column_headers(dataframe):
-                dataframe.to_csv(save_path, index=False)
-            else:
-                dataframe.to_csv(save_path, header=header, index=False)
-        else:
-            dataframe.to_csv(save_path, index=False)
+        save_path = self.csv_path(save_path)
+        with self.recorder.stage("write_structured"):
+            header_row = self.__header_row(dataframe, header)
+            dataframe.to_csv(save_path, header=header_row, index=False, float_format=self.float_format, compression=self.compression)
+        self.recorder.output(save_path)
+
+    def csv_path(self, save_path: Path) -> Path:
+        """Return the path of the file written for `save_path`, which has ".gz" appended if the files are compressed.
+
+        Args:
+            save_path (Path): The path where the CSV file is saved.
+
+        Returns:
+            Path: The path of the written file.
+
+        """
+        return save_path.with_name(f"{save_path.name}.gz") if self.compression == "gzip" else save_path
+
+    def columnar_path(self, save_path: Path) -> Path:
+        """Return the path of the columnar file written next to the CSV file `save_path`.
+
+        Args:
+            save_path (Path): The path where the CSV file is saved.
+
+        Returns:
+            Path: The path with the suffix of `columnar_format`, such as "data.parquet".
+
+        """
+        return save_path.with_suffix(f".{self.columnar_format}")
+
+    def to_csv_sinks(self, dataframe: pd.DataFrame, sinks: Sequence[CsvSink]) -> None:
+        """Save a DataFrame to several CSV files, formatting each column only once.
+
+        The files are the same as `to_csv` would write for each sink, but a column shared
+        by several sinks is converted to text once. The rows are written in blocks of
+        `WRITE_BLOCK_ROWS`, so the text of the whole DataFrame is never held in memory.
+
+        Args:
+            dataframe (pd.DataFrame): The DataFrame to be saved.
+            sinks (Sequence[CsvSink]): The CSV files to write.
+
+        Returns:
+            None
+
+        """
+        with self.recorder.stage("write_structured"):
+            self.__write_chunks(_row_blocks(dataframe, WRITE_BLOCK_ROWS), sinks, promote_integers=False)
+
+    def to_csv_chunks(self, chunks: Iterable[pd.DataFrame], sinks: Sequence[CsvSink]) -> None:
+        """Save data that arrives in chunks to several CSV files in a single pass.
+
+        Each chunk is appended to every sink as it arrives and is not kept, so data larger than
+        memory can be saved. The header row is taken from the first chunk with the same rules
+        as `to_csv`, and the files are the same as `to_csv` would write for the concatenated data.
+        The numeric columns of a chunk are converted to text once and shared by all sinks. If
+        `compression` is set, each file is compressed on a background thread while the next
+        chunk is formatted. If `columnar_format` is set, the sinks marked as columnar are also
+        written to columnar files, in which integer columns are stored as float64 because a later
+        chunk may promote them.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The data, chunk by chunk, all with the same columns.
+            sinks (Sequence[CsvSink]): The CSV files to write.
+
+        Returns:
+            None
+
+        """
+        self.__write_chunks(chunks, sinks, promote_integers=True)
+
+    def __write_chunks(self, chunks: Iterable[pd.DataFrame], sinks: Sequence[CsvSink], *, promote_integers: bool) -> None:
+        paths = [self.csv_path(sink.save_path) for sink in sinks]
+        with ExitStack() as stack:
+            files = [stack.enter_context(self.__open(path)) for path in paths]
+            columnar = self.__open_columnar(stack, sinks, promote_integers=promote_integers)
+            first = True
+            for chunk in chunks:
+                self.__write_chunk(chunk, sinks, files, first=first)
+                self.__write_columnar(chunk, columnar)
+                first = False
+            if first:
+                _write_empty(files, [writer for _, writer in columnar])
+        for path in paths + [writer.path for _, writer in columnar]:
+            self.recorder.output(path)
+
+    def __open_columnar(self, stack: ExitStack, sinks: Sequence[CsvSink], *, promote_integers: bool) -> list[tuple[CsvSink, ColumnarWriter]]:
+        file_format = self.columnar_format
+        if file_format is None:
+            return []
+        return [
+            (sink, stack.enter_context(ColumnarWriter(self.columnar_path(sink.save_path), file_format, promote_integers=promote_integers)))
+            for sink in sinks
+            if sink.columnar
+        ]
+
+    def __write_columnar(self, chunk: pd.DataFrame, columnar: list[tuple[CsvSink, ColumnarWriter]]) -> None:
+        for sink, writer in columnar:
+            dataframe = chunk.iloc[:, _positions(chunk.shape[1], sink.columns)]
+            header = self.__header_row(dataframe, sink.header)
+            # Arrow requires string column names, which are those of the CSV header.
+            writer.write(dataframe.set_axis([str(name) for name in (dataframe.columns if header is True else header)], axis=1))
+
+    def __open(self, path: Path) -> io.TextIOBase:
+        if self.compression == "gzip":
+            return BackgroundGzipWriter(path)
+        return open(path, "w", newline="")
+
+    def __write_chunk(self, chunk: pd.DataFrame, sinks: Sequence[CsvSink], files: list[io.TextIOBase], *, first: bool) -> None:
+        projections = [_positions(chunk.shape[1], sink.columns) for sink in sinks]
+        used = sorted({i for projection in projections for i in projection})
+        if not _are_plain_numbers(chunk, used):
+            # pandas formats and quotes anything other than plain numbers.
+            self.__write_with_pandas(chunk, sinks, projections, files, first=first)
+            return
+        texts = {i: _format_column(chunk.iloc[:, i].to_numpy(), self.float_format) for i in used}
+        for sink, projection, f in zip(sinks, projections, files):
+            if first:
+                header = chunk.iloc[:0, projection]
+                f.write(header.to_csv(header=self.__header_row(header, sink.header), index=False))
+            f.write(_join_rows([texts[i] for i in projection]))
+
+    def __write_with_pandas(
+        self,
+        chunk: pd.DataFrame,
+        sinks: Sequence[CsvSink],
+        projections: list[list[int]],
+        files: list[io.TextIOBase],
+        *,
+        first: bool,
+    ) -> None:
+        for sink, projection, f in zip(sinks, projections, files):
+            dataframe = chunk.iloc[:, projection]
+            header_row = self.__header_row(dataframe, sink.header) if first else False
+            f.write(dataframe.to_csv(header=header_row, index=False, float_format=self.float_format))
+
+    def __header_row(self, dataframe: pd.DataFrame, header: list[str] | None) -> list[str] | Literal[True]:
+        if header is not None and not self.has_explicit_column_headers(dataframe):
+            return header
+        return True
 
     def has_explicit_column_headers(self, df: pd.DataFrame) -> bool:
         """Check if the DataFrame has explicit column headers.
@@ -61,3 +248,196 @@ class StructuredDataProcessor(IStructuredDataProcessor):
 
         """
         return not all(isinstance(col, int) for col in df.columns)
+
+
+class BackgroundGzipWriter(io.TextIOBase):
+    """A text file that is gzip-compressed on a background thread.
+
+    `write` encodes the text and queues it, so the caller can format the next block while the
+    previous one is compressed; zlib releases the GIL while it compresses. At most
+    `COMPRESSION_QUEUE_BLOCKS` blocks wait in the queue. An error of the compression thread is
+    raised by the next `write` or by `close`.
+
+    Args:
+        path (Path): The path of the compressed file.
+        encoding (str, optional): The encoding of the text. Defaults to "utf_8".
+
+    """
+
+    def __init__(self, path: Path, *, encoding: str = "utf_8"):
+        super().__init__()
+        self.__encoding = encoding
+        self.__file = gzip.open(path, "wb", compresslevel=GZIP_COMPRESSLEVEL)  # noqa: SIM115 - closed by close()
+        self.__blocks: queue.Queue[bytes | None] = queue.Queue(maxsize=COMPRESSION_QUEUE_BLOCKS)
+        self.__error: Exception | None = None
+        self.__thread = threading.Thread(target=self.__compress, daemon=True)
+        self.__thread.start()
+
+    def __compress(self) -> None:
+        while (block := self.__blocks.get()) is not None:
+            if self.__error is not None:
+                continue
+            try:
+                self.__file.write(block)
+            except Exception as e:  # noqa: BLE001 - raised in the writing thread
+                self.__error = e
+
+    def writable(self) -> bool:
+        """Return True."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Queue the text to be compressed.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: The number of characters written.
+
+        """
+        if self.__error is not None:
+            raise self.__error
+        self.__blocks.put(text.encode(self.__encoding))
+        return len(text)
+
+    def close(self) -> None:
+        """Wait until the queued text is compressed, then close the file."""
+        if self.closed:
+            return
+        self.__blocks.put(None)
+        self.__thread.join()
+        self.__file.close()
+        super().close()
+        if self.__error is not None:
+            raise self.__error
+
+
+class ColumnarWriter:
+    """Write a DataFrame that arrives in chunks to a Parquet or Feather file.
+
+    Parquet files hold the minimum, maximum and number of nulls of each column in each row
+    group. Feather files are uncompressed Arrow IPC files, so readers such as
+    `pyarrow.ipc.open_file(pyarrow.memory_map(path))` map their columns without a copy. Both keep
+    the dtypes of the columns. pyarrow takes long to import, so it is imported when the first
+    writer is created.
+
+    Args:
+        path (Path): The path of the file.
+        file_format (ColumnarFormat): "parquet" or "feather".
+        promote_integers (bool, optional): If True, integer columns are stored as float64, since a
+            later chunk may promote them to float. Defaults to False.
+
+    Raises:
+        StructuredError: If pyarrow is not installed.
+
+    Example:
+        >>> with ColumnarWriter(Path("data.parquet"), "parquet") as writer:
+        ...     for chunk in chunks:
+        ...         writer.write(chunk)
+
+    """
+
+    def __init__(self, path: Path, file_format: ColumnarFormat, *, promote_integers: bool = False):
+        self.path = path
+        self.file_format = file_format
+        self.promote_integers = promote_integers
+        self.__pa = _import_pyarrow()
+        self.__writer: Any = None
+        self.__schema: Any = None
+
+    def write(self, dataframe: pd.DataFrame) -> None:
+        """Append a chunk, whose columns are cast to the types of the first chunk.
+
+        Args:
+            dataframe (pd.DataFrame): The chunk, with string column names.
+
+        """
+        table = self.__pa.Table.from_pandas(dataframe, preserve_index=False)
+        if self.__writer is None:
+            self.__schema = self.__promoted(table.schema) if self.promote_integers else table.schema
+            self.__writer = self.__open(self.__schema)
+        self.__writer.write_table(table.cast(self.__schema))
+
+    def __promoted(self, schema: Any) -> Any:
+        fields = [field.with_type(self.__pa.float64()) if self.__pa.types.is_integer(field.type) else field for field in schema]
+        return self.__pa.schema(fields, metadata=schema.metadata)
+
+    def __open(self, schema: Any) -> Any:
+        if self.file_format == "parquet":
+            return importlib.import_module("pyarrow.parquet").ParquetWriter(self.path, schema, write_statistics=True)
+        return importlib.import_module("pyarrow.ipc").new_file(self.path, schema)
+
+    def close(self) -> None:
+        """Close the file."""
+        if self.__writer is not None:
+            self.__writer.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _import_pyarrow() -> ModuleType:
+    try:
+        return importlib.import_module("pyarrow")
+    except ImportError as e:
+        emsg = "Columnar structured outputs require the pyarrow package"
+        raise StructuredError(emsg, 1) from e
+
+
+def _write_empty(files: list[io.TextIOBase], writers: list[ColumnarWriter]) -> None:
+    # The files of data without chunks are those of an empty DataFrame.
+    for f in files:
+        f.write(pd.DataFrame().to_csv(index=False))
+    for writer in writers:
+        writer.write(pd.DataFrame())
+
+
+def _row_blocks(dataframe: pd.DataFrame, rows: int) -> Iterator[pd.DataFrame]:
+    # An empty DataFrame is still yielded once, so that its header row is written.
+    for start in range(0, max(len(dataframe), 1), rows):
+        yield dataframe.iloc[start : start + rows]
+
+
+def _positions(width: int, columns: list[int] | None) -> list[int]:
+    # Negative positions count from the end, as in iloc.
+    return list(range(width)) if columns is None else [range(width)[i] for i in columns]
+
+
+def _are_plain_numbers(dataframe: pd.DataFrame, positions: list[int]) -> bool:
+    return bool(positions) and all(_is_plain_number(dataframe.dtypes.iloc[i]) for i in positions)
+
+
+def _is_plain_number(dtype: object) -> bool:
+    return isinstance(dtype, np.dtype) and (dtype.kind in "biu" or dtype == np.float64)
+
+
+def _format_column(values: np.ndarray, float_format: str | None) -> list[str]:
+    if values.dtype.kind != "f":
+        return list(map(str, values.tolist()))
+    texts = _format_floats(values.tolist(), float_format)
+    # Missing values are written as empty fields, as by pandas.
+    for i in np.flatnonzero(np.isnan(values)).tolist():
+        texts[i] = ""
+    return texts
+
+
+def _format_floats(values: list[float], float_format: str | None) -> list[str]:
+    # repr of a float is the shortest text that round-trips, which is what pandas writes for float64
+    # values. A fixed format is applied to the whole block by one % operation, which is faster than
+    # formatting each value, and the result is split into the values.
+    if float_format is None:
+        return list(map(repr, values))
+    return ((float_format + "\n") * len(values) % tuple(values)).split("\n")[:-1]
+
+
+def _join_rows(columns: list[list[str]]) -> str:
+    if not columns[0]:
+        return ""
+    if len(columns) == 1:
+        # The csv module quotes a row made of a single empty field, so that it is not a blank line.
+        return os.linesep.join('""' if text == "" else text for text in columns[0]) + os.linesep
+    return os.linesep.join(map(",".join, zip(*columns))) + os.linesep
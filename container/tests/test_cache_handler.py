@@ -0,0 +1,149 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.cache_handler import LRUFileCache, MeasurementCache, RenderCache, content_digest, file_digest
+
+
+def write_entry(size: int):
+    def write(entry):
+        entry.joinpath("data.bin").write_bytes(b"x" * size)
+
+    return write
+
+
+def test_file_digest(tmp_path):
+    input_file = tmp_path / "input.txt"
+    input_file.write_bytes(b"1,2\n")
+
+    digest = file_digest(input_file)
+
+    assert digest == file_digest(input_file)
+    assert digest == content_digest(b"1,2\n")
+    assert digest != file_digest(input_file, salt=b"settings")
+    input_file.write_bytes(b"1,3\n")
+    assert digest != file_digest(input_file)
+
+
+def test_lru_file_cache_get_and_put(tmp_path):
+    cache = LRUFileCache(tmp_path / "cache")
+
+    assert cache.get("a") is None
+    entry = cache.put("a", write_entry(10))
+
+    assert entry == tmp_path / "cache" / "a"
+    assert cache.get("a") == entry
+    assert entry.joinpath("data.bin").read_bytes() == b"x" * 10
+    # Storing an existing key keeps the stored entry.
+    assert cache.put("a", write_entry(20)) == entry
+    assert [path.name for path in (tmp_path / "cache").iterdir()] == ["a"]
+
+
+def test_lru_file_cache_evicts_least_recently_used(tmp_path):
+    cache = LRUFileCache(tmp_path, max_bytes=25)
+    cache.put("a", write_entry(10))
+    cache.put("b", write_entry(10))
+    os.utime(tmp_path / "a", (1, 1))
+    os.utime(tmp_path / "b", (2, 2))
+    cache.get("a")
+
+    cache.put("c", write_entry(10))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "c"]
+
+
+def test_lru_file_cache_skips_vanished_entries(tmp_path, monkeypatch):
+    cache = LRUFileCache(tmp_path, max_bytes=15)
+    cache.put("a", write_entry(10))
+    tmp_path.joinpath("stray.txt").write_text("x")
+    iterdir = type(tmp_path).iterdir
+
+    def evicted_while_scanned(path):
+        # Another process evicts "a" after its modification time has been read.
+        if path.name == "a":
+            shutil.rmtree(path)
+        return iterdir(path)
+
+    monkeypatch.setattr(type(tmp_path), "iterdir", evicted_while_scanned)
+
+    assert cache.put("b", write_entry(10)) == tmp_path / "b"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["b", "stray.txt"]
+
+
+def test_lru_file_cache_ignores_write_errors(tmp_path):
+    def fail(entry):
+        raise OSError("disk full")
+
+    cache = LRUFileCache(tmp_path)
+
+    assert cache.put("a", fail) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("frame", [
+    pd.DataFrame([[1, 0.5], [2, 1.5]]),
+    pd.DataFrame({"Time": [0, 1], "Value": [0.1, 0.15]}),
+    pd.DataFrame(),
+])
+def test_measurement_cache_round_trip(tmp_path, frame):
+    input_file = tmp_path / "input.txt"
+    input_file.write_text("dummy")
+    cache = MeasurementCache(tmp_path / "cache")
+    key = cache.key(input_file, {"start": None})
+    metadata = [("Date", "2024-08-07"), ("名前", "値")]
+
+    assert cache.load(key) is None
+    cache.store(key, metadata, frame)
+    loaded_metadata, loaded_frame = cache.load(key)
+
+    assert loaded_metadata == metadata
+    pd.testing.assert_frame_equal(loaded_frame, frame)
+
+
+def test_measurement_cache_skips_non_numeric_frames(tmp_path):
+    cache = MeasurementCache(tmp_path)
+
+    cache.store("key", [], pd.DataFrame({"a": ["x", "y"]}))
+
+    assert cache.load("key") is None
+
+
+def test_measurement_cache_key_depends_on_settings(tmp_path):
+    input_file = tmp_path / "input.txt"
+    input_file.write_text("dummy")
+    cache = MeasurementCache(tmp_path / "cache")
+
+    assert cache.key(input_file, {"start": 1}) == cache.key(input_file, {"start": 1})
+    assert cache.key(input_file, {"start": 1}) != cache.key(input_file, {"start": 2})
+    assert cache.key(input_file, {"start": 1}) == cache.key(input_file, {"start": 1}, digest=content_digest(b"dummy"))
+
+
+def test_render_cache_key():
+    cache = RenderCache("unused")
+    x = np.arange(5, dtype=float)
+    key = cache.key([x, x * 2], {"title": "a"})
+
+    assert key == cache.key([x.copy(), x * 2], {"title": "a"})
+    assert key != cache.key([x, x * 3], {"title": "a"})
+    assert key != cache.key([x, x * 2], {"title": "b"})
+    assert key != cache.key([x.astype(np.float32), x * 2], {"title": "a"})
+    assert key != cache.key([x[:, None], x * 2], {"title": "a"})
+
+
+def test_render_cache_round_trip(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    image = tmp_path / "plot.png"
+    image.write_bytes(b"png")
+    output = tmp_path / "out" / "plot.png"
+    output.parent.mkdir()
+    output.write_bytes(b"old")
+
+    assert cache.load("key", output) is None
+    cache.store("key", image, 5)
+    image.write_bytes(b"changed")
+
+    assert cache.load("key", output) == 5
+    assert output.read_bytes() == b"png"
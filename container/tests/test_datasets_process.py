@@ -0,0 +1,189 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from rdetoolkit.exceptions import StructuredError
+from rdetoolkit.models.rde2types import RdeOutputResourcePath
+
+from modules.datasets_process import register_rawfiles
+from modules.graph_handler import GraphOptions
+from modules.metrics_handler import MetricsRecorder
+
+INPUTDATA_PATH = Path(__file__).parents[2].joinpath("inputdata")
+
+
+def make_resource_paths(root: Path, rawfile_names: list[str]) -> RdeOutputResourcePath:
+    dirs = {name: root.joinpath(name) for name in ("raw", "structured", "main_image", "other_image", "meta", "thumbnail", "logs", "invoice", "temp")}
+    for path in dirs.values():
+        path.mkdir(parents=True)
+    rawfiles = []
+    for name in rawfile_names:
+        rawfile = dirs["raw"].joinpath(name)
+        shutil.copy(INPUTDATA_PATH.joinpath("pattern1", "inputdata", "sample-data.txt"), rawfile)
+        rawfiles.append(rawfile)
+    invoice_org = dirs["invoice"].joinpath("invoice.json")
+    shutil.copy(INPUTDATA_PATH.joinpath("pattern1", "invoice", "invoice.json"), invoice_org)
+    return RdeOutputResourcePath(
+        raw=dirs["raw"],
+        rawfiles=tuple(rawfiles),
+        struct=dirs["structured"],
+        main_image=dirs["main_image"],
+        other_image=dirs["other_image"],
+        meta=dirs["meta"],
+        thumbnail=dirs["thumbnail"],
+        logs=dirs["logs"],
+        invoice=dirs["invoice"],
+        invoice_schema_json=dirs["invoice"].joinpath("invoice.schema.json"),
+        invoice_org=invoice_org,
+        temp=dirs["temp"],
+    )
+
+
+def test_register_rawfiles_single_file(tmp_path):
+    resource_paths = make_resource_paths(tmp_path, ["sample-data.txt"])
+
+    metas = register_rawfiles(resource_paths, GraphOptions(xlabel="x", ylabel="y"))
+
+    assert len(metas) == 1
+    assert ("ExperimentName", "Example Experiment") in metas[0]
+    assert sorted(path.name for path in resource_paths.struct.iterdir()) == ["data.csv", "header.csv", "sample-data.csv"]
+    assert [path.name for path in resource_paths.main_image.iterdir()] == ["sample-data.png"]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_register_rawfiles_multiple_files(tmp_path, max_workers):
+    resource_paths = make_resource_paths(tmp_path, ["a.txt", "b.txt", "c.txt"])
+
+    metas = register_rawfiles(resource_paths, GraphOptions(xlabel="x", ylabel="y"), max_workers=max_workers)
+
+    assert len(metas) == 3
+    assert metas[0] == metas[1] == metas[2]
+    assert sorted(path.name for path in resource_paths.struct.iterdir()) == [
+        f"{stem}{suffix}" for stem in "abc" for suffix in (".csv", "_data.csv", "_header.csv")
+    ]
+    assert sorted(path.name for path in resource_paths.main_image.iterdir()) == ["a.png", "b.png", "c.png"]
+    assert resource_paths.struct.joinpath("a_data.csv").read_text() == resource_paths.struct.joinpath("c_data.csv").read_text()
+
+
+def test_register_rawfiles_rejects_duplicate_stems(tmp_path):
+    resource_paths = make_resource_paths(tmp_path, ["a.txt", "a.dat", "b.txt"])
+
+    with pytest.raises(StructuredError, match="a$"):
+        register_rawfiles(resource_paths, GraphOptions(), max_workers=2)
+
+    assert list(resource_paths.struct.iterdir()) == []
+
+
+def test_register_rawfiles_uses_available_cpus(tmp_path, monkeypatch):
+    resource_paths = make_resource_paths(tmp_path, ["a.txt", "b.txt"])
+    # The process may only run on one CPU, so the files are registered in this process.
+    monkeypatch.setattr("os.sched_getaffinity", lambda pid: {0}, raising=False)
+    monkeypatch.setattr("modules.datasets_process.ProcessPoolExecutor", None)
+
+    metas = register_rawfiles(resource_paths, GraphOptions(xlabel="x", ylabel="y"))
+
+    assert len(metas) == 2
+
+
+def test_register_rawfiles_out_of_core(tmp_path):
+    expected_paths = make_resource_paths(tmp_path / "in_memory", ["sample-data.txt"])
+    resource_paths = make_resource_paths(tmp_path / "out_of_core", ["sample-data.txt"])
+    graph_options = GraphOptions(xlabel="x", ylabel="y")
+
+    expected = register_rawfiles(expected_paths, graph_options)
+    metas = register_rawfiles(resource_paths, graph_options, out_of_core_threshold=1)
+
+    assert metas == expected
+    for name in ("data.csv", "header.csv", "sample-data.csv"):
+        assert resource_paths.struct.joinpath(name).read_text() == expected_paths.struct.joinpath(name).read_text()
+    assert [path.name for path in resource_paths.main_image.iterdir()] == ["sample-data.png"]
+
+
+@pytest.mark.parametrize("out_of_core_threshold", [None, 1])
+def test_register_rawfiles_records_metrics(tmp_path, out_of_core_threshold):
+    resource_paths = make_resource_paths(tmp_path, ["a.txt", "b.txt"])
+    recorder = MetricsRecorder()
+
+    register_rawfiles(resource_paths, GraphOptions(xlabel="x", ylabel="y"), out_of_core_threshold=out_of_core_threshold, recorder=recorder)
+
+    assert sorted(recorder.files) == ["a.txt", "b.txt"]
+    report = recorder.files["a.txt"]
+    assert report["counters"]["rows"] == report["counters"]["points_plotted"] > 0
+    assert report["counters"]["bytes_read"] == resource_paths.rawfiles[0].stat().st_size
+    assert "read_input" in report["stages"]
+    assert sorted(report["outputs"]) == ["a.csv", "a.png", "a_data.csv", "a_header.csv"]
+
+
+@pytest.mark.parametrize("rawfile_names", [["sample-data.txt"], ["a.txt", "b.txt"]])
+def test_register_rawfiles_render_workers(tmp_path, rawfile_names):
+    expected_paths = make_resource_paths(tmp_path / "expected", rawfile_names)
+    resource_paths = make_resource_paths(tmp_path / "rendered", rawfile_names)
+    graph_options = GraphOptions(xlabel="x", ylabel="y")
+    recorder = MetricsRecorder()
+
+    expected = register_rawfiles(expected_paths, graph_options, max_workers=1)
+    metas = register_rawfiles(resource_paths, graph_options, max_workers=1, render_workers=1, recorder=recorder)
+
+    assert metas == expected
+    for rawfile in resource_paths.rawfiles:
+        image = f"{rawfile.stem}.png"
+        assert resource_paths.main_image.joinpath(image).read_bytes() == expected_paths.main_image.joinpath(image).read_bytes()
+        assert recorder.files[rawfile.name]["counters"]["points_plotted"] > 0
+        assert image in recorder.files[rawfile.name]["outputs"]
+
+
+@pytest.mark.parametrize("out_of_core_threshold", [None, 1])
+def test_register_rawfiles_csv_format(tmp_path, out_of_core_threshold):
+    resource_paths = make_resource_paths(tmp_path, ["sample-data.txt"])
+
+    register_rawfiles(
+        resource_paths,
+        GraphOptions(xlabel="x", ylabel="y"),
+        out_of_core_threshold=out_of_core_threshold,
+        csv_float_format="%.2f",
+        csv_compression="gzip",
+    )
+
+    assert sorted(path.name for path in resource_paths.struct.iterdir()) == ["data.csv.gz", "header.csv", "sample-data.csv.gz"]
+    lines = gzip.decompress(resource_paths.struct.joinpath("sample-data.csv.gz").read_bytes()).decode().splitlines()
+    assert lines[:3] == ["Time,Value", "0,0.10", "1,0.15"]
+
+
+@pytest.mark.parametrize("out_of_core_threshold", [None, 1])
+def test_register_rawfiles_columnar_format(tmp_path, out_of_core_threshold):
+    pytest.importorskip("pyarrow")
+    resource_paths = make_resource_paths(tmp_path, ["sample-data.txt"])
+
+    register_rawfiles(resource_paths, GraphOptions(xlabel="x", ylabel="y"), out_of_core_threshold=out_of_core_threshold, columnar_format="parquet")
+
+    assert sorted(path.name for path in resource_paths.struct.iterdir()) == ["data.csv", "data.parquet", "header.csv", "sample-data.csv"]
+    frame = pd.read_parquet(resource_paths.struct.joinpath("data.parquet"))
+    # Streamed integer columns are stored as float64.
+    pd.testing.assert_frame_equal(frame, pd.read_csv(resource_paths.struct.joinpath("data.csv")), check_dtype=out_of_core_threshold is None)
+
+
+@pytest.mark.parametrize("out_of_core_threshold", [None, 1])
+def test_register_rawfiles_concurrent_stages(tmp_path, out_of_core_threshold):
+    expected_paths = make_resource_paths(tmp_path / "serial", ["sample-data.txt"])
+    resource_paths = make_resource_paths(tmp_path / "concurrent", ["sample-data.txt"])
+    graph_options = GraphOptions(xlabel="x", ylabel="y")
+
+    expected = register_rawfiles(expected_paths, graph_options, out_of_core_threshold=out_of_core_threshold, concurrent_stages=False)
+    metas = register_rawfiles(resource_paths, graph_options, out_of_core_threshold=out_of_core_threshold, concurrent_stages=True)
+
+    assert metas == expected
+    for name in ("data.csv", "header.csv", "sample-data.csv"):
+        assert resource_paths.struct.joinpath(name).read_bytes() == expected_paths.struct.joinpath(name).read_bytes()
+    assert resource_paths.main_image.joinpath("sample-data.png").read_bytes() == expected_paths.main_image.joinpath("sample-data.png").read_bytes()
+
+
+def test_register_rawfiles_raises_stage_errors(tmp_path):
+    resource_paths = make_resource_paths(tmp_path, ["sample-data.txt"])
+    resource_paths.main_image.rmdir()
+
+    with pytest.raises(FileNotFoundError):
+        register_rawfiles(resource_paths, GraphOptions(xlabel="x", ylabel="y"))
+
+    assert resource_paths.struct.joinpath("header.csv").exists()
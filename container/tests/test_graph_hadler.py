@@ -2,12 +2,17 @@ import os
 from pathlib import Path
 
 from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
 from unittest.mock import patch
 import tempfile
 import pandas as pd
 import pytest
 
-from modules.graph_handler import GraphPlotter, GraphOptions
+import numpy as np
+
+from modules.graph_handler import DEFAULT_MAX_PLOT_POINTS, GraphPlotter, GraphOptions, RenderPool, ScatterAccumulator, decimate_extrema, resolve_font_families
+from modules.cache_handler import RenderCache
+from modules.metrics_handler import MetricsRecorder
 
 plt.rcParams["font.family"] = "Noto Sans CJK JP"
 
@@ -57,8 +62,232 @@ def test_plot_with_mock(sample_data, graph_options):
     # matplotlibのsavefigメソッドをモック化して、正しく呼ばれるか確認
     plotter = GraphPlotter()
 
-    with patch.object(plt, 'savefig') as mock_savefig:
+    with patch.object(Figure, 'savefig') as mock_savefig:
         with tempfile.TemporaryDirectory() as tempdir:
             save_path = Path(tempdir) / "mock_plot.png"
             plotter.plot(sample_data, save_path, graph_options)
             mock_savefig.assert_called_once_with(save_path)
+
+
+def test_scatter_accumulator_keeps_small_data(sample_data, graph_options):
+    accumulator = ScatterAccumulator(graph_options)
+
+    chunks = list(accumulator.track([sample_data.iloc[:2], sample_data.iloc[2:]]))
+
+    assert len(chunks) == 2
+    assert accumulator.frame().equals(pd.DataFrame({0: [1.0, 2, 3, 4, 5], 1: [2.0, 3, 4, 5, 6]}))
+    assert (accumulator.options().x_col_num, accumulator.options().y_col_num) == (0, 1)
+
+
+def test_scatter_accumulator_bounds_points():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 100)
+    y[1234] = 5
+    y[8765] = -5
+    data = pd.DataFrame({"x": x, "y": y})
+    accumulator = ScatterAccumulator(GraphOptions(), max_points=500)
+
+    for start in range(0, len(data), 777):
+        accumulator.add(data.iloc[start:start + 777])
+
+    frame = accumulator.frame()
+    assert 250 <= len(frame) <= 500
+    assert frame[0].is_monotonic_increasing
+    assert {1234.0, 8765.0} <= set(frame[0])
+
+
+def test_scatter_accumulator_uses_max_points_of_options():
+    assert ScatterAccumulator(GraphOptions()).max_points == DEFAULT_MAX_PLOT_POINTS
+    assert ScatterAccumulator(GraphOptions(max_points=400)).max_points == 400
+    assert ScatterAccumulator(GraphOptions(max_points=400), max_points=500).max_points == 500
+
+
+def capture_axes(plotter, data, option):
+    """Plot the data and return the axes at the time the figure is saved."""
+    captured = []
+    with patch.object(Figure, 'savefig', autospec=True, side_effect=lambda fig, path: captured.append(fig.axes[0])):
+        plotter.plot(data, Path("mock_plot.png"), option)
+    return captured[0]
+
+
+@pytest.mark.parametrize("log_density", [False, True])
+def test_plot_density(log_density):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"x": rng.normal(size=200_000), "y": rng.normal(size=200_000)})
+    data.iloc[0, 1] = np.nan
+    option = GraphOptions(xlabel="X-axis", ylabel="Y-axis", plot_mode="density", log_density=log_density)
+
+    ax = capture_axes(GraphPlotter(), data, option)
+
+    assert not ax.collections
+    counts = ax.images[0].get_array()
+    assert counts.sum() == len(data) - 1
+    assert counts.shape == tuple(int(size) for size in ax.get_window_extent().size[::-1])
+    assert ax.get_xlabel() == "X-axis"
+
+
+def test_plot_density_constant_values():
+    data = pd.DataFrame({"x": [1.0] * 10, "y": [2.0] * 10})
+
+    ax = capture_axes(GraphPlotter(), data, GraphOptions(plot_mode="density"))
+
+    assert ax.images[0].get_array().sum() == 10
+
+
+@pytest.mark.parametrize(("density_threshold", "expected"), [(4, True), (5, False)])
+def test_plot_auto_mode(sample_data, density_threshold, expected):
+    option = GraphOptions(plot_mode="auto", density_threshold=density_threshold)
+
+    ax = capture_axes(GraphPlotter(), sample_data, option)
+
+    assert bool(ax.images) is expected
+    assert bool(ax.collections) is not expected
+
+
+def test_scatter_accumulator_plots_scatter(graph_options):
+    accumulator = ScatterAccumulator(graph_options.model_copy(update={"plot_mode": "density"}))
+
+    assert accumulator.options().plot_mode == "scatter"
+
+
+def test_decimate_extrema_keeps_peaks():
+    x = np.arange(100_000, dtype=float)
+    y = np.sin(x / 1000)
+    y[12_345] = 50.0
+    y[67_890] = -50.0
+
+    keep = decimate_extrema(x, y, 1000)
+
+    assert len(keep) <= 1000
+    assert np.all(np.diff(keep) > 0)
+    assert {0, 12_345, 67_890, 99_999} <= set(keep.tolist())
+    assert y[keep].max() == y.max() and y[keep].min() == y.min()
+
+
+def test_decimate_extrema_keeps_small_data():
+    x = np.array([3.0, 1.0, 2.0])
+
+    assert decimate_extrema(x, x, 4).tolist() == [0, 1, 2]
+
+
+def test_plot_decimates_to_max_points(tmp_path):
+    x = np.linspace(0, 10, 50_000)
+    data = pd.DataFrame({"x": x, "y": np.cos(x)})
+    plotter = GraphPlotter()
+
+    ax = capture_axes(plotter, data, GraphOptions(max_points=400))
+    plotter.recorder = MetricsRecorder()
+    plotter.plot(data, tmp_path / "plot.png", GraphOptions(max_points=400))
+
+    assert len(ax.collections[0].get_offsets()) <= 400
+    assert plotter.recorder.counters["points_plotted"] == len(ax.collections[0].get_offsets())
+
+
+def test_plot_reuses_figure(sample_data, graph_options):
+    plotter = GraphPlotter()
+    density = GraphOptions(plot_mode="density", title="Density")
+
+    first = capture_axes(plotter, sample_data, graph_options)
+    colors = first.collections[0].get_facecolors().copy()
+    capture_axes(plotter, sample_data * 10, density)
+    second = capture_axes(plotter, sample_data * 100, GraphOptions())
+
+    assert second is first
+    assert len(second.collections) == 1 and not second.images
+    assert (second.get_title(), second.get_xlabel()) == ("", "")
+    assert second.get_xlim()[1] > 400
+    assert (second.collections[0].get_facecolors() == colors).all()
+    assert plt.get_fignums() == []
+
+
+def test_resolve_font_families(caplog):
+    assert resolve_font_families(("DejaVu Sans",)) == ["DejaVu Sans"]
+    assert not caplog.records
+
+    assert resolve_font_families(("Missing Font A", "DejaVu Sans")) == ["DejaVu Sans"]
+    assert "Missing Font A is not installed, falling back to DejaVu Sans" in caplog.text
+
+    assert resolve_font_families(("Missing Font B",)) == ["sans-serif"]
+    assert "falling back to sans-serif" in caplog.text
+
+
+def test_plot_uses_resolved_fonts(sample_data):
+    plotter = GraphPlotter()
+    rc_families = plt.rcParams["font.family"]
+    capture_axes(plotter, sample_data, GraphOptions(title="Title", font_families=["DejaVu Serif"]))
+
+    ax = capture_axes(plotter, sample_data, GraphOptions(title="Title", font_families=["Missing Font C", "DejaVu Sans"]))
+
+    assert plt.rcParams["font.family"] == rc_families
+    # The texts of the figure shared with the previous plot are restyled too.
+    ax.figure.canvas.draw()
+    texts = [ax.title, ax.xaxis.label, ax.yaxis.label, *ax.get_xticklabels(), *ax.get_yticklabels()]
+    assert {tuple(text.get_fontfamily()) for text in texts} == {("DejaVu Sans",)}
+
+
+def test_render_pool(tmp_path, sample_data, graph_options):
+    jobs = [
+        (sample_data, tmp_path / "a.png", graph_options),
+        (sample_data, tmp_path / "b", GraphOptions(plot_mode="density")),
+        (sample_data, tmp_path / "missing" / "c.png", graph_options),
+    ]
+
+    with RenderPool(2) as pool:
+        results = pool.render(jobs)
+
+    assert [result.save_path for result in results] == [tmp_path / "a.png", tmp_path / "b.png", tmp_path / "missing" / "c.png"]
+    assert [result.points for result in results] == [5, 5, 0]
+    assert results[0].error is None and results[1].error is None
+    assert isinstance(results[2].error, FileNotFoundError)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.png", "b.png"]
+
+
+def test_render_pool_uses_available_cpus(monkeypatch):
+    monkeypatch.setattr("modules.graph_handler.available_cpus", lambda: 1)
+
+    with RenderPool() as pool:
+        assert pool.max_workers == 1
+
+
+def test_render_pool_matches_plot(tmp_path, graph_options):
+    data = pd.DataFrame({"t": [0, 1, 2], "x": [1.5, 2.5, 3.5], "y": [4, 2, 6]})
+    option = graph_options.model_copy(update={"x_col_num": 1, "y_col_num": 2})
+    GraphPlotter().plot(data, tmp_path / "expected.png", option)
+
+    with RenderPool(1, option=option) as pool:
+        pool.submit(data, tmp_path / "rendered.png", option)
+        assert pool.collect()[0].error is None
+
+    assert (tmp_path / "rendered.png").read_bytes() == (tmp_path / "expected.png").read_bytes()
+
+
+def test_plot_render_cache(tmp_path, sample_data, graph_options):
+    plotter = GraphPlotter()
+    plotter.render_cache = RenderCache(tmp_path / "cache")
+    plotter.recorder = MetricsRecorder()
+
+    plotter.plot(sample_data, tmp_path / "first.png", graph_options)
+    with patch.object(Figure, 'savefig', autospec=True, side_effect=Figure.savefig) as mock_savefig:
+        plotter.plot(sample_data, tmp_path / "second.png", graph_options)
+        plotter.plot(sample_data, tmp_path / "third.png", graph_options.model_copy(update={"title": "Other"}))
+
+    assert mock_savefig.call_count == 1
+    assert plotter.recorder.counters["render_cache_hits"] == 1
+    assert plotter.recorder.counters["points_plotted"] == 15
+    assert (tmp_path / "second.png").read_bytes() == (tmp_path / "first.png").read_bytes()
+
+    # A new image for a path linked to a cached one leaves the cached one intact.
+    plotter.plot(sample_data * 2, tmp_path / "second.png", graph_options)
+    plotter.plot(sample_data, tmp_path / "fourth.png", graph_options)
+    assert (tmp_path / "fourth.png").read_bytes() == (tmp_path / "first.png").read_bytes()
+    assert (tmp_path / "second.png").read_bytes() != (tmp_path / "first.png").read_bytes()
+
+
+def test_plot_render_cache_skips_non_numeric(tmp_path):
+    plotter = GraphPlotter()
+    plotter.render_cache = RenderCache(tmp_path / "cache")
+
+    plotter.plot(pd.DataFrame({"x": ["a", "b"], "y": [1, 2]}), tmp_path / "plot.png", GraphOptions())
+
+    assert (tmp_path / "plot.png").exists()
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import time in microseconds that the modules may add to that of rdetoolkit, which already imports
+# pandas, pydantic and matplotlib.pyplot. The modules add about 40ms when this is written.
+IMPORT_TIME_BUDGET_US = 250_000
+
+# Prints the third-party packages, such as pyarrow, that importing the modules loads on top of rdetoolkit.
+ADDED_THIRD_PARTY_PACKAGES = """
+import json, sys, sysconfig
+import rdetoolkit
+before = {name.partition(".")[0] for name in sys.modules}
+import modules.datasets_process
+paths = sysconfig.get_paths()
+site_dirs = (paths["purelib"], paths["platlib"])
+stdlib_dirs = (paths["stdlib"], paths["platstdlib"])
+def third_party(path):
+    return path.startswith(site_dirs) or not path.startswith(stdlib_dirs)
+added = {name.partition(".")[0] for name in sys.modules} - before - {"modules"}
+print(json.dumps(sorted(name for name in added if third_party(getattr(sys.modules[name], "__file__", None) or stdlib_dirs[0]))))
+"""
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run([sys.executable, *args], cwd=Path(__file__).parents[1], capture_output=True, text=True, check=True)
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Run the statement in a new interpreter and return the self import time of each module."""
+    times = {}
+    for line in run_python("-X", "importtime", "-c", statement).stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if line.startswith("import time:") and fields[0].strip().isdigit():
+            times[fields[2].strip()] = int(fields[0])
+    return times
+
+
+def test_modules_import_no_heavy_libraries():
+    # Optional libraries such as pyarrow must be imported on first use, not with the modules.
+    assert json.loads(run_python("-c", ADDED_THIRD_PARTY_PACKAGES).stdout) == []
+
+
+@pytest.mark.benchmark
+def test_import_time_within_budget():
+    baseline = import_times("import rdetoolkit")
+    times = import_times("import rdetoolkit; import modules.datasets_process")
+
+    added = {name: time for name, time in times.items() if name not in baseline}
+
+    assert "modules.datasets_process" in added
+    slowest = sorted(added.items(), key=lambda item: -item[1])[:10]
+    assert sum(added.values()) < IMPORT_TIME_BUDGET_US, slowest
@@ -1,3 +1,6 @@
+import bz2
+import gzip
+import lzma
 import os
 from pathlib import Path
 from unittest.mock import patch
@@ -6,7 +9,30 @@ import pytest
 
 from rdetoolkit.exceptions import StructuredError
 
-from modules.inputfile_handler import HeaderParser, MeasurementParser, FileOperator, DataParser, FileReader, detect_separator
+from modules.cache_handler import MeasurementCache
+from modules.inputfile_handler import (
+    HeaderParser,
+    MeasurementParser,
+    FileOperator,
+    MappedFileOperator,
+    DataParser,
+    FileReader,
+    IngestedFile,
+    MappedFile,
+    StreamedFile,
+    LineStream,
+    SeparatorSniffer,
+    SniffResult,
+    LineKind,
+    ColumnarBuilder,
+    convert_tokens,
+    classify_line,
+    detect_compression,
+    detect_encoding,
+    detect_separator,
+)
+
+COMPRESSORS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
 
 
 @pytest.fixture
@@ -49,9 +75,37 @@ def test_inputfile():
         ("not comment\n", False),
     ],
 )
-def test_headerparse_is_comment_or_empty(line, expected):
-    header_parser = HeaderParser()
-    assert header_parser._HeaderParser__is_comment_or_empty(line) == expected
+def test_classify_line_comment_or_empty(line, expected):
+    assert (classify_line(line) is LineKind.COMMENT) == expected
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("", LineKind.COMMENT),
+        ("   ", LineKind.COMMENT),
+        ("# comment", LineKind.COMMENT),
+        ("; 1000 0.01", LineKind.COMMENT),
+        ("[Data]", LineKind.MARKER),
+        ("( measurement )", LineKind.MARKER),
+        ("[Data], x", LineKind.MARKER),
+        ("[Header]", LineKind.SECTION),
+        ("name [unit]: 1", LineKind.SECTION),
+        ("header: value", LineKind.HEADER),
+        ("1000 0.01", LineKind.NUMERIC),
+        (" 1.,.5;\t3 ", LineKind.NUMERIC),
+        ("-1.2e-5, +3E2", LineKind.NUMERIC),
+        ("1 -inf NaN Infinity", LineKind.NUMERIC),
+        ("nan inf", LineKind.TEXT),
+        ("1e", LineKind.TEXT),
+        ("1000, ", LineKind.TEXT),
+        ("1.2.3", LineKind.TEXT),
+        ("date: 2021-01-01", LineKind.TEXT),
+        ("1000,abc", LineKind.TEXT),
+    ],
+)
+def test_classify_line(line, expected):
+    assert classify_line(line) is expected
 
 
 @pytest.mark.parametrize(
@@ -132,6 +186,50 @@ def test_detect_separator(lines, separators, expected):
     assert detect_separator(lines, separators) == expected
 
 
+@pytest.mark.parametrize("lines, expected", [
+    (["a,b", "c,d", "", "e"], SniffResult(",", 2 / 3)),
+    (["a\tb\tc", "d\te", "f\tg"], SniffResult("\t", 2 / 3)),
+    (["abc", "def"], SniffResult(None, 0.0)),
+])
+def test_separator_sniffer_sniff(lines, expected):
+    assert SeparatorSniffer().sniff(lines, [",", "\t"]) == expected
+
+
+def test_separator_sniffer_caps_sample_size():
+    lines = [",".join(["1"] * 100_000), "1\t2", "1\t2"]
+
+    assert SeparatorSniffer().sniff(lines, [",", "\t"]).separator == "\t"
+    # The long line uses up the budget, so the following lines are not sampled.
+    assert SeparatorSniffer(max_chars=16).sniff(lines, [",", "\t"]) == SniffResult(",", 1.0)
+
+
+def test_separator_sniffer_does_not_reuse_cut_counts():
+    sniffer = SeparatorSniffer(max_chars=8)
+    lines = ["abcdefg", "x,y"]
+
+    # The second line is cut to "x" when sampled from the first line.
+    assert sniffer.sniff(lines, [","]) == SniffResult(None, 0.0)
+    assert sniffer.sniff(lines[1:], [","], start=1) == SniffResult(",", 1.0)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_data_parser_sniffs_each_line_once(inputdata_file, chunk_size):
+    counted: list[str] = []
+    count = SeparatorSniffer._SeparatorSniffer__count
+
+    def spy(self, line):
+        counted.append(line)
+        return count(self, line)
+
+    with patch.object(SeparatorSniffer, "_SeparatorSniffer__count", spy):
+        parser = DataParser(FileOperator(inputdata_file), HeaderParser(), MeasurementParser(), chunk_size=chunk_size)
+        parser.process()
+
+    assert len(counted) == len(FileOperator(inputdata_file).read())
+    assert parser.header_parser.sep == ":"
+    assert parser.measurement_parser.sep == " "
+
+
 @pytest.mark.parametrize(
     "line, expected, separator",
     [
@@ -157,8 +255,8 @@ def test_header_parser_split_key_value(line, expected, separator):
         assert (key, value) == expected
 
 
-@patch('modules.inputfile_handler.detect_separator', return_value=':')
-def test_header_parser_parse(mock_detect_separator):
+@patch('modules.inputfile_handler.SeparatorSniffer.sniff', return_value=SniffResult(':', 1.0))
+def test_header_parser_parse(mock_sniff):
     header_parser = HeaderParser()
     data = [
         "# comment",
@@ -262,6 +360,8 @@ def test_mesurements_parser_parse():
         ("1000,0.01", ",", [1000, 0.01]),
         ("1000;0.01", ";", [1000, 0.01]),
         ("1000:0.01", ":", [1000, 0.01]),
+        ("-1.2e-5,+3,.5,1.", ",", [-1.2e-5, 3, 0.5, 1.0]),
+        ("-2\t1E3", "\t", [-2, 1000.0]),
     ],
 )
 def test_mesurement_parser_split_data_line(line, sep, expected):
@@ -349,6 +449,368 @@ def test_file_operator(inputdata_file):
     assert operator.read() == expected
 
 
+def test_file_operator_iter_lines(inputdata_file):
+    operator = FileOperator(inputdata_file)
+
+    assert list(operator.iter_lines()) == operator.read()
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 1 << 20])
+@pytest.mark.parametrize(
+    "contents, expected",
+    [
+        (b"", []),
+        (b"\n", [""]),
+        (b"a\nb", ["a", "b"]),
+        (b"a\r\nb\r\n", ["a", "b"]),
+        (b"a\rb\n\nc\n", ["a", "b", "", "c"]),
+    ],
+)
+def test_ingested_file_lines(tmp_path, monkeypatch, block_size, contents, expected):
+    monkeypatch.setattr("modules.inputfile_handler.TEXT_BLOCK_SIZE", block_size)
+    input_file = tmp_path / "input.txt"
+    input_file.write_bytes(contents)
+
+    source = IngestedFile(input_file)
+
+    assert source.read_lines() == expected
+    assert list(source.iter_lines()) == expected
+
+
+@pytest.mark.parametrize("block_lines", [1, 2, 10_000])
+@pytest.mark.parametrize(
+    "contents",
+    [
+        b"\n",
+        b"a\nb",
+        b"a\r\nb\r\n",
+        b"a\n\nc\n",
+        "ヘッダー,値\r\n[Data]\r\n1,2\r\n".encode("cp932"),
+        "\ufeffキー,値\n1,2\n".encode("utf_8"),
+    ],
+)
+def test_mapped_file_lines(tmp_path, monkeypatch, block_lines, contents):
+    monkeypatch.setattr("modules.inputfile_handler.MAPPED_BLOCK_LINES", block_lines)
+    monkeypatch.setattr("modules.inputfile_handler.INDEX_BLOCK_SIZE", 2)
+    input_file = tmp_path / "input.txt"
+    input_file.write_bytes(contents)
+    expected = IngestedFile(input_file).read_lines()
+
+    mapped = MappedFile(input_file)
+
+    assert len(mapped) == len(expected)
+    assert list(mapped) == expected
+    assert [mapped[i] for i in range(len(mapped))] == expected
+    assert mapped[1:] == expected[1:]
+    assert mapped[-1] == expected[-1]
+    assert list(mapped.iter_lines(1)) == expected[1:]
+    mapped.close()
+
+
+@pytest.mark.parametrize("contents", [b"a\rb\r", "a\nb\n".encode("utf_16")])
+def test_mapped_file_unsupported(tmp_path, contents):
+    input_file = tmp_path / "input.txt"
+    input_file.write_bytes(contents)
+
+    with pytest.raises(ValueError):
+        MappedFile(input_file)
+
+
+def test_mapped_file_search_char(tmp_path):
+    input_file = tmp_path / "input.txt"
+    # "ソ" is 0x83 0x5C in cp932; its second byte is a backslash.
+    input_file.write_bytes("測定データ ソ\\Data\r\nヘッダー,値\r\n\\Data\r\n1,2\r\n".encode("cp932") * 20)
+
+    mapped = MappedFile(input_file, search_char="\\Data")
+
+    assert mapped.encoding == "cp932"
+    assert mapped.search_char_line_number == 1
+    assert mapped.find_line_number("ヘッダー") == 2
+    assert mapped.find_line_number("[Header]") is None
+    mapped.close()
+
+
+def test_mapped_line_stream_take_text(tmp_path):
+    input_file = tmp_path / "input.txt"
+    input_file.write_text("".join(f"{i}\n" for i in range(10)), encoding="utf-8")
+    stream = MappedFile(input_file).open_stream(2)
+
+    assert stream.peek(3) == ["2", "3", "4"]
+    assert stream.take_text(2) == ("2\n3", 2)
+    assert stream.take_text(4) == ("4\n5\n6\n7", 4)
+    assert next(stream) == "8"
+    assert stream.take_text(4) == ("9", 1)
+    assert stream.take_text(4) == ("", 0)
+    assert stream.position == 10
+
+
+def test_ingested_file_search_char(tmp_path):
+    input_file = tmp_path / "input.txt"
+    input_file.write_bytes("ヘッダー,値\r\n[Data]\r\n1,2\r\n".encode("cp932"))
+
+    source = IngestedFile(input_file, search_char="[Data]")
+
+    assert source.encoding == "cp932"
+    assert source.search_char_line_number == 2
+    assert source.find_line_number("ヘッダー") == 1
+    assert source.find_line_number("[Header]") is None
+
+
+@pytest.mark.parametrize("encoding", ["utf_8", "cp932", "euc_jp"])
+def test_detect_encoding(encoding):
+    contents = "計測日,2024-08-07\n装置名,テスト装置\n[Data]\n".encode(encoding) * 20
+
+    assert contents.decode(detect_encoding(contents)) == contents.decode(encoding)
+
+
+def test_line_stream_peek_does_not_consume():
+    stream = LineStream(["a", "b", "c"], start=10)
+
+    assert stream.peek(2) == ["a", "b"]
+    assert stream.peek(5) == ["a", "b", "c"]
+    assert next(stream) == "a"
+    assert stream.position == 11
+    assert list(stream) == ["b", "c"]
+    assert stream.position == 13
+
+
+def test_line_stream_take():
+    stream = LineStream(["a", "b", "c"])
+    stream.peek(1)
+
+    assert stream.take(2) == ["a", "b"]
+    assert stream.position == 2
+    assert stream.take(2) == ["c"]
+    assert stream.take(2) == []
+    assert stream.position == 3
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_mesurements_parser_parse_stream(chunk_size):
+    lines = ["Time,Value", "0,0.1", "# comment", "1,0.15", "2,0.2", "3,0.25", "4,1"]
+    mesurement_parser = MeasurementParser()
+
+    df = mesurement_parser.parse_stream(LineStream(lines, start=5), chunk_size=chunk_size)
+
+    expected = pd.DataFrame([[0, 0.1], [1, 0.15], [2, 0.2], [3, 0.25], [4, 1.0]], columns=["Time", "Value"])
+    assert df.equals(expected)
+
+
+@pytest.fixture
+def mixed_measurement_lines():
+    # Non-dyadic decimals, so that a conversion that is not exact changes the bits of the values.
+    lines = ["Time,Value,Error"]
+    lines += [f"{i},{i / 7!r},{i % 7}" for i in range(100)]
+    lines += ["# comment", "", "[data]", "100,-1,2", "101,1e3,2", "102,.5,2", "103,5.,2", "104,a,2"]
+    lines += [f"{i},{i / 3!r},{i}.1" for i in range(105, 200)]
+    lines += ["200,1,2", "201,1", "  202 , 1 , 2  "]
+    lines += [f"{i},{i},{i * 0.1!r}" for i in range(203, 300)]
+    yield lines
+
+
+def assert_frame_bits_equal(df, expected, *, check_dtype=True):
+    """Assert that the frames hold the same values bit for bit."""
+    assert list(df.columns) == list(expected.columns)
+    if check_dtype:
+        assert list(df.dtypes) == list(expected.dtypes)
+    for column in df.columns:
+        assert df[column].to_numpy(dtype=float).tobytes() == expected[column].to_numpy(dtype=float).tobytes(), column
+
+
+@pytest.mark.parametrize("engine", MeasurementParser.engines)
+@pytest.mark.parametrize("chunk_size", [7, 10, 64, 1000])
+def test_mesurements_parser_engines_are_equivalent(mixed_measurement_lines, engine, chunk_size):
+    expected = MeasurementParser(engine="python").parse_stream(LineStream(mixed_measurement_lines), chunk_size=1000)
+    assert expected["Value"].iloc[:100].tolist() == [i / 7 for i in range(100)]
+
+    df = MeasurementParser(engine=engine).parse_stream(LineStream(mixed_measurement_lines), chunk_size=chunk_size)
+    chunks = list(MeasurementParser(engine=engine).iter_stream(LineStream(mixed_measurement_lines), chunk_size=chunk_size))
+
+    assert_frame_bits_equal(df, expected)
+    # Out-of-core chunks only promote an int column to float where they need it.
+    assert_frame_bits_equal(pd.concat(chunks, ignore_index=True), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("sep", [" ", "\t", ";", "|"])
+def test_mesurements_parser_c_engine_separators(sep):
+    lines = [f"{i}{sep}{i / 8}" for i in range(100)]
+    expected = MeasurementParser(engine="python").parse_stream(LineStream(lines))
+
+    df = MeasurementParser(engine="c").parse_stream(LineStream(lines))
+
+    assert df.equals(expected)
+    assert df.shape == (100, 2)
+
+
+def test_mesurements_parser_float_grammar():
+    lines = [f"{-i},{(-1) ** i * i / 3:.6e},{i * 0.5:+}" for i in range(100)] + ["100,inf,-nan", "-101,.5,+Infinity"]
+    expected = MeasurementParser(engine="python").parse_stream(LineStream(lines))
+
+    df = MeasurementParser(engine="c").parse_stream(LineStream(lines))
+
+    assert df.equals(expected)
+    assert df.dtypes.tolist() == ["int64", "float64", "float64"]
+    assert df.iloc[99].tolist() == [-99.0, float("-3.300000e+01"), 49.5]
+    assert df.iloc[101].tolist() == [-101.0, 0.5, float("inf")]
+    assert df.iloc[100].isna().tolist() == [False, False, True]
+
+
+def test_mesurements_parser_c_engine_invalid_line():
+    lines = ["1,2"] * 40 + ["3"]
+
+    with pytest.raises(StructuredError):
+        MeasurementParser(engine="c").parse_stream(LineStream(lines))
+
+
+def test_mesurements_parser_unknown_engine():
+    with pytest.raises(ValueError):
+        MeasurementParser(engine="numpy")
+
+
+@pytest.mark.parametrize("batch_rows", [1, 2, 4096])
+@pytest.mark.parametrize("rows", [
+    [[1, 2], [3, 4]],
+    [[1, 2], [3, 4.5], [5, 6]],
+    [[1, 2, 3], [4], [5, 6]],
+    [[1], [2, 3.5], [4, 5, 6]],
+])
+def test_columnar_builder_matches_dataframe(monkeypatch, batch_rows, rows):
+    monkeypatch.setattr(ColumnarBuilder, "BATCH_ROWS", batch_rows)
+    builder = ColumnarBuilder()
+    builder.append(rows[0])
+    builder.extend(rows[1:])
+
+    assert len(builder) == len(rows)
+    pd.testing.assert_frame_equal(builder.build(), pd.DataFrame(rows))
+    assert builder.build().empty
+
+
+@pytest.mark.parametrize("batch_rows", [1, 4096])
+def test_columnar_builder_keeps_int_overflow(monkeypatch, batch_rows):
+    monkeypatch.setattr(ColumnarBuilder, "BATCH_ROWS", batch_rows)
+    builder = ColumnarBuilder()
+    builder.extend([[1, 2], [2**63, 3], [10**20 + 1, 0.5], [4]])
+    builder.extend([[5, 6], [-10**20 - 1, 7]])
+    frame = builder.build()
+
+    assert frame.dtypes.tolist() == ["object", "float64"]
+    assert frame[0].tolist() == [1, 2**63, 10**20 + 1, 4, 5, -10**20 - 1]
+    assert frame[1].tolist()[:3] == [2.0, 3.0, 0.5]
+    assert pd.isna(frame[1][3])
+
+
+@pytest.mark.parametrize("tokens, expected, invalid", [
+    (["1", "2", "-3"], [1, 2, -3], []),
+    (["1", "2.5", "1e3"], [1.0, 2.5, 1000.0], []),
+    (["1", "x", "", "2"], [1.0, float("nan"), float("nan"), 2.0], [1, 2]),
+    (["1", "NaN", "2"], [1.0, float("nan"), 2.0], []),
+    ([], [], []),
+])
+def test_convert_tokens(tokens, expected, invalid):
+    values, invalid_positions = convert_tokens(tokens)
+
+    assert values.dtype.kind == ("i" if all(isinstance(value, int) for value in expected) else "f")
+    assert pd.Series(values, dtype=float).equals(pd.Series(expected, dtype=float))
+    assert invalid_positions.tolist() == invalid
+
+
+def test_convert_tokens_round_trips_floats():
+    numbers = [i / 7 for i in range(1, 1000)] + [i * 0.1 for i in range(1000)]
+
+    assert convert_tokens([repr(number) for number in numbers]).values.tolist() == numbers
+
+
+@pytest.mark.parametrize("engine", MeasurementParser.engines)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_mesurements_parser_round_trips_floats(engine, chunk_size):
+    lines = [f"{i},{i / 7!r}" for i in range(200)]
+
+    frame = MeasurementParser(engine).parse_stream(LineStream(lines), chunk_size=chunk_size)
+
+    assert frame[1].tolist() == [i / 7 for i in range(200)]
+
+
+@pytest.mark.parametrize("engine", MeasurementParser.engines)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_mesurements_parser_keeps_large_integers(engine, chunk_size):
+    lines = [f"{i},{i / 7!r}" for i in range(20)] + [f"{10**20 + 1},0.5", f"{2**63},1.5"]
+
+    frame = MeasurementParser(engine).parse_stream(LineStream(lines), chunk_size=chunk_size)
+
+    assert frame[0].dtype == object
+    assert frame[0].tolist() == list(range(20)) + [10**20 + 1, 2**63]
+    assert frame[1].tolist() == [i / 7 for i in range(20)] + [0.5, 1.5]
+
+
+@pytest.mark.parametrize("tokens, expected, invalid", [
+    (["1", str(2**64)], [1, 2**64], []),
+    (["1.5", str(-2**63 - 1)], [1.5, -2**63 - 1], []),
+    (["x", str(10**20)], [float("nan"), 10**20], [0]),
+])
+def test_convert_tokens_keeps_large_integers(tokens, expected, invalid):
+    values, invalid_positions = convert_tokens(tokens)
+
+    assert values.dtype == object
+    assert values.tolist()[1] == expected[1]
+    assert type(values.tolist()[1]) is int
+    assert invalid_positions.tolist() == invalid
+
+
+@pytest.mark.parametrize("batch_rows", [1, 4096])
+def test_columnar_builder_converts_tokens(monkeypatch, batch_rows):
+    monkeypatch.setattr(ColumnarBuilder, "BATCH_ROWS", batch_rows)
+    builder = ColumnarBuilder()
+    builder.extend([["1", "0.5"], ["2", "1.5", "7"], ["3"]])
+
+    pd.testing.assert_frame_equal(builder.build(), pd.DataFrame([[1, 0.5], [2, 1.5, 7], [3]]))
+
+
+def test_columnar_builder_reports_invalid_token():
+    builder = ColumnarBuilder()
+    builder.extend([["1", "2"], ["3", "4"], ["5", "six"]])
+
+    with pytest.raises(StructuredError) as e:
+        builder.build()
+    assert "row 2, column 1" in str(e.value)
+
+
+def test_columnar_builder_shares_memory():
+    builder = ColumnarBuilder()
+    builder.extend([[1, 0.5], [2, 1.5]])
+    frame = builder.build()
+
+    assert frame[0].to_numpy().base is not None
+    assert frame[1].to_numpy().base is not None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_mesurements_parser_iter_stream(chunk_size):
+    lines = ["Time,Value", "0,0.1", "# comment", "1,0.15", "2,0.2", "3,0.25", "4,1"]
+    expected = MeasurementParser().parse_stream(LineStream(lines, start=5), chunk_size=chunk_size)
+
+    chunks = list(MeasurementParser().iter_stream(LineStream(lines, start=5), chunk_size=chunk_size))
+
+    assert all(list(chunk.columns) == ["Time", "Value"] for chunk in chunks)
+    assert pd.concat(chunks, ignore_index=True).equals(expected)
+
+
+def test_mesurements_parser_iter_stream_column_count():
+    chunks = MeasurementParser().iter_stream(LineStream(["1,2,3", "4,5", "6,7,8,9"]), chunk_size=1)
+
+    assert next(chunks).shape == (1, 3)
+    assert next(chunks).shape == (1, 3)
+    with pytest.raises(StructuredError):
+        next(chunks)
+
+
+def test_mesurements_parser_parse_stream_ragged_rows():
+    mesurement_parser = MeasurementParser()
+
+    df = mesurement_parser.parse_stream(LineStream(["1,2", "3,4,5", "6,7"]), chunk_size=1)
+
+    assert df.equals(pd.DataFrame([[1, 2], [3, 4, 5], [6, 7]]))
+
+
 def test_data_parser(inputdata_file):
     operator = FileOperator(inputdata_file)
     header_parser = HeaderParser()
@@ -390,6 +852,40 @@ def test_data_parser(inputdata_file):
     assert mesurements.equals(expected_df)
 
 
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_data_parser_stream(inputdata_file, chunk_size):
+    expected = DataParser(FileOperator(inputdata_file), HeaderParser(), MeasurementParser()).process()
+
+    parser = DataParser(FileOperator(inputdata_file), HeaderParser(), MeasurementParser(), chunk_size=chunk_size)
+    metadata, mesurements = parser.process()
+
+    assert metadata == expected[0]
+    assert mesurements.equals(expected[1])
+
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_data_parser_mapped_file(inputdata_file, chunk_size):
+    expected = DataParser(FileOperator(inputdata_file), HeaderParser(), MeasurementParser()).process()
+
+    parser = DataParser(MappedFileOperator(inputdata_file), HeaderParser(), MeasurementParser(), chunk_size=chunk_size)
+    metadata, mesurements = parser.process()
+
+    assert metadata == expected[0]
+    assert mesurements.equals(expected[1])
+
+
+def test_data_parser_stream_without_measurement_start(tmp_path):
+    input_file = tmp_path / "no_start.txt"
+    input_file.write_text("name,value\nkey,1,2\n", encoding="utf-8")
+    expected = DataParser(FileOperator(input_file), HeaderParser(), MeasurementParser()).process()
+
+    parser = DataParser(FileOperator(input_file), HeaderParser(), MeasurementParser(), chunk_size=1)
+    metadata, mesurements = parser.process()
+
+    assert metadata == expected[0]
+    assert mesurements.equals(expected[1])
+
+
 def test_file_reader(inputdata_file):
     expected_metadata = [
         ("date", "2021-01-01"),
@@ -428,6 +924,139 @@ def test_set_mesurement_start_number(test_inputfile, ivnoice_json_with_sample_in
     assert file_reader.user_mesurement_start_number == 5
 
 
+def test_file_reader_reads_input_file_once(inputdata_file, ivnoice_json_with_sample_info):
+    file_reader = FileReader()
+    with patch("modules.inputfile_handler.IngestedFile", wraps=IngestedFile) as mock_ingested_file:
+        file_reader.set_mesurement_start_number(Path(inputdata_file), ivnoice_json_with_sample_info)
+        metadata, mesurements = file_reader.read(Path(inputdata_file))
+
+    mock_ingested_file.assert_called_once()
+    assert mesurements.shape == (5, 2)
+    assert file_reader.source is None
+
+
+def test_file_reader_memory_maps_large_file(inputdata_file, ivnoice_json_with_sample_info):
+    expected = FileReader().read(Path(inputdata_file))
+    file_reader = FileReader()
+    file_reader.mmap_threshold = 1
+
+    file_reader.set_mesurement_start_number(Path(inputdata_file), ivnoice_json_with_sample_info)
+    assert isinstance(file_reader.source, MappedFile)
+    metadata, mesurements = file_reader.read(Path(inputdata_file))
+
+    assert isinstance(file_reader.file_reader, MappedFileOperator)
+    assert metadata == expected[0]
+    assert mesurements.equals(expected[1])
+
+
+@pytest.mark.parametrize("mmap_threshold", [None, 1])
+def test_file_reader_read_chunks(inputdata_file, mmap_threshold):
+    expected = FileReader().read(Path(inputdata_file))
+    file_reader = FileReader()
+    file_reader.mmap_threshold = mmap_threshold
+    file_reader.chunk_size = 2
+    file_reader.out_of_core_threshold = 1
+
+    assert file_reader.is_out_of_core(Path(inputdata_file))
+    metadata, chunks = file_reader.read_chunks(Path(inputdata_file))
+
+    assert metadata == expected[0]
+    assert pd.concat(list(chunks), ignore_index=True).equals(expected[1])
+    assert file_reader.data_parser.get_measurements().empty
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+def test_file_reader_reads_compressed_file(tmp_path, inputdata_file, ivnoice_json_with_sample_info, compression):
+    plain_reader = FileReader()
+    plain_reader.set_mesurement_start_number(Path(inputdata_file), ivnoice_json_with_sample_info)
+    expected = plain_reader.read(Path(inputdata_file))
+    compressed_file = tmp_path / f"input.{compression}"
+    compressed_file.write_bytes(COMPRESSORS[compression](Path(inputdata_file).read_bytes()))
+    file_reader = FileReader()
+
+    assert detect_compression(compressed_file) == compression
+    file_reader.set_mesurement_start_number(compressed_file, ivnoice_json_with_sample_info)
+    assert isinstance(file_reader.source, StreamedFile)
+    metadata, mesurements = file_reader.read(compressed_file)
+
+    assert file_reader.user_mesurement_start_number == plain_reader.user_mesurement_start_number
+    assert metadata == expected[0]
+    assert mesurements.equals(expected[1])
+
+
+@pytest.mark.parametrize("text", ["a\r\nb\rc\n", "a\n\nb", "", "測定データ\n温度\n"])
+def test_streamed_file(tmp_path, text):
+    compressed_file = tmp_path / "input.gz"
+    compressed_file.write_bytes(gzip.compress(text.encode("cp932")))
+    plain_file = tmp_path / "input.txt"
+    plain_file.write_bytes(text.encode("cp932"))
+
+    streamed_file = StreamedFile(compressed_file, search_char="b")
+
+    assert streamed_file.read_lines() == IngestedFile(plain_file).read_lines()
+    assert streamed_file.search_char_line_number == IngestedFile(plain_file, search_char="b").search_char_line_number
+
+
+def test_streamed_file_rejects_plain_file(inputdata_file):
+    assert detect_compression(Path(inputdata_file)) is None
+    with pytest.raises(ValueError):
+        StreamedFile(Path(inputdata_file))
+
+
+def test_file_reader_reads_zstd_file(tmp_path, inputdata_file):
+    zstandard = pytest.importorskip("zstandard")
+    expected = FileReader().read(Path(inputdata_file))
+    compressed_file = tmp_path / "input.zst"
+    compressed_file.write_bytes(zstandard.ZstdCompressor().compress(Path(inputdata_file).read_bytes()))
+
+    metadata, mesurements = FileReader().read(compressed_file)
+
+    assert metadata == expected[0]
+    assert mesurements.equals(expected[1])
+
+
+def test_file_reader_zstd_requires_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr("modules.inputfile_handler.zstandard", None)
+    compressed_file = tmp_path / "input.zst"
+    compressed_file.write_bytes(b"\x28\xb5\x2f\xfd" + bytes(16))
+
+    with pytest.raises(StructuredError):
+        FileReader().read(compressed_file)
+
+
+def test_file_reader_cache(tmp_path, inputdata_file):
+    file_reader = FileReader()
+    file_reader.cache = MeasurementCache(tmp_path)
+    expected = file_reader.read(Path(inputdata_file))
+
+    with patch.object(DataParser, "process") as mock_process:
+        metadata, mesurements = file_reader.read(Path(inputdata_file))
+        file_reader.user_mesurement_start_number = 3
+        file_reader.read(Path(inputdata_file))
+
+    assert mock_process.call_count == 1
+    assert metadata == expected[0]
+    pd.testing.assert_frame_equal(mesurements, expected[1])
+
+
+@pytest.mark.parametrize("mmap_threshold", [None, 1])
+def test_file_reader_cache_reuses_ingested_contents(tmp_path, inputdata_file, ivnoice_json_with_sample_info, mmap_threshold):
+    file_reader = FileReader()
+    file_reader.cache = MeasurementCache(tmp_path)
+    file_reader.mmap_threshold = mmap_threshold
+    file_reader.set_mesurement_start_number(Path(inputdata_file), ivnoice_json_with_sample_info)
+    expected = file_reader.read(Path(inputdata_file))
+
+    file_reader.set_mesurement_start_number(Path(inputdata_file), ivnoice_json_with_sample_info)
+    with patch("modules.cache_handler.file_digest") as mock_digest, patch.object(DataParser, "process") as mock_process:
+        metadata, mesurements = file_reader.read(Path(inputdata_file))
+
+    mock_digest.assert_not_called()
+    mock_process.assert_not_called()
+    assert metadata == expected[0]
+    pd.testing.assert_frame_equal(mesurements, expected[1])
+
+
 def test_raise_filenotfound_error_set_mesurement_start_number(test_inputfile, ivnoice_json_with_sample_info):
     file_reader = FileReader()
     with pytest.raises(FileNotFoundError) as e:
@@ -4,7 +4,7 @@ import pathlib
 
 import pytest
 
-from modules.meta_handler import MetaParser
+from modules.meta_handler import MetaParser, get_scatterplot_config
 from rdetoolkit.rde2util import Meta
 
 
@@ -105,3 +105,15 @@ def test_save_meta_with_repeated_meta_info(temp_dir, sample_meta):
 
     with pytest.raises(NotImplementedError, match="Repeated meta info is not supported in this template"):
         handler.save_meta(save_path, sample_meta, const_meta_info=const_meta_info, repeated_meta_info=repeated_meta_info)
+
+
+@pytest.mark.parametrize("contents, expected", [
+    ("save_raw: true\nscatterplot:\n  max_workers: 4\n", 4),
+    ("save_raw: true\n", None),
+    (None, None),
+])
+def test_get_scatterplot_config(tmp_path, contents, expected):
+    if contents is not None:
+        tmp_path.joinpath("rdeconfig.yaml").write_text(contents, encoding="utf-8")
+
+    assert get_scatterplot_config(tmp_path).max_workers == expected
@@ -0,0 +1,83 @@
+import json
+import pickle
+import threading
+
+from modules.metrics_handler import NULL_RECORDER, MetricsRecorder
+
+
+def test_metrics_recorder_stages_and_counters(tmp_path):
+    output = tmp_path / "out.csv"
+    output.write_bytes(b"x" * 10)
+    recorder = MetricsRecorder()
+
+    for _ in range(2):
+        with recorder.stage("parse"):
+            pass
+    recorder.count("rows", 3)
+    recorder.count("rows")
+    recorder.record("columns", 2)
+    recorder.output(output)
+    report = recorder.report()
+
+    assert report["stages"]["parse"]["calls"] == 2
+    assert report["stages"]["parse"]["seconds"] >= 0
+    assert report["counters"] == {"rows": 4, "columns": 2}
+    assert report["outputs"] == {"out.csv": 10}
+    assert "files" not in report
+
+
+def test_metrics_recorder_times_failed_stages():
+    recorder = MetricsRecorder()
+
+    try:
+        with recorder.stage("parse"):
+            raise ValueError
+    except ValueError:
+        pass
+
+    assert recorder.stages["parse"]["calls"] == 1
+
+
+def test_metrics_recorder_save(tmp_path):
+    recorder = MetricsRecorder()
+    child = MetricsRecorder()
+    child.count("rows", 5)
+    recorder.add_file("a.txt", child)
+
+    recorder.save(tmp_path / "metrics.json", log_path=tmp_path / "rdesys.log")
+
+    report = json.loads((tmp_path / "metrics.json").read_text())
+    assert report["files"]["a.txt"]["counters"] == {"rows": 5}
+    assert '"rows": 5' in (tmp_path / "rdesys.log").read_text()
+
+
+def test_null_recorder_records_nothing(tmp_path):
+    with NULL_RECORDER.stage("parse"):
+        NULL_RECORDER.count("rows")
+    NULL_RECORDER.record("columns", 2)
+    NULL_RECORDER.add_file("a.txt", MetricsRecorder())
+    NULL_RECORDER.save(tmp_path / "metrics.json")
+
+    assert not NULL_RECORDER.enabled
+    assert NULL_RECORDER.report() == {"stages": {}, "counters": {}, "outputs": {}}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_metrics_recorder_counts_from_threads_and_pickles():
+    recorder = MetricsRecorder()
+
+    def work():
+        for _ in range(1000):
+            with recorder.stage("write"):
+                recorder.count("rows")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    copy = pickle.loads(pickle.dumps(recorder))
+    copy.count("rows")
+
+    assert recorder.counters["rows"] == recorder.stages["write"]["calls"] == 4000
+    assert copy.counters["rows"] == 4001
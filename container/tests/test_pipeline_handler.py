@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from modules.pipeline_handler import StagePipeline, available_cpus
+
+
+def test_stage_pipeline_runs_after_dependencies():
+    events = []
+    pipeline = StagePipeline()
+    pipeline.add("read", lambda: events.append("read") or "data")
+    pipeline.add("write", lambda: events.append("write"), after=["read"])
+    pipeline.add("plot", lambda: events.append("plot") or 2, after=["read"])
+    pipeline.add("report", lambda: events.append("report"), after=["write", "plot"])
+
+    results = pipeline.run()
+
+    assert results == {"read": "data", "write": None, "plot": 2, "report": None}
+    assert events[0] == "read"
+    assert events[-1] == "report"
+
+
+def test_stage_pipeline_overlaps_independent_stages():
+    # Each stage waits for the other, so they only finish if they run at the same time.
+    barrier = threading.Barrier(2, timeout=10)
+    pipeline = StagePipeline()
+    pipeline.add("write", barrier.wait)
+    pipeline.add("plot", barrier.wait)
+
+    assert sorted(pipeline.run().values()) == [0, 1]
+
+
+def test_stage_pipeline_runs_in_order_when_not_concurrent():
+    events = []
+    pipeline = StagePipeline(concurrent=False)
+    for name in ("a", "b", "c"):
+        pipeline.add(name, lambda name=name: events.append((name, threading.current_thread() is threading.main_thread())))
+
+    pipeline.run()
+
+    assert events == [("a", True), ("b", True), ("c", True)]
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def test_stage_pipeline_collects_errors(caplog):
+    events = []
+    started = threading.Event()
+    pipeline = StagePipeline()
+    pipeline.add("write", lambda: started.wait(10) and fail("write failed"))
+    pipeline.add("plot", lambda: started.set() or fail("plot failed"))
+    pipeline.add("report", lambda: events.append("report"), after=["plot"])
+
+    with pytest.raises(ValueError, match="write failed") as exc_info:
+        pipeline.run()
+
+    assert not hasattr(exc_info.value, "__notes__")
+    assert [(record.getMessage(), str(record.exc_info[1])) for record in caplog.records] == [("Stage 'plot' also failed", "plot failed")]
+    assert events == []
+
+
+@pytest.mark.parametrize(("name", "after"), [("read", []), ("write", ["plot"])])
+def test_stage_pipeline_rejects_invalid_stages(name, after):
+    pipeline = StagePipeline()
+    pipeline.add("read", lambda: None)
+
+    with pytest.raises(ValueError):
+        pipeline.add(name, lambda: None, after=after)
+
+
+def test_available_cpus(monkeypatch):
+    monkeypatch.setattr("os.sched_getaffinity", lambda pid: {0, 3}, raising=False)
+    assert available_cpus() == 2
+
+    monkeypatch.delattr("os.sched_getaffinity", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: None)
+    assert available_cpus() == 1
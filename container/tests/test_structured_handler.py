@@ -1,9 +1,14 @@
+import gzip
+import importlib
+import importlib.util
 import os
 import pathlib
 
 import pandas as pd
+import pytest
+from rdetoolkit.exceptions import StructuredError
 
-from modules.structured_handler import StructuredDataProcessor
+from modules.structured_handler import BackgroundGzipWriter, ColumnarWriter, CsvSink, StructuredDataProcessor
 
 
 def test_to_csv():
@@ -39,3 +44,125 @@ def test_to_text():
 
     if os.path.exists("metadata.txt"):
         os.remove("metadata.txt")
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame([[1, 2.5, 3], [4, 5.5, 6], [7, 8.5, 9]]),
+    pd.DataFrame({"Time": [0, 1, 2], "Value": [0.1, 0.15, 0.2], "Error": [1, 2, 3]}),
+])
+def test_to_csv_chunks(tmp_path, df):
+    handler = StructuredDataProcessor()
+    handler.to_csv(df, tmp_path / "data.csv")
+    handler.to_csv(df.iloc[:, [0, 2]], tmp_path / "subset.csv", header=["x", "y"])
+    sinks = [CsvSink(tmp_path / "chunked_data.csv"), CsvSink(tmp_path / "chunked_subset.csv", [0, 2], ["x", "y"])]
+
+    handler.to_csv_chunks([df.iloc[:2], df.iloc[2:]], sinks)
+
+    assert (tmp_path / "chunked_data.csv").read_text() == (tmp_path / "data.csv").read_text()
+    assert (tmp_path / "chunked_subset.csv").read_text() == (tmp_path / "subset.csv").read_text()
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame([[1, 2.5, 3], [4, float("nan"), 6], [7, 1e-05, -9], [0, float("inf"), 1 << 40]]),
+    pd.DataFrame({"Time": [0.0, float("nan"), 2.0, 3.0], "Value": [0.1, 0.15, 1e16, -0.0], "Flag": [True, False, True, False]}),
+    pd.DataFrame({"Time": [0, 1, 2, 3], "Label": ["a", "b,c", 'd"', ""], "Value": [0.1, 0.2, 0.3, 0.4]}),
+    pd.DataFrame({"Time": pd.Series([], dtype=float), "Value": pd.Series([], dtype=float), "Error": pd.Series([], dtype=int)}),
+])
+@pytest.mark.parametrize("block_rows", [1, 3, 100])
+def test_to_csv_sinks(tmp_path, monkeypatch, df, block_rows):
+    monkeypatch.setattr("modules.structured_handler.WRITE_BLOCK_ROWS", block_rows)
+    handler = StructuredDataProcessor()
+    projections = [None, [0, 2], [1], [-1, 0]]
+    for i, columns in enumerate(projections):
+        handler.to_csv(df if columns is None else df.iloc[:, columns], tmp_path / f"expected{i}.csv", header=["x", "y"][:len(columns or [])] or None)
+    sinks = [CsvSink(tmp_path / f"actual{i}.csv", columns, ["x", "y"][:len(columns or [])] or None) for i, columns in enumerate(projections)]
+
+    handler.to_csv_sinks(df, sinks)
+
+    for i in range(len(projections)):
+        assert (tmp_path / f"actual{i}.csv").read_bytes() == (tmp_path / f"expected{i}.csv").read_bytes()
+
+
+@pytest.mark.parametrize("float_format", ["%.6g", "%.3f", "%+.2e"])
+def test_to_csv_sinks_float_format(tmp_path, float_format):
+    df = pd.DataFrame({"Time": [0.0, 1.5, float("nan"), 3.0], "Value": [0.123456789, -1e-7, 2e20, float("inf")], "Count": [1, 2, 3, 4]})
+    handler = StructuredDataProcessor()
+    handler.float_format = float_format
+    handler.to_csv(df, tmp_path / "expected.csv")
+    handler.to_csv(df.iloc[:, [1]], tmp_path / "expected_value.csv")
+
+    handler.to_csv_sinks(df, [CsvSink(tmp_path / "actual.csv"), CsvSink(tmp_path / "actual_value.csv", [1])])
+
+    assert (tmp_path / "actual.csv").read_bytes() == (tmp_path / "expected.csv").read_bytes()
+    assert (tmp_path / "actual_value.csv").read_bytes() == (tmp_path / "expected_value.csv").read_bytes()
+
+
+@pytest.mark.parametrize("df", [
+    pd.DataFrame([[1, 2.5, 3], [4, 5.5, 6], [7, 8.5, 9]]),
+    pd.DataFrame({"Time": [0, 1, 2], "Label": ["a", "b", "c"]}),
+])
+def test_to_csv_sinks_gzip(tmp_path, monkeypatch, df):
+    monkeypatch.setattr("modules.structured_handler.WRITE_BLOCK_ROWS", 2)
+    handler = StructuredDataProcessor()
+    handler.to_csv_sinks(df, [CsvSink(tmp_path / "data.csv"), CsvSink(tmp_path / "subset.csv", [1], ["y"])])
+    handler.compression = "gzip"
+    (tmp_path / "compressed").mkdir()
+
+    handler.to_csv_sinks(df, [CsvSink(tmp_path / "compressed" / "data.csv"), CsvSink(tmp_path / "compressed" / "subset.csv", [1], ["y"])])
+    handler.to_csv(df, tmp_path / "compressed" / "pandas.csv")
+
+    assert sorted(path.name for path in (tmp_path / "compressed").iterdir()) == ["data.csv.gz", "pandas.csv.gz", "subset.csv.gz"]
+    for name, expected in [("data", "data"), ("subset", "subset"), ("pandas", "data")]:
+        assert gzip.decompress((tmp_path / "compressed" / f"{name}.csv.gz").read_bytes()) == (tmp_path / f"{expected}.csv").read_bytes()
+
+
+def test_background_gzip_writer_raises_compression_errors(tmp_path):
+    writer = BackgroundGzipWriter(tmp_path / "data.csv.gz")
+    writer._BackgroundGzipWriter__file.close()
+
+    writer.write("1,2\n")
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+def read_columnar(path):
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_feather(path)
+
+
+@pytest.mark.parametrize("columnar_format", ["parquet", "feather"])
+def test_to_csv_sinks_columnar(tmp_path, columnar_format):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"Time": [0, 1, 2], "Value": [0.1, float("nan"), 0.2], "Label": ["a", "b", "c"]})
+    handler = StructuredDataProcessor()
+    handler.columnar_format = columnar_format
+
+    handler.to_csv_sinks(df, [CsvSink(tmp_path / "data.csv", columnar=True), CsvSink(tmp_path / "subset.csv", [0, 1], ["x", "y"])])
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(["data.csv", f"data.{columnar_format}", "subset.csv"])
+    pd.testing.assert_frame_equal(read_columnar(tmp_path / f"data.{columnar_format}"), df)
+
+
+@pytest.mark.parametrize("columnar_format", ["parquet", "feather"])
+def test_to_csv_chunks_columnar(tmp_path, columnar_format):
+    pa = pytest.importorskip("pyarrow")
+    chunks = [pd.DataFrame([[0, 1], [1, 2]]), pd.DataFrame([[2, 3.5], [3, float("nan")]])]
+    handler = StructuredDataProcessor()
+    handler.columnar_format = columnar_format
+
+    handler.to_csv_chunks(chunks, [CsvSink(tmp_path / "subset.csv", [1], ["y"], columnar=True)])
+
+    # The integer column of the first chunk is stored as float64 so that the second chunk fits.
+    expected = pd.DataFrame({"y": [1.0, 2.0, 3.5, float("nan")]})
+    pd.testing.assert_frame_equal(read_columnar(tmp_path / f"subset.{columnar_format}"), expected)
+    if columnar_format == "feather":
+        table = pa.ipc.open_file(pa.memory_map(str(tmp_path / "subset.feather"))).read_all()
+        assert table.column("y").to_pylist()[:3] == [1.0, 2.0, 3.5]
+    else:
+        statistics = importlib.import_module("pyarrow.parquet").ParquetFile(tmp_path / "subset.parquet").metadata.row_group(0).column(0).statistics
+        assert (statistics.min, statistics.max) == (1.0, 2.0)
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is not None, reason="pyarrow is installed")
+def test_columnar_writer_requires_pyarrow(tmp_path):
+    with pytest.raises(StructuredError, match="pyarrow"):
+        ColumnarWriter(tmp_path / "data.parquet", "parquet")